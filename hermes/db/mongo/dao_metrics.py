@@ -145,6 +145,21 @@ def fetch(group_id, query=None):
     return list(cursor)
 
 
+def stream(group_id, query=None):
+    """Streams a group of metrics, i.e. documents are fetched from the db in batches.
+
+    :param str group_id: ID of the metric group being returned.
+    :param dict query: Query filter to be applied.
+
+    :returns: Generator of metrics.
+    :rtype: generator
+
+    """
+    collection = _get_collection(group_id)
+    for metric in _fetch(collection.find, query):
+        yield metric
+
+
 def fetch_columns(group_id, exclude_id_column=False):
     """Returns set of column names associated with a group of metrics.
 
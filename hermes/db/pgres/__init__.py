@@ -11,6 +11,9 @@
 
 
 """
+from hermes.db.pgres import cache
+from hermes.db.pgres import change_tracking
+from hermes.db.pgres import compaction
 from hermes.db.pgres import convertor
 from hermes.db.pgres.convertor import as_datetime_string
 from hermes.db.pgres.convertor import as_date_string
@@ -19,9 +22,13 @@ from hermes.db.pgres import dao
 from hermes.db.pgres import dao_conso
 from hermes.db.pgres import dao_cv
 from hermes.db.pgres import dao_monitoring
+from hermes.db.pgres import dao_monitoring_fastpath
 from hermes.db.pgres import dao_mq
 from hermes.db.pgres import dao_superviseur
 from hermes.db.pgres import factory
+from hermes.db.pgres import fastpath
+from hermes.db.pgres import instrumentation
+from hermes.db.pgres import partitioning
 from hermes.db.pgres import session
 from hermes.db.pgres import setup
 from hermes.db.pgres import types
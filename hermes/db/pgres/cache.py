@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: hermes.db.pgres.cache.py
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL/CeCIL
+   :platform: Unix, Windows
+   :synopsis: Optional per-process read-through cache of frequently retrieved entities.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import sqlalchemy as sa
+from sqlalchemy.orm import make_transient_to_detached
+
+from hermes.db.pgres import session
+from hermes.utils import config
+from hermes.utils.cache import TimedCache
+
+
+
+# Cache region: simulations keyed by uid.
+REGION_SIMULATION = 'simulation'
+
+# Cache region: active simulations keyed by hashid.
+REGION_ACTIVE_SIMULATION = 'active-simulation'
+
+# Cache region: jobs keyed by uid.
+REGION_JOB = 'job'
+
+# Set of cache regions.
+REGIONS = (
+    REGION_ACTIVE_SIMULATION,
+    REGION_JOB,
+    REGION_SIMULATION
+    )
+
+# Default time to live (in seconds) of cached entities.
+_DEFAULT_TTL = 60
+
+# Default maximum number of cached entities per region.
+_DEFAULT_MAX_SIZE = 10000
+
+# Map of cache regions to caches, initialised upon first use.
+_CACHES = {}
+
+
+def is_enabled():
+    """Returns flag indicating whether entity caching is enabled.
+
+    """
+    return getattr(config.db.pgres, 'entityCacheEnabled', False)
+
+
+def _get_cache(region):
+    """Returns cache mapped to a region.
+
+    """
+    try:
+        return _CACHES[region]
+    except KeyError:
+        return _CACHES.setdefault(region, TimedCache(
+            getattr(config.db.pgres, 'entityCacheTTLInSeconds', _DEFAULT_TTL),
+            getattr(config.db.pgres, 'entityCacheMaxSize', _DEFAULT_MAX_SIZE)
+            ))
+
+
+def _get_snapshot(instance):
+    """Returns a snapshot of an entity's column values.
+
+    """
+    return type(instance), {
+        attr.key: getattr(instance, attr.key)
+        for attr in sa.inspect(instance).mapper.column_attrs
+        }
+
+
+def _get_instance(snapshot):
+    """Returns an entity instance reconstituted from a snapshot.
+
+    The instance is merged into the current session without emitting SQL so
+    that it behaves exactly as if it had been loaded.
+
+    """
+    etype, values = snapshot
+    instance = etype()
+    for key, value in values.iteritems():
+        setattr(instance, key, value)
+    make_transient_to_detached(instance)
+
+    return session.merge(instance, load=False)
+
+
+def retrieve(region, key, retriever):
+    """Returns an entity either from cache or by invoking the retriever.
+
+    :param str region: Cache region.
+    :param key: Cache key, e.g. a simulation uid.
+    :param function retriever: Function that retrieves entity from db.
+
+    :returns: An entity instance or None.
+    :rtype: db.Entity
+
+    """
+    if not is_enabled():
+        return retriever()
+
+    cache = _get_cache(region)
+    snapshot = cache.get(key)
+    if snapshot is not None:
+        return _get_instance(snapshot)
+
+    instance = retriever()
+    if instance is not None:
+        cache.set(key, _get_snapshot(instance))
+
+    return instance
+
+
+def invalidate(region, key):
+    """Removes an entity from cache.
+
+    :param str region: Cache region.
+    :param key: Cache key, e.g. a simulation uid.
+
+    """
+    if region in _CACHES:
+        _CACHES[region].invalidate(key)
+
+
+def invalidate_where(region, attr, values):
+    """Removes all entities from cache whose attribute value is within a set.
+
+    :param str region: Cache region.
+    :param str attr: Name of an entity attribute, e.g. simulation_uid.
+    :param set values: Attribute values to be matched.
+
+    """
+    if region in _CACHES:
+        _CACHES[region].invalidate_where(lambda _, snapshot: snapshot[1].get(attr) in values)
+
+
+def invalidate_simulations(uids):
+    """Removes a set of simulations, and all entities related to them, from cache.
+
+    :param iterable uids: Simulation uids.
+
+    """
+    uids = set(uids)
+    for uid in uids:
+        invalidate(REGION_SIMULATION, uid)
+    invalidate_where(REGION_ACTIVE_SIMULATION, 'uid', uids)
+    invalidate_where(REGION_JOB, 'simulation_uid', uids)
+
+
+def clear():
+    """Removes all entities from cache.
+
+    """
+    for cache in _CACHES.values():
+        cache.clear()
+
+
+def get_stats():
+    """Returns cache usage statistics per region.
+
+    :returns: Map of region to usage statistics.
+    :rtype: dict
+
+    """
+    return {region: cache.get_stats() for region, cache in _CACHES.items()}
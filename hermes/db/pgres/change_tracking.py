@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: hermes.db.pgres.change_tracking.py
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL/CeCIL
+   :platform: Unix, Windows
+   :synopsis: Trigger maintained log of simulation changes underpinning timeslice deltas.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+from hermes.db.pgres import fastpath
+from hermes.db.pgres import session
+from hermes.db.pgres import types
+from hermes.utils import logger
+
+
+
+# Change log table.
+TABLE = types.SimulationChange.__table__
+
+# Tracked tables mapped to column referencing the changed simulation.
+TRACKED = (
+    (types.Simulation.__table__, 'id'),
+    (types.Job.__table__, 'simulation_id'),
+    (types.JobPeriod.__table__, 'simulation_id')
+    )
+
+# Tracked operations mapped to trigger transition table.
+# N.B. transition tables restrict a trigger to a single operation.
+_OPERATIONS = (
+    ('INSERT', 'NEW'),
+    ('UPDATE', 'NEW'),
+    ('DELETE', 'OLD')
+    )
+
+# Sql: trigger function upserting change log rows from a statement's transition table.
+# N.B. the change sequence is the writing transaction's id, see get_cursor.
+_SQL_FUNCTION = """
+CREATE OR REPLACE FUNCTION monitoring.fn_track_simulation_changes() RETURNS trigger AS $$
+BEGIN
+    EXECUTE format($sql$
+        INSERT INTO monitoring.tbl_simulation_change AS c
+            (simulation_id, change_seq, row_create_date)
+        SELECT DISTINCT
+            t.%1$I, txid_current(), now() AT TIME ZONE 'utc'
+        FROM
+            changed AS t
+        WHERE
+            t.%1$I IS NOT NULL
+        ON CONFLICT (simulation_id) DO UPDATE SET
+            change_seq = EXCLUDED.change_seq,
+            row_update_date = EXCLUDED.row_create_date
+        WHERE
+            c.change_seq <> EXCLUDED.change_seq
+    $sql$, TG_ARGV[0]);
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# Sql: statement level change tracking trigger.
+_SQL_TRIGGER = """
+DROP TRIGGER IF EXISTS {name} ON {table};
+CREATE TRIGGER {name}
+    AFTER {operation} ON {table}
+    REFERENCING {transition} TABLE AS changed
+    FOR EACH STATEMENT
+    EXECUTE PROCEDURE monitoring.fn_track_simulation_changes('{column}');
+"""
+
+# Sql: change log cursor, i.e. lowest transaction id still in progress.
+# N.B. transaction ids are assigned in start rather than commit order, hence
+# changes at or above the cursor may not yet be visible.
+SQL_CURSOR = "txid_snapshot_xmin(txid_current_snapshot())"
+
+
+def _get_trigger_name(table, operation):
+    """Returns name of a change tracking trigger.
+
+    """
+    return "trg_{}_{}_change".format(table.name, operation.lower())
+
+
+def init():
+    """Installs change tracking triggers (idempotent).
+
+    N.B. Partitioned tables must be partitioned beforehand (see partitioning.init).
+
+    """
+    TABLE.create(session.sa_engine, checkfirst=True)
+    fastpath.execute_command(_SQL_FUNCTION)
+    for table, column in TRACKED:
+        qualified_name = "{}.{}".format(table.schema, table.name)
+        logger.log_db("Tracking changes: {}".format(qualified_name))
+        for operation, transition in _OPERATIONS:
+            fastpath.execute_command(_SQL_TRIGGER.format(
+                name=_get_trigger_name(table, operation),
+                table=qualified_name,
+                operation=operation,
+                transition=transition,
+                column=column
+                ))
+
+
+def get_cursor():
+    """Returns current change log cursor.
+
+    A client that has read all changes committed prior to the cursor passes it
+    back in order to read subsequent changes; changes may thus be read more than once.
+
+    :returns: Change log cursor.
+    :rtype: long
+
+    """
+    return fastpath.execute_one("SELECT {}".format(SQL_CURSOR))[0]
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: hermes.db.pgres.compaction.py
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL/CeCIL
+   :platform: Unix, Windows
+   :synopsis: Compaction of job period history into contiguous job period ranges.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import datetime
+
+from hermes.db.pgres import fastpath
+
+
+
+# Default number of simulations compacted per transaction.
+DEFAULT_BATCH_SIZE = 100
+
+# Sql: extends a job's range with a period that either falls within, or immediately follows, the range.
+# N.B. as when rebuilding (see _SQL_COMPACT), re-reports of a period other than the range's last are counted only.
+_SQL_EXTEND_RANGE = """
+UPDATE
+    monitoring.tbl_job_period_range AS r
+SET
+    period_id_last = GREATEST(r.period_id_last, %(period_id)s),
+    period_date_begin = LEAST(r.period_date_begin, %(period_date_begin)s),
+    period_date_end = GREATEST(r.period_date_end, %(period_date_end)s),
+    period_count = r.period_count + 1,
+    last_period_count = CASE
+        WHEN %(period_id)s > r.period_id_last THEN 1
+        WHEN %(period_id)s = r.period_id_last THEN r.last_period_count + 1
+        ELSE r.last_period_count
+        END,
+    last_period_date_begin = CASE
+        WHEN %(period_id)s >= r.period_id_last THEN %(period_date_begin)s
+        ELSE r.last_period_date_begin
+        END,
+    last_job_period_id = CASE
+        WHEN %(period_id)s >= r.period_id_last THEN %(job_period_id)s
+        ELSE r.last_job_period_id
+        END,
+    last_job_period_date = CASE
+        WHEN %(period_id)s >= r.period_id_last THEN %(job_period_date)s
+        ELSE r.last_job_period_date
+        END,
+    row_update_date = %(now)s
+WHERE
+    r.id = (
+        SELECT
+            r1.id
+        FROM
+            monitoring.tbl_job_period_range AS r1
+        WHERE
+            r1.job_uid = %(job_uid)s AND
+            r1.period_id_first <= %(period_id)s AND
+            r1.period_id_last >= %(period_id)s - 1
+        ORDER BY
+            r1.period_id_last DESC
+        LIMIT 1
+        )
+"""
+
+# Sql: opens a new range.
+_SQL_INSERT_RANGE = """
+INSERT INTO monitoring.tbl_job_period_range (
+    row_create_date,
+    simulation_uid,
+    job_uid,
+    period_id_first,
+    period_id_last,
+    period_date_begin,
+    period_date_end,
+    period_count,
+    last_period_count,
+    last_period_date_begin,
+    last_job_period_id,
+    last_job_period_date
+) VALUES (
+    %(now)s,
+    %(simulation_uid)s,
+    %(job_uid)s,
+    %(period_id)s,
+    %(period_id)s,
+    %(period_date_begin)s,
+    %(period_date_end)s,
+    1,
+    1,
+    %(period_date_begin)s,
+    %(job_period_id)s,
+    %(job_period_date)s
+)
+ON CONFLICT (job_uid, period_id_first) DO UPDATE SET
+    period_date_begin = LEAST(monitoring.tbl_job_period_range.period_date_begin, EXCLUDED.period_date_begin),
+    period_date_end = GREATEST(monitoring.tbl_job_period_range.period_date_end, EXCLUDED.period_date_end),
+    period_count = monitoring.tbl_job_period_range.period_count + 1,
+    last_period_count = monitoring.tbl_job_period_range.last_period_count + 1,
+    last_period_date_begin = EXCLUDED.last_period_date_begin,
+    last_job_period_id = EXCLUDED.last_job_period_id,
+    last_job_period_date = EXCLUDED.last_job_period_date,
+    row_update_date = EXCLUDED.row_create_date
+WHERE
+    monitoring.tbl_job_period_range.period_id_last = monitoring.tbl_job_period_range.period_id_first
+"""
+
+# Sql: simulations with job periods.
+_SQL_SIMULATIONS = """
+SELECT
+    s.id,
+    s.uid
+FROM
+    monitoring.tbl_simulation AS s
+WHERE
+    s.id > %(after_id)s AND
+    EXISTS (
+        SELECT 1 FROM monitoring.tbl_job_period AS jp WHERE jp.simulation_uid = s.uid
+        )
+    {}
+ORDER BY
+    s.id
+LIMIT
+    %(batch_size)s
+"""
+
+# Sql: simulations keyed by whether those already compacted are excluded.
+# N.B. a simulation is compacted when its ranges account for each of its job periods, i.e. job
+# periods ingested before ranges were introduced (e.g. of simulations running upon deployment) are not.
+_SQL_SIMULATIONS = {
+    False: _SQL_SIMULATIONS.format(""),
+    True: _SQL_SIMULATIONS.format("""AND (
+        SELECT count(*) FROM monitoring.tbl_job_period AS jp WHERE jp.simulation_uid = s.uid
+        ) <> (
+        SELECT coalesce(sum(r.period_count), 0) FROM monitoring.tbl_job_period_range AS r WHERE r.simulation_uid = s.uid
+        )""")
+}
+
+# Sql: deletes ranges of a set of simulations.
+_SQL_DELETE_RANGES = """
+DELETE FROM
+    monitoring.tbl_job_period_range AS r
+WHERE
+    r.simulation_uid = ANY(%(uids)s::uuid[])
+"""
+
+# Sql: rebuilds ranges of a set of simulations, i.e. gaps & islands over job period ids.
+_SQL_COMPACT = """
+WITH islands AS (
+    SELECT
+        jp.*,
+        jp.period_id - dense_rank() OVER (PARTITION BY jp.job_uid ORDER BY jp.period_id) AS island
+    FROM
+        monitoring.tbl_job_period AS jp
+    WHERE
+        jp.simulation_uid = ANY(%(uids)s::uuid[])
+    ),
+periods AS (
+    SELECT
+        i.*,
+        max(i.period_id) OVER (PARTITION BY i.job_uid, i.island) AS island_period_id_last
+    FROM
+        islands AS i
+    )
+INSERT INTO monitoring.tbl_job_period_range (
+    row_create_date,
+    simulation_uid,
+    job_uid,
+    period_id_first,
+    period_id_last,
+    period_date_begin,
+    period_date_end,
+    period_count,
+    last_period_count,
+    last_period_date_begin,
+    last_job_period_id,
+    last_job_period_date
+)
+SELECT
+    %(now)s,
+    p.simulation_uid,
+    p.job_uid,
+    min(p.period_id),
+    max(p.period_id),
+    min(p.period_date_begin),
+    max(p.period_date_end),
+    count(*),
+    count(*) FILTER (WHERE p.period_id = p.island_period_id_last),
+    (array_agg(p.period_date_begin ORDER BY p.period_id DESC, p.id DESC))[1],
+    (array_agg(p.id ORDER BY p.period_id DESC, p.id DESC))[1],
+    (array_agg(p.row_create_date ORDER BY p.period_id DESC, p.id DESC))[1]
+FROM
+    periods AS p
+GROUP BY
+    p.simulation_uid, p.job_uid, p.island
+"""
+
+
+def update_range(job_period):
+    """Updates job period ranges with a newly persisted job period.
+
+    Either the job's range spanning (or ending just before) the period is extended or a new range is opened.
+
+    :param types.JobPeriod job_period: A flushed job period.
+
+    """
+    params = {
+        'job_period_date': job_period.row_create_date,
+        'job_period_id': job_period.id,
+        'job_uid': job_period.job_uid,
+        'now': datetime.datetime.utcnow(),
+        'period_date_begin': job_period.period_date_begin,
+        'period_date_end': job_period.period_date_end,
+        'period_id': job_period.period_id,
+        'simulation_uid': job_period.simulation_uid
+    }
+    if not fastpath.execute_command(_SQL_EXTEND_RANGE, params):
+        fastpath.execute_command(_SQL_INSERT_RANGE, params)
+
+
+def get_simulations(after_id=0, batch_size=DEFAULT_BATCH_SIZE, uncompacted_only=True):
+    """Returns a batch of simulations whose job periods are to be compacted.
+
+    :param int after_id: Id of last simulation of previous batch.
+    :param int batch_size: Number of simulations per batch.
+    :param bool uncompacted_only: Flag indicating whether to skip simulations whose ranges account for all of their job periods.
+
+    :returns: Simulation (id, uid) pairs.
+    :rtype: list
+
+    """
+    return fastpath.execute(_SQL_SIMULATIONS[uncompacted_only], {
+        'after_id': after_id,
+        'batch_size': batch_size
+        })
+
+
+def compact(uids):
+    """Rebuilds job period ranges of a set of simulations from their job period history.
+
+    :param list uids: Simulation uids.
+
+    :returns: Number of ranges created.
+    :rtype: int
+
+    """
+    params = {'now': datetime.datetime.utcnow(), 'uids': [unicode(i) for i in uids]}
+    fastpath.execute_command(_SQL_DELETE_RANGES, params)
+
+    return fastpath.execute_command(_SQL_COMPACT, params)
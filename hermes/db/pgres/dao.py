@@ -103,6 +103,22 @@ def get_all(etype):
     return get_by_facet(etype, order_by=etype.id, get_iterable=True)
 
 
+@decorators.validate(validator.validate_stream_all)
+def stream_all(etype):
+    """Streams all instances of the entity as lightweight tuples.
+
+    :param class etype: A supported entity type.
+
+    :returns: Generator of named tuples, one field per entity column.
+    :rtype: generator
+
+    """
+    qry = session.raw_query(*etype.__table__.columns)
+    qry = qry.order_by(etype.id)
+
+    return session.stream(qry)
+
+
 @decorators.validate(validator.validate_get_by_facet)
 def get_by_facet(etype, qfilter=None, order_by=None, get_iterable=False):
     """Gets entity instance by facet.
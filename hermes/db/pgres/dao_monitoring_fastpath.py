@@ -0,0 +1,739 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: hermes.db.pgres.dao_monitoring_fastpath.py
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL/CeCIL
+   :platform: Unix, Windows
+   :synopsis: Monitoring data access operations executed via the fast-path executor.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import sqlalchemy as sa
+
+from hermes.cv.constants import JOB_TYPE_COMPUTING
+from hermes.db.pgres import change_tracking
+from hermes.db.pgres import fastpath
+from hermes.db.pgres import partitioning
+from hermes.db.pgres import types
+from hermes.db.pgres import validator_dao_monitoring as validator
+from hermes.db.pgres.entity import Uid
+from hermes.utils import decorators
+from hermes.utils.string_convertor import to_camel_case
+
+
+
+# Datetime column formatter (see convertor.as_datetime_string).
+_AS_DATETIME_STRING = """to_char({}, 'YYYY-MM-DD"T"HH24:MI:ss.US"Z"')"""
+
+# Date column formatter (see convertor.as_date_string).
+_AS_DATE_STRING = """to_char({}, 'YYYY-MM-DD"T"00:00:00.000000"Z"')"""
+
+# Datetime column formatter (see data_convertor.convert).
+_AS_ISO_DATETIME_STRING = """to_char({0}, 'YYYY-MM-DD"T"HH24:MI:SS') || \
+CASE to_char({0}, 'US') WHEN '000000' THEN '' ELSE to_char({0}, '.US') END || 'Z'"""
+
+# Hexadecimal uid column formatter (see entity.Uid).
+_AS_HEX_STRING = "replace({}::text, '-', '')"
+
+# Filter over simulation execution start date.
+_FILTER_START_DATE = "AND s.execution_start_date >= %(start_date)s"
+
+# Filter over simulation execution start date & job period partition key (enables partition pruning).
+_FILTER_JOB_PERIOD_START_DATE = _FILTER_START_DATE + " AND jp.row_create_date >= %(partition_start_date)s"
+
+# Sub-query: simulations changed since a change log cursor (see change_tracking.py).
+_SQL_CHANGED_SIMULATIONS = """
+SELECT
+    c.simulation_id
+FROM
+    monitoring.tbl_simulation_change AS c
+WHERE
+    c.change_seq >= %(since)s
+"""
+
+# Filter over simulations changed since a change log cursor.
+_FILTER_CHANGED = " AND s.id IN ({})".format(_SQL_CHANGED_SIMULATIONS)
+
+
+def _get_column(column, alias):
+    """Returns a column expression, formatting hexadecimal uids as per entity.Uid.
+
+    """
+    value = "{}.{}".format(alias, column.name)
+    if isinstance(column.type, Uid) and column.type.hexadecimal:
+        return _AS_HEX_STRING.format(value)
+
+    return value
+
+
+# Sql: active simulations.
+_SQL_ACTIVE_SIMULATIONS = """
+SELECT
+    s.accounting_project,
+    s.compute_node_login,
+    s.compute_node_machine,
+    {execution_end_date},
+    {execution_start_date},
+    s.experiment,
+    s.experiment_raw,
+    s.is_error,
+    {hashid},
+    s.id,
+    s.model,
+    s.model_raw,
+    s.name,
+    s.space,
+    s.space_raw,
+    s.try_id,
+    s.uid,
+    {output_start_date},
+    {output_end_date},
+    CAST(s.is_im AS INTEGER)
+FROM
+    monitoring.tbl_simulation AS s
+WHERE
+    s.execution_start_date IS NOT NULL AND
+    s.is_obsolete = false
+    {{}}
+ORDER BY
+    s.execution_start_date DESC
+""".format(
+    execution_end_date=_AS_DATETIME_STRING.format('s.execution_end_date'),
+    execution_start_date=_AS_DATETIME_STRING.format('s.execution_start_date'),
+    hashid=_AS_HEX_STRING.format('s.hashid'),
+    output_start_date=_AS_DATE_STRING.format('s.output_start_date'),
+    output_end_date=_AS_DATE_STRING.format('s.output_end_date')
+    )
+
+# Sql: active simulation job counts.
+_SQL_ACTIVE_JOB_COUNTS = """
+SELECT
+    s.id,
+    j.typeof,
+    j.execution_state,
+    count(s.id)
+FROM
+    monitoring.tbl_simulation AS s
+JOIN
+    monitoring.tbl_job AS j ON s.id = j.simulation_id
+WHERE
+    j.execution_start_date IS NOT NULL AND
+    j.execution_state IS NOT NULL AND
+    j.typeof IS NOT NULL AND
+    s.execution_start_date IS NOT NULL AND
+    s.is_obsolete = false
+    {}
+GROUP BY
+    s.id, j.typeof, j.execution_state
+"""
+
+# Sql: latest active simulation jobs.
+_SQL_LATEST_ACTIVE_JOBS = """
+SELECT DISTINCT ON (s.id)
+    s.id,
+    j.typeof,
+    j.execution_state,
+    CAST(j.is_compute_end AS INTEGER),
+    CAST(j.is_error AS INTEGER),
+    {execution_start_date},
+    {execution_end_date},
+    j.warning_state,
+    {warning_limit}
+FROM
+    monitoring.tbl_simulation AS s
+JOIN
+    monitoring.tbl_job AS j ON s.id = j.simulation_id
+WHERE
+    j.execution_start_date IS NOT NULL AND
+    j.execution_state IS NOT NULL AND
+    j.typeof = %(job_type)s AND
+    s.execution_start_date IS NOT NULL AND
+    s.is_obsolete = false
+    {{}}
+ORDER BY
+    s.id, j.execution_start_date DESC
+""".format(
+    execution_start_date=_AS_DATETIME_STRING.format('j.execution_start_date'),
+    execution_end_date=_AS_DATETIME_STRING.format('j.execution_end_date'),
+    warning_limit=_AS_DATETIME_STRING.format('j.warning_limit')
+    )
+
+# Sql: latest active simulation job periods.
+_SQL_LATEST_ACTIVE_JOB_PERIODS = """
+SELECT
+    s.id,
+    max(jp.period_date_begin)
+FROM
+    monitoring.tbl_simulation AS s
+JOIN
+    monitoring.tbl_job_period AS jp ON s.id = jp.simulation_id
+WHERE
+    s.execution_start_date IS NOT NULL AND
+    s.is_obsolete = false
+    {}
+GROUP BY
+    s.id
+"""
+
+# Sql: simulation.
+_SQL_SIMULATION = """
+SELECT
+    {}
+FROM
+    monitoring.tbl_simulation AS s
+WHERE
+    s.uid = %(uid)s
+LIMIT 1
+""".format(",\n    ".join(_get_column(c, 's') for c in types.Simulation.__table__.columns))
+
+# Sql: simulation jobs (see dao_monitoring_job._get_job_raw_query).
+_SQL_SIMULATION_JOBS = """
+SELECT
+    {execution_end_date},
+    {execution_start_date},
+    j.execution_state,
+    j.id,
+    CAST(j.is_compute_end AS INTEGER),
+    CAST(j.is_error AS INTEGER),
+    CAST(j.is_im AS INTEGER),
+    j.typeof,
+    s.id,
+    j.accounting_project,
+    j.job_uid,
+    j.post_processing_component,
+    {post_processing_date},
+    j.post_processing_dimension,
+    j.post_processing_file,
+    j.post_processing_name,
+    j.scheduler_id,
+    j.submission_path,
+    j.warning_delay,
+    s.uid,
+    j.warning_state,
+    {warning_limit}
+FROM
+    monitoring.tbl_job AS j
+JOIN
+    monitoring.tbl_simulation AS s ON j.simulation_id = s.id
+WHERE
+    j.simulation_uid = %(uid)s AND
+    j.execution_start_date IS NOT NULL
+ORDER BY
+    j.execution_start_date
+""".format(
+    execution_end_date=_AS_DATETIME_STRING.format('j.execution_end_date'),
+    execution_start_date=_AS_DATETIME_STRING.format('j.execution_start_date'),
+    post_processing_date=_AS_DATE_STRING.format('j.post_processing_date'),
+    warning_limit=_AS_DATETIME_STRING.format('j.warning_limit')
+    )
+
+# Sql: simulation configuration card.
+_SQL_SIMULATION_CONFIGURATION_CARD = """
+SELECT
+    CASE cc.mime_type
+        WHEN 'application/base64' THEN translate(encode(cc.content, 'base64'), E'\\n', '')
+        ELSE convert_from(cc.content, coalesce(cc.encoding, 'utf-8'))
+    END
+FROM
+    monitoring.tbl_simulation_configuration AS sc
+JOIN
+    monitoring.tbl_configuration_card AS cc ON cc.id = sc.card_id
+WHERE
+    sc.simulation_uid = %(uid)s
+LIMIT 1
+"""
+
+# Sql: simulation previous tries.
+_SQL_SIMULATION_PREVIOUS_TRIES = """
+SELECT
+    s.try_id,
+    s.uid
+FROM
+    monitoring.tbl_simulation AS s
+WHERE
+    s.hashid = %(hashid)s AND
+    s.try_id < %(try_id)s
+"""
+
+# Sql: latest simulation job period.
+_SQL_LATEST_JOB_PERIOD = """
+SELECT
+    {}
+FROM
+    monitoring.tbl_job_period_range AS r
+JOIN
+    monitoring.tbl_job_period AS jp ON jp.id = r.last_job_period_id AND jp.row_create_date = r.last_job_period_date
+WHERE
+    r.simulation_uid = %(uid)s
+ORDER BY
+    r.last_period_date_begin DESC, r.last_job_period_id DESC
+LIMIT 1
+""".format(",\n    ".join(_get_column(c, 'jp') for c in types.JobPeriod.__table__.columns))
+
+# Sql: simulation has messages flag.
+_SQL_HAS_MESSAGES = """
+SELECT EXISTS (
+    SELECT
+        1
+    FROM
+        mq.tbl_message AS m
+    WHERE
+        m.correlation_id_1 = %(uid)s
+    )
+"""
+
+# Sql: simulation last update marker (see change_tracking.py).
+_SQL_SIMULATION_MARKER = """
+SELECT
+    s.id,
+    s.execution_end_date IS NOT NULL AS is_complete,
+    s.is_obsolete,
+    coalesce(c.change_seq, 0) AS change_seq,
+    coalesce(s.row_update_date, s.row_create_date) AS row_update_date
+    {}
+FROM
+    monitoring.tbl_simulation AS s
+LEFT JOIN
+    monitoring.tbl_simulation_change AS c ON c.simulation_id = s.id
+WHERE
+    s.uid = %(uid)s
+"""
+
+# Sql: simulation last update marker, extended with marker of latest message (messages are not change tracked).
+_SQL_SIMULATION_MARKER = {
+    False: _SQL_SIMULATION_MARKER.format(""),
+    True: _SQL_SIMULATION_MARKER.format(""",
+    (
+        SELECT
+            max(m.id)
+        FROM
+            mq.tbl_message AS m
+        WHERE
+            m.correlation_id_1 = %(uid)s
+    ) AS message_marker""")
+}
+
+
+def _compile_timeslice_statement(sql, date_filter=_FILTER_START_DATE, change_filter=""):
+    """Returns a timeslice statement compiled with & without the start date filter.
+
+    """
+    return {
+        False: sql.format(change_filter),
+        True: sql.format(date_filter + change_filter)
+    }
+
+
+# Timeslice delta statements keyed by whether they are filtered by start date.
+_SQL_ACTIVE_SIMULATIONS_DELTA = _compile_timeslice_statement(
+    _SQL_ACTIVE_SIMULATIONS, change_filter=_FILTER_CHANGED)
+_SQL_ACTIVE_JOB_COUNTS_DELTA = _compile_timeslice_statement(
+    _SQL_ACTIVE_JOB_COUNTS, change_filter=_FILTER_CHANGED)
+_SQL_LATEST_ACTIVE_JOBS_DELTA = _compile_timeslice_statement(
+    _SQL_LATEST_ACTIVE_JOBS, change_filter=_FILTER_CHANGED)
+_SQL_LATEST_ACTIVE_JOB_PERIODS_DELTA = _compile_timeslice_statement(
+    _SQL_LATEST_ACTIVE_JOB_PERIODS, _FILTER_JOB_PERIOD_START_DATE, _FILTER_CHANGED)
+
+# Timeslice statements keyed by whether they are filtered by start date.
+_SQL_ACTIVE_SIMULATIONS = _compile_timeslice_statement(_SQL_ACTIVE_SIMULATIONS)
+_SQL_ACTIVE_JOB_COUNTS = _compile_timeslice_statement(_SQL_ACTIVE_JOB_COUNTS)
+_SQL_LATEST_ACTIVE_JOBS = _compile_timeslice_statement(_SQL_LATEST_ACTIVE_JOBS)
+_SQL_LATEST_ACTIVE_JOB_PERIODS = _compile_timeslice_statement(_SQL_LATEST_ACTIVE_JOB_PERIODS,
+                                                              _FILTER_JOB_PERIOD_START_DATE)
+
+# Sql: changed simulations no longer within a timeslice, i.e. obsolete, deleted or out of window.
+_SQL_REMOVED_SIMULATIONS = {
+    i: """
+SELECT
+    coalesce(json_agg(c.simulation_id), '[]'::json)
+FROM
+    ({changed}) AS c
+WHERE
+    NOT EXISTS (
+        SELECT
+            1
+        FROM
+            monitoring.tbl_simulation AS s
+        WHERE
+            s.id = c.simulation_id AND
+            s.execution_start_date IS NOT NULL AND
+            s.is_obsolete = false
+            {date_filter}
+        )
+""".format(
+    changed=_SQL_CHANGED_SIMULATIONS,
+    date_filter=_FILTER_START_DATE if i else ""
+    ) for i in (False, True)
+}
+
+
+def _as_json_array(sql, width, order_by=None):
+    """Returns a scalar sub-query aggregating a statement's result rows into a json array of arrays.
+
+    """
+    columns = ["q.c{}".format(i) for i in range(width)]
+
+    return "(SELECT coalesce(json_agg(json_build_array({}){}), '[]'::json) FROM ({}) AS q({}))".format(
+        ", ".join(columns),
+        "" if order_by is None else " ORDER BY q.c{}".format(order_by),
+        sql,
+        ", ".join(i[2:] for i in columns)
+        )
+
+
+def _as_json_object(etype, alias):
+    """Returns an expression building a json object from an entity's columns.
+
+    Object keys & values are formatted exactly as per data_convertor.convert.
+
+    """
+    def _get_value(column):
+        value = _get_column(column, alias)
+
+        return _AS_ISO_DATETIME_STRING.format(value) if isinstance(column.type, sa.DateTime) else value
+
+    return "json_build_object({})".format(", ".join(
+        "'{}', {}".format(to_camel_case(c.name), _get_value(c)) for c in etype.__table__.columns
+        ))
+
+
+# Sql: timeslice payload as json (see fetch_timeslice endpoint).
+_SQL_TIMESLICE_JSON = {
+    i: """
+SELECT
+    json_build_object(
+        'cursor', {cursor},
+        'jobCounts', {job_counts},
+        'jobPeriodList', {job_periods},
+        'simulationList', {simulations},
+        'latestComputeJobs', {latest_compute_jobs}
+    )::text
+""".format(
+    cursor=change_tracking.SQL_CURSOR,
+    job_counts=_as_json_array(_SQL_ACTIVE_JOB_COUNTS[i], 4),
+    job_periods=_as_json_array(_SQL_LATEST_ACTIVE_JOB_PERIODS[i], 2),
+    simulations=_as_json_array(_SQL_ACTIVE_SIMULATIONS[i], 20, "4 DESC"),
+    latest_compute_jobs=_as_json_array(_SQL_LATEST_ACTIVE_JOBS[i], 9)
+    ) for i in (False, True)
+}
+
+# Sql: timeslice delta payload as json (see fetch_timeslice endpoint).
+_SQL_TIMESLICE_DELTA_JSON = {
+    i: """
+SELECT
+    json_build_object(
+        'cursor', {cursor},
+        'jobCounts', {job_counts},
+        'jobPeriodList', {job_periods},
+        'simulationList', {simulations},
+        'latestComputeJobs', {latest_compute_jobs},
+        'removedSimulationList', ({removed_simulations})
+    )::text
+""".format(
+    cursor=change_tracking.SQL_CURSOR,
+    job_counts=_as_json_array(_SQL_ACTIVE_JOB_COUNTS_DELTA[i], 4),
+    job_periods=_as_json_array(_SQL_LATEST_ACTIVE_JOB_PERIODS_DELTA[i], 2),
+    simulations=_as_json_array(_SQL_ACTIVE_SIMULATIONS_DELTA[i], 20, "4 DESC"),
+    latest_compute_jobs=_as_json_array(_SQL_LATEST_ACTIVE_JOBS_DELTA[i], 9),
+    removed_simulations=_SQL_REMOVED_SIMULATIONS[i]
+    ) for i in (False, True)
+}
+
+# Sql: simulation detail payload as json (see fetch_detail endpoint).
+_SQL_SIMULATION_DETAIL_JSON = """
+SELECT
+    json_build_object(
+        'configCard', ({config_card}),
+        'hasMessages', ({has_messages}),
+        'jobList', {job_list},
+        'latestJobPeriod', (
+            SELECT
+                {job_period}
+            FROM
+                monitoring.tbl_job_period_range AS r
+            JOIN
+                monitoring.tbl_job_period AS jp ON jp.id = r.last_job_period_id AND jp.row_create_date = r.last_job_period_date
+            WHERE
+                r.simulation_uid = s.uid
+            ORDER BY
+                r.last_period_date_begin DESC, r.last_job_period_id DESC
+            LIMIT 1
+            ),
+        'previousTries', {previous_tries},
+        'simulation', {simulation}
+    )::text
+FROM
+    monitoring.tbl_simulation AS s
+WHERE
+    s.uid = %(uid)s
+LIMIT 1
+""".format(
+    config_card=_SQL_SIMULATION_CONFIGURATION_CARD,
+    has_messages=_SQL_HAS_MESSAGES,
+    job_list=_as_json_array(_SQL_SIMULATION_JOBS, 22, 1),
+    job_period=_as_json_object(types.JobPeriod, 'jp'),
+    previous_tries=_as_json_array("""
+SELECT
+    s1.try_id,
+    s1.uid
+FROM
+    monitoring.tbl_simulation AS s1
+WHERE
+    s1.hashid = s.hashid AND
+    s1.try_id < s.try_id
+""", 2),
+    simulation=_as_json_object(types.Simulation, 's')
+    )
+
+
+def _exec_timeslice(statements, start_date, params=None):
+    """Executes a timeslice statement.
+
+    """
+    params = dict(params or {},
+                  start_date=start_date,
+                  partition_start_date=partitioning.get_pruning_date(start_date))
+
+    return fastpath.execute(statements[start_date is not None], params)
+
+
+@decorators.validate(validator.validate_retrieve_active_simulations)
+def retrieve_active_simulations(start_date=None):
+    """Retrieves active simulation details from db.
+
+    :param datetime.datetime start_date: Simulation execution start date.
+
+    :returns: Simulation details.
+    :rtype: list
+
+    """
+    return _exec_timeslice(_SQL_ACTIVE_SIMULATIONS, start_date)
+
+
+@decorators.validate(validator.validate_retrieve_active_simulations)
+def stream_active_simulations(start_date=None):
+    """Streams active simulation details from db.
+
+    :param datetime.datetime start_date: Simulation execution start date.
+
+    :returns: Generator of simulation details.
+    :rtype: generator
+
+    """
+    sql = _SQL_ACTIVE_SIMULATIONS[start_date is not None]
+
+    return fastpath.stream(sql, {'start_date': start_date})
+
+
+def retrieve_active_job_counts(start_date=None):
+    """Returns active simulation job counts.
+
+    :param datetime.datetime start_date: Job execution start date.
+
+    :returns: Job counts grouped by simulation, job type, job state.
+    :rtype: list
+
+    """
+    return _exec_timeslice(_SQL_ACTIVE_JOB_COUNTS, start_date)
+
+
+def retrieve_latest_active_jobs(start_date=None):
+    """Returns set of latest compute jobs for active simulations.
+
+    :param datetime.datetime start_date: Job execution start date.
+
+    :returns: Job details.
+    :rtype: list
+
+    """
+    return _exec_timeslice(_SQL_LATEST_ACTIVE_JOBS, start_date, {'job_type': JOB_TYPE_COMPUTING})
+
+
+@decorators.validate(validator.validate_retrieve_latest_active_job_periods)
+def retrieve_latest_active_job_periods(start_date=None):
+    """Retrieves latest active job period update details from db.
+
+    :param datetime.datetime start_date: Job execution start date.
+
+    :returns: Job period details.
+    :rtype: list
+
+    """
+    return _exec_timeslice(_SQL_LATEST_ACTIVE_JOB_PERIODS, start_date)
+
+
+@decorators.validate(validator.validate_retrieve_simulation)
+def retrieve_simulation(uid):
+    """Retrieves simulation details from db.
+
+    :param str uid: UID of simulation.
+
+    :returns: Simulation details keyed by column name.
+    :rtype: dict
+
+    """
+    return fastpath.execute_one(_SQL_SIMULATION, {'uid': unicode(uid)}, fastpath.LAYOUT_RECORDS)
+
+
+@decorators.validate(validator.validate_retrieve_simulation_jobs)
+def retrieve_simulation_jobs(uid):
+    """Retrieves job details from db.
+
+    :param str uid: UID of simulation.
+
+    :returns: List of jobs associated with a simulation.
+    :rtype: list
+
+    """
+    return fastpath.execute(_SQL_SIMULATION_JOBS, {'uid': unicode(uid)})
+
+
+@decorators.validate(validator.validate_retrieve_simulation_configuration)
+def retrieve_simulation_configuration_card(uid):
+    """Retrieves a simulation's configuration card from db.
+
+    :param str uid: UID of simulation.
+
+    :returns: Simulation configuration card.
+    :rtype: unicode
+
+    """
+    row = fastpath.execute_one(_SQL_SIMULATION_CONFIGURATION_CARD, {'uid': unicode(uid)})
+
+    return row[0] if row else None
+
+
+@decorators.validate(validator.validate_retrieve_simulation_previous_tries)
+def retrieve_simulation_previous_tries(hashid, try_id):
+    """Retrieves try identifiers & uid's of a simulation's previous tries.
+
+    :param str hashid: Simulation hash identifier.
+    :param int try_id: Simulation try identifier.
+
+    :returns: List of try identifiers and simulation uid's.
+    :rtype: list
+
+    """
+    return fastpath.execute(_SQL_SIMULATION_PREVIOUS_TRIES, {
+        'hashid': unicode(hashid),
+        'try_id': int(try_id)
+        })
+
+
+@decorators.validate(validator.validate_retrieve_latest_job_periods)
+def retrieve_latest_job_period(uid):
+    """Retrieves details of a simulation's most recent job period update.
+
+    :param str uid: UID of simulation.
+
+    :returns: Job period details keyed by column name.
+    :rtype: dict
+
+    """
+    return fastpath.execute_one(_SQL_LATEST_JOB_PERIOD, {'uid': unicode(uid)}, fastpath.LAYOUT_RECORDS)
+
+
+@decorators.validate(validator.validate_retrieve_simulation_marker)
+def retrieve_simulation_marker(uid, include_messages=False):
+    """Retrieves marker of a simulation's last update, i.e. of changes to simulation, jobs or job periods.
+
+    :param str uid: UID of simulation.
+    :param bool include_messages: Flag indicating whether marker is to be extended to simulation messages.
+
+    :returns: Simulation id, completion & obsolescence flags and last update marker keyed by column name.
+    :rtype: dict
+
+    """
+    return fastpath.execute_one(_SQL_SIMULATION_MARKER[include_messages],
+                                {'uid': unicode(uid)}, fastpath.LAYOUT_RECORDS)
+
+
+def has_messages(uid):
+    """Retrieves boolean indicating whether a simulation has at least one messages in the db.
+
+    :param str uid: UID of simulation.
+
+    :returns: True if simulation has >= 1 message, false otherwise.
+    :rtype: bool
+
+    """
+    return fastpath.execute_one(_SQL_HAS_MESSAGES, {'uid': unicode(uid)})[0]
+
+
+@decorators.validate(validator.validate_retrieve_active_simulations)
+def retrieve_timeslice_json(start_date=None):
+    """Retrieves a timeslice of active simulations assembled by the db as a json document.
+
+    :param datetime.datetime start_date: Simulation execution start date.
+
+    :returns: Serialised json document (see fetch_timeslice endpoint).
+    :rtype: unicode
+
+    """
+    return _exec_timeslice(_SQL_TIMESLICE_JSON, start_date, {'job_type': JOB_TYPE_COMPUTING})[0][0]
+
+
+@decorators.validate(validator.validate_retrieve_active_simulations)
+def stream_timeslice(start_date=None):
+    """Streams a timeslice of active simulations (see retrieve_timeslice_json).
+
+    N.B. Statements are executed as each stream is consumed, i.e. within the db session.
+
+    :param datetime.datetime start_date: Simulation execution start date.
+
+    :returns: Sequence of (payload key, value or generator of rows) pairs.
+    :rtype: list
+
+    """
+    params = {
+        'job_type': JOB_TYPE_COMPUTING,
+        'start_date': start_date,
+        'partition_start_date': partitioning.get_pruning_date(start_date)
+    }
+    idx = start_date is not None
+
+    return [
+        ('cursor', change_tracking.get_cursor()),
+        ('jobCounts', fastpath.stream(_SQL_ACTIVE_JOB_COUNTS[idx], params)),
+        ('jobPeriodList', fastpath.stream(_SQL_LATEST_ACTIVE_JOB_PERIODS[idx], params)),
+        ('simulationList', fastpath.stream(_SQL_ACTIVE_SIMULATIONS[idx], params)),
+        ('latestComputeJobs', fastpath.stream(_SQL_LATEST_ACTIVE_JOBS[idx], params))
+    ]
+
+
+@decorators.validate(validator.validate_retrieve_timeslice_delta_json)
+def retrieve_timeslice_delta_json(since, start_date=None):
+    """Retrieves changes to a timeslice of active simulations assembled by the db as a json document.
+
+    Changed simulations are returned in full (as per retrieve_timeslice_json) whilst
+    changed simulations no longer within the timeslice are returned as removed.
+
+    :param long since: Change log cursor returned by a previous timeslice / timeslice delta.
+    :param datetime.datetime start_date: Simulation execution start date.
+
+    :returns: Serialised json document (see fetch_timeslice endpoint).
+    :rtype: unicode
+
+    """
+    return _exec_timeslice(_SQL_TIMESLICE_DELTA_JSON, start_date, {
+        'job_type': JOB_TYPE_COMPUTING,
+        'since': long(since)
+        })[0][0]
+
+
+@decorators.validate(validator.validate_retrieve_simulation)
+def retrieve_simulation_detail_json(uid):
+    """Retrieves simulation details assembled by the db as a json document.
+
+    :param str uid: UID of simulation.
+
+    :returns: Serialised json document (see fetch_detail endpoint) or None if simulation does not exist.
+    :rtype: unicode
+
+    """
+    row = fastpath.execute_one(_SQL_SIMULATION_DETAIL_JSON, {'uid': unicode(uid)})
+
+    return row[0] if row else None
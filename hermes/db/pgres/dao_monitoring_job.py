@@ -14,12 +14,17 @@
 import datetime
 
 import arrow
+from sqlalchemy import and_
+from sqlalchemy import bindparam
 from sqlalchemy import cast
 from sqlalchemy import func
 from sqlalchemy import Integer
 
 from hermes.cv.constants import JOB_TYPE_COMPUTING
+from hermes.db.pgres import cache
+from hermes.db.pgres import compaction
 from hermes.db.pgres import dao
+from hermes.db.pgres import partitioning
 from hermes.db.pgres import session
 from hermes.db.pgres import types
 from hermes.db.pgres import validator_dao_monitoring as validator
@@ -29,6 +34,56 @@ from hermes.db.pgres.convertor import as_datetime_string
 from hermes.utils import decorators
 
 
+
+# Baked query: job by uid.
+_BQ_JOB = session.bake(lambda sa_session: sa_session.query(types.Job))
+_BQ_JOB += lambda q: q.filter(types.Job.job_uid == bindparam('uid'))
+
+# Baked query: simulation's latest job period (resolved via the simulation's latest job period range).
+_BQ_LATEST_JOB_PERIOD = session.bake(lambda sa_session: sa_session.query(types.JobPeriod))
+_BQ_LATEST_JOB_PERIOD += lambda q: q.join(types.JobPeriodRange, and_(
+    types.JobPeriod.id == types.JobPeriodRange.last_job_period_id,
+    types.JobPeriod.row_create_date == types.JobPeriodRange.last_job_period_date
+    ))
+_BQ_LATEST_JOB_PERIOD += lambda q: q.filter(types.JobPeriodRange.simulation_uid == bindparam('uid'))
+_BQ_LATEST_JOB_PERIOD += lambda q: q.order_by(types.JobPeriodRange.last_period_date_begin.desc(),
+                                                  types.JobPeriodRange.last_job_period_id.desc())
+
+# Baked query: simulation's latest job period identifier & count of reports thereof.
+_BQ_LATEST_JOB_PERIOD_COUNTER = session.bake(lambda sa_session: _get_latest_job_period_counter_query(sa_session))
+
+# Baked query: job info by uid.
+_BQ_JOB_INFO = session.bake(lambda sa_session: sa_session.query(
+    types.Simulation.id,                                        #0
+    types.Job.typeof,                                           #1
+    types.Job.execution_state,                                  #2
+    cast(types.Job.is_compute_end, Integer),                    #3
+    cast(types.Job.is_error, Integer),                          #4
+    as_datetime_string(types.Job.execution_start_date),         #5
+    as_datetime_string(types.Job.execution_end_date)            #6
+    ))
+_BQ_JOB_INFO += lambda q: q.join(types.Job, types.Simulation.id == types.Job.simulation_id)
+_BQ_JOB_INFO += lambda q: q.filter(types.Job.job_uid == bindparam('uid'))
+
+# Baked query: simulation's jobs.
+_BQ_SIMULATION_JOBS = session.bake(lambda sa_session: _get_job_raw_query(sa_session))
+_BQ_SIMULATION_JOBS += lambda q: q.filter(types.Job.simulation_uid == bindparam('uid'))
+_BQ_SIMULATION_JOBS += lambda q: q.filter(types.Job.execution_start_date != None)
+_BQ_SIMULATION_JOBS += lambda q: q.order_by(types.Job.execution_start_date)
+
+
+def _get_simulation_id(simulation_uid):
+    """Returns a scalar sub-query resolving a simulation's surrogate key from its uid.
+
+    N.B. Evaluated within the insert/update statement so as to avoid a round trip.
+
+    """
+    qry = session.raw_query(types.Simulation.id)
+    qry = qry.filter(types.Simulation.uid == unicode(simulation_uid))
+
+    return qry.as_scalar()
+
+
 def retrieve_active_job_counts(start_date=None):
     """Returns active simulation job counts.
 
@@ -46,7 +101,7 @@ def retrieve_active_job_counts(start_date=None):
         j.execution_state,
         func.count(s.id)
         )
-    qry = qry.join(j, s.uid == j.simulation_uid)
+    qry = qry.join(j, s.id == j.simulation_id)
 
     qry = qry.group_by(s.id, j.typeof, j.execution_state)
 
@@ -76,10 +131,28 @@ def retrieve_latest_active_jobs(
     :returns: Job details.
     :rtype: list
 
+    """
+    s = types.Simulation
+
+    bq = session.bake(_get_latest_active_jobs_query)
+    if start_date is not None:
+        bq += lambda q: q.filter(s.execution_start_date >= bindparam('start_date'))
+    if simulation_uid is not None:
+        bq += lambda q: q.filter(s.uid == bindparam('simulation_uid'))
+
+    return session.exec_baked(bq,
+                              job_type=job_type,
+                              start_date=start_date,
+                              simulation_uid=simulation_uid).all()
+
+
+def _get_latest_active_jobs_query(sa_session):
+    """Returns query over latest jobs for active simulations (see retrieve_latest_active_jobs).
+
     """
     j = types.Job
     s = types.Simulation
-    qry = session.raw_query(
+    qry = sa_session.query(
         s.id,                                           #0
         j.typeof,                                       #1
         j.execution_state,                              #2
@@ -90,23 +163,19 @@ def retrieve_latest_active_jobs(
         j.warning_state,                                #7
         as_datetime_string(j.warning_limit)             #8
         )
-    qry = qry.join(j, s.uid == j.simulation_uid)
+    qry = qry.join(j, s.id == j.simulation_id)
 
     qry = qry.distinct(s.id)
     qry = qry.order_by(s.id, j.execution_start_date.desc())
 
     qry = qry.filter(j.execution_start_date != None)
     qry = qry.filter(j.execution_state != None)
-    qry = qry.filter(j.typeof == job_type)
+    qry = qry.filter(j.typeof == bindparam('job_type'))
 
     qry = qry.filter(s.execution_start_date != None)
     qry = qry.filter(s.is_obsolete == False)
-    if start_date is not None:
-        qry = qry.filter(s.execution_start_date >= start_date)
-    if simulation_uid is not None:
-        qry = qry.filter(s.uid == simulation_uid)
 
-    return qry.all()
+    return qry
 
 
 @decorators.validate(validator.validate_retrieve_latest_active_job_periods)
@@ -125,7 +194,7 @@ def retrieve_latest_active_job_periods(start_date=None):
         s.id,
         func.max(jp.period_date_begin)
         )
-    qry = qry.join(jp, s.uid == jp.simulation_uid)
+    qry = qry.join(jp, s.id == jp.simulation_id)
 
     qry = qry.group_by(s.id)
 
@@ -133,6 +202,7 @@ def retrieve_latest_active_job_periods(start_date=None):
     qry = qry.filter(s.is_obsolete == False)
     if start_date is not None:
         qry = qry.filter(s.execution_start_date >= start_date)
+        qry = qry.filter(jp.row_create_date >= partitioning.get_pruning_date(start_date))
 
     return qry.all()
 
@@ -147,14 +217,17 @@ def retrieve_job(uid):
     :rtype: types.monitoring.Job
 
     """
-    j = types.Job
+    return cache.retrieve(cache.REGION_JOB, unicode(uid), lambda: _retrieve_job(uid))
 
-    qry = session.query(j)
-    qry = qry.filter(j.job_uid == unicode(uid))
 
-    return qry.first()
+def _retrieve_job(uid):
+    """Retrieves job details from db, i.e. bypassing cache.
 
+    """
+    return session.exec_baked(_BQ_JOB, uid=unicode(uid)).first()
 
+
+@decorators.validate(validator.validate_retrieve_jobs_by_interval)
 def retrieve_jobs_by_interval(interval_start, interval_end):
     """Retrieves collection of jobs filtered by start datae interval.
 
@@ -174,6 +247,26 @@ def retrieve_jobs_by_interval(interval_start, interval_end):
     return qry.all()
 
 
+@decorators.validate(validator.validate_retrieve_jobs_by_interval)
+def stream_jobs_by_interval(interval_start, interval_end):
+    """Streams collection of jobs filtered by start date interval.
+
+    :param datetime interval_start: Interval start date.
+    :param datetime interval_end: Interval end date.
+
+    :returns: Generator of named tuples, one field per job column.
+    :rtype: generator
+
+    """
+    j = types.Job
+
+    qry = session.raw_query(*j.__table__.columns)
+    qry = qry.filter(j.execution_start_date >= interval_start)
+    qry = qry.filter(j.execution_start_date < interval_end)
+
+    return session.stream(qry)
+
+
 @decorators.validate(validator.validate_retrieve_latest_job_periods)
 def retrieve_latest_job_period(uid):
     """Retrieves details of a simulation's most recent job period update.
@@ -184,13 +277,7 @@ def retrieve_latest_job_period(uid):
     :rtype: list
 
     """
-    jp = types.JobPeriod
-
-    qry = session.raw_query(jp)
-    qry = qry.filter(jp.simulation_uid == unicode(uid))
-    qry = qry.order_by(jp.period_date_begin.desc())
-
-    return qry.first()
+    return session.exec_baked(_BQ_LATEST_JOB_PERIOD, uid=unicode(uid)).first()
 
 
 @decorators.validate(validator.validate_retrieve_latest_job_period_counter)
@@ -203,24 +290,43 @@ def retrieve_latest_job_period_counter(uid):
     :rtype: list
 
     """
-    jp = types.JobPeriod
+    row = session.exec_baked(_BQ_LATEST_JOB_PERIOD_COUNTER, uid=unicode(uid)).first()
+
+    return (row[0], int(row[1])) if row else (0, 0)
 
-    qry = session.raw_query(jp.period_id)
-    qry = qry.filter(jp.simulation_uid == unicode(uid))
-    qry = qry.order_by(jp.period_date_begin.desc())
-    rows = qry.all()
 
-    return (rows[0][0], rows.count(rows[0])) if rows else (0, 0)
+def _get_latest_job_period_counter_query(sa_session):
+    """Returns query over a simulation's latest job period counter (see retrieve_latest_job_period_counter).
 
+    A period reported by several jobs (i.e. resubmissions) ends several ranges, hence counts are summed.
+
+    """
+    r = types.JobPeriodRange
+
+    latest = sa_session.query(r.period_id_last)
+    latest = latest.filter(r.simulation_uid == bindparam('uid'))
+    latest = latest.order_by(r.last_period_date_begin.desc(), r.last_job_period_id.desc())
+    latest = latest.limit(1)
+
+    qry = sa_session.query(
+        r.period_id_last,
+        func.sum(r.last_period_count)
+        )
+    qry = qry.filter(r.simulation_uid == bindparam('uid'))
+    qry = qry.filter(r.period_id_last == latest.as_scalar())
+    qry = qry.group_by(r.period_id_last)
 
-def _get_job_raw_query():
+    return qry
+
+
+def _get_job_raw_query(sa_session):
     """Returns a raw query over job table.
 
     """
     j = types.Job
     s = types.Simulation
 
-    qry = session.raw_query(
+    qry = sa_session.query(
         # ... core fields
         as_datetime_string(j.execution_end_date),       #0
         as_datetime_string(j.execution_start_date),     #1
@@ -246,7 +352,7 @@ def _get_job_raw_query():
         j.warning_state,                                #20
         as_datetime_string(j.warning_limit)             #21
         )
-    qry = qry.join(s, j.simulation_uid == s.uid)
+    qry = qry.join(s, j.simulation_id == s.id)
 
     return qry
 
@@ -261,21 +367,7 @@ def retrieve_job_info(uid):
     :rtype: tuple
 
     """
-    j = types.Job
-    s = types.Simulation
-    qry = session.raw_query(
-        s.id,                                           #0
-        j.typeof,                                       #1
-        j.execution_state,                              #2
-        cast(j.is_compute_end, Integer),                #3
-        cast(j.is_error, Integer),                      #4
-        as_datetime_string(j.execution_start_date),     #5
-        as_datetime_string(j.execution_end_date)        #6
-        )
-    qry = qry.join(j, s.uid == j.simulation_uid)
-    qry = qry.filter(j.job_uid == unicode(uid))
-
-    return qry.first()
+    return session.exec_baked(_BQ_JOB_INFO, uid=unicode(uid)).first()
 
 
 @decorators.validate(validator.validate_retrieve_simulation_jobs)
@@ -288,14 +380,7 @@ def retrieve_simulation_jobs(uid):
     :rtype: list
 
     """
-    j = types.Job
-
-    qry = _get_job_raw_query()
-    qry = qry.filter(j.simulation_uid == unicode(uid))
-    qry = qry.filter(j.execution_start_date != None)
-    qry = qry.order_by(j.execution_start_date)
-
-    return qry.all()
+    return session.exec_baked(_BQ_SIMULATION_JOBS, uid=unicode(uid)).all()
 
 
 @decorators.validate(validator.validate_persist_job_start)
@@ -342,6 +427,8 @@ def persist_job_start(
         instance.typeof = unicode(job_type)
         instance.job_uid = unicode(job_uid)
         instance.simulation_uid = unicode(simulation_uid)
+        if instance.simulation_id is None:
+            instance.simulation_id = _get_simulation_id(simulation_uid)
         instance.warning_delay = int(warning_delay)
         instance.warning_limit = execution_start_date + datetime.timedelta(seconds=int(warning_delay))
         instance.execution_state = instance.get_execution_state()
@@ -365,7 +452,10 @@ def persist_job_start(
         if submission_path:
             instance.submission_path = unicode(submission_path)
 
-    return dao.persist(_assign, types.Job, lambda: retrieve_job(job_uid))
+    instance = dao.persist(_assign, types.Job, lambda: _retrieve_job(job_uid))
+    cache.invalidate(cache.REGION_JOB, unicode(job_uid))
+
+    return instance
 
 
 @decorators.validate(validator.validate_persist_job_end)
@@ -397,9 +487,34 @@ def persist_job_end(
         instance.is_error = is_error
         instance.job_uid = unicode(job_uid)
         instance.simulation_uid = unicode(simulation_uid)
+        if instance.simulation_id is None:
+            instance.simulation_id = _get_simulation_id(simulation_uid)
         instance.execution_state = instance.get_execution_state()
 
-    return dao.persist(_assign, types.Job, lambda: retrieve_job(job_uid))
+    instance = dao.persist(_assign, types.Job, lambda: _retrieve_job(job_uid))
+    _link_job_periods(instance)
+    cache.invalidate(cache.REGION_JOB, unicode(job_uid))
+
+    return instance
+
+
+def _link_job_periods(job):
+    """Assigns simulation surrogate key to those of a job's periods left unlinked.
+
+    N.B. a period persisted whilst its simulation is being persisted by another agent
+    is seen neither by the period's sub-query nor by the simulation's update
+    (see dao_monitoring_simulation._link_simulation), hence it is linked upon job end.
+
+    """
+    jp = types.JobPeriod
+
+    qry = session.query(jp)
+    qry = qry.filter(jp.job_uid == job.job_uid)
+    qry = qry.filter(jp.simulation_id == None)
+    if job.execution_start_date is not None:
+        qry = qry.filter(jp.row_create_date >= partitioning.get_pruning_date(job.execution_start_date))
+    qry.update({jp.simulation_id: _get_simulation_id(job.simulation_uid)}, synchronize_session=False)
+    session.commit()
 
 
 @decorators.validate(validator.validate_persist_late_job)
@@ -423,9 +538,34 @@ def persist_late_job(
         instance.warning_state = 1
         instance.job_uid = unicode(job_uid)
         instance.simulation_uid = unicode(simulation_uid)
+        if instance.simulation_id is None:
+            instance.simulation_id = _get_simulation_id(simulation_uid)
         instance.execution_state = instance.get_execution_state()
 
-    return dao.persist(_assign, types.Job, lambda: retrieve_job(job_uid))
+    instance = dao.persist(_assign, types.Job, lambda: _retrieve_job(job_uid))
+    cache.invalidate(cache.REGION_JOB, unicode(job_uid))
+
+    return instance
+
+
+def _retrieve_job_period(job_uid, period_id, period_date_begin, period_date_end):
+    """Retrieves a job period by its natural key.
+
+    N.B. a job's periods are inserted after it starts, hence preceding partitions are pruned.
+
+    """
+    jp = types.JobPeriod
+
+    qry = session.query(jp)
+    qry = qry.filter(jp.job_uid == unicode(job_uid))
+    qry = qry.filter(jp.period_id == period_id)
+    qry = qry.filter(jp.period_date_begin == period_date_begin)
+    qry = qry.filter(jp.period_date_end == period_date_end)
+    job = retrieve_job(job_uid)
+    if job is not None and job.execution_start_date is not None:
+        qry = qry.filter(jp.row_create_date >= partitioning.get_pruning_date(job.execution_start_date))
+
+    return qry.first()
 
 
 @decorators.validate(validator.validate_persist_job_period)
@@ -444,18 +584,28 @@ def persist_job_period(
     :param int period_date_begin: Date upon which job period began.
     :param int period_date_end: Date upon which job period ended.
 
-    :returns: A new job period instance.
+    :returns: A new job period instance (or the existing instance if the period is redelivered).
     :rtype: types.JobPeriod
 
     """
+    # Skip duplicates, i.e. the unique constraint is only enforced per partition.
+    instance = _retrieve_job_period(job_uid, period_id, period_date_begin, period_date_end)
+    if instance is not None:
+        return instance
+
     instance = types.JobPeriod()
     instance.simulation_uid = unicode(simulation_uid)
+    instance.simulation_id = _get_simulation_id(simulation_uid)
     instance.job_uid = unicode(job_uid)
     instance.period_date_begin = period_date_begin
     instance.period_date_end = period_date_end
     instance.period_id = period_id
+    session.insert(instance, auto_commit=False)
+    session.flush()
+    compaction.update_range(instance)
+    session.commit()
 
-    return session.insert(instance)
+    return instance
 
 
 def get_earliest_job():
@@ -11,21 +11,96 @@
 
 
 """
+import hashlib
+
+from sqlalchemy import bindparam
 from sqlalchemy import cast
+from sqlalchemy import exists
 from sqlalchemy import func
 from sqlalchemy import Integer
 
 from hermes.cv.constants import JOB_TYPE_COMPUTING
+from hermes.db.pgres import cache
 from hermes.db.pgres import dao
 from hermes.db.pgres import session
 from hermes.db.pgres import types
 from hermes.db.pgres import validator_dao_monitoring as validator
 from hermes.db.pgres.convertor import as_date_string
 from hermes.db.pgres.convertor import as_datetime_string
+from hermes.utils import config_card
 from hermes.utils import decorators
 
 
 
+# Tables (and simulation uid column) from which simulation data is purged.
+_PURGE_TARGETS = (
+    (types.EnvironmentMetric, types.EnvironmentMetric.simulation_uid),
+    (types.Job, types.Job.simulation_uid),
+    (types.JobPeriod, types.JobPeriod.simulation_uid),
+    (types.JobPeriodRange, types.JobPeriodRange.simulation_uid),
+    (types.SimulationConfiguration, types.SimulationConfiguration.simulation_uid),
+    (types.Message, types.Message.correlation_id_1),
+    (types.Supervision, types.Supervision.simulation_uid),
+    (types.Simulation, types.Simulation.uid)
+    )
+
+# Baked query: simulation by uid.
+_BQ_SIMULATION = session.bake(lambda sa_session: sa_session.query(types.Simulation))
+_BQ_SIMULATION += lambda q: q.filter(types.Simulation.uid == bindparam('uid'))
+
+# Baked query: active simulation by hashid.
+_BQ_ACTIVE_SIMULATION = session.bake(lambda sa_session: sa_session.query(types.Simulation))
+_BQ_ACTIVE_SIMULATION += lambda q: q.filter(types.Simulation.hashid == bindparam('hashid'))
+_BQ_ACTIVE_SIMULATION += lambda q: q.filter(types.Simulation.is_obsolete == False)
+
+# Baked query: simulations by hashid.
+_BQ_SIMULATIONS_BY_HASHID = session.bake(lambda sa_session: sa_session.query(types.Simulation))
+_BQ_SIMULATIONS_BY_HASHID += lambda q: q.filter(types.Simulation.hashid == bindparam('hashid'))
+
+# Baked query: simulation try.
+_BQ_SIMULATION_TRY = _BQ_SIMULATIONS_BY_HASHID + \
+                     (lambda q: q.filter(types.Simulation.try_id == bindparam('try_id')))
+
+# Baked query: simulation configuration by simulation uid.
+_BQ_SIMULATION_CONFIGURATION = session.bake(lambda sa_session: sa_session.query(types.SimulationConfiguration))
+_BQ_SIMULATION_CONFIGURATION += lambda q: q.filter(types.SimulationConfiguration.simulation_uid == bindparam('uid'))
+
+# Baked query: configuration card by hashid.
+_BQ_CONFIGURATION_CARD = session.bake(lambda sa_session: sa_session.query(types.ConfigurationCard))
+_BQ_CONFIGURATION_CARD += lambda q: q.filter(types.ConfigurationCard.hashid == bindparam('hashid'))
+
+# Baked query: simulation job counts.
+_BQ_SIMULATION_JOB_COUNTS = session.bake(lambda sa_session: sa_session.query(
+    types.Simulation.id,
+    types.Job.typeof,
+    types.Job.execution_state,
+    func.count(types.Simulation.id)
+    ))
+_BQ_SIMULATION_JOB_COUNTS += lambda q: q.join(types.Job, types.Simulation.id == types.Job.simulation_id)
+_BQ_SIMULATION_JOB_COUNTS += lambda q: q.group_by(types.Simulation.id, types.Job.typeof, types.Job.execution_state)
+_BQ_SIMULATION_JOB_COUNTS += lambda q: q.filter(types.Job.execution_start_date != None)
+_BQ_SIMULATION_JOB_COUNTS += lambda q: q.filter(types.Job.execution_state != None)
+_BQ_SIMULATION_JOB_COUNTS += lambda q: q.filter(types.Job.typeof != None)
+_BQ_SIMULATION_JOB_COUNTS += lambda q: q.filter(types.Simulation.uid == bindparam('uid'))
+
+# Baked query: simulation latest job.
+_BQ_SIMULATION_LATEST_JOB = session.bake(lambda sa_session: sa_session.query(
+    types.Simulation.id,                                        #0
+    types.Job.typeof,                                           #1
+    types.Job.execution_state,                                  #2
+    cast(types.Job.is_compute_end, Integer),                    #3
+    cast(types.Job.is_error, Integer),                          #4
+    as_datetime_string(types.Job.execution_start_date),         #5
+    as_datetime_string(types.Job.execution_end_date)            #6
+    ))
+_BQ_SIMULATION_LATEST_JOB += lambda q: q.join(types.Job, types.Simulation.id == types.Job.simulation_id)
+_BQ_SIMULATION_LATEST_JOB += lambda q: q.order_by(types.Job.execution_start_date.desc())
+_BQ_SIMULATION_LATEST_JOB += lambda q: q.filter(types.Job.execution_start_date != None)
+_BQ_SIMULATION_LATEST_JOB += lambda q: q.filter(types.Job.execution_state != None)
+_BQ_SIMULATION_LATEST_JOB += lambda q: q.filter(types.Job.typeof == bindparam('job_type'))
+_BQ_SIMULATION_LATEST_JOB += lambda q: q.filter(types.Simulation.uid == bindparam('uid'))
+
+
 @decorators.validate(validator.validate_retrieve_active_simulation)
 def retrieve_active_simulation(hashid):
     """Retrieves an active simulation from db.
@@ -36,13 +111,15 @@ def retrieve_active_simulation(hashid):
     :rtype: types.Simulation
 
     """
-    s = types.Simulation
+    return cache.retrieve(cache.REGION_ACTIVE_SIMULATION, unicode(hashid),
+                          lambda: _retrieve_active_simulation(hashid))
 
-    qry = session.query(s)
-    qry = qry.filter(s.hashid == hashid)
-    qry = qry.filter(s.is_obsolete == False)
 
-    return dao.exec_query(s, qry)
+def _retrieve_active_simulation(hashid):
+    """Retrieves an active simulation from db, i.e. bypassing cache.
+
+    """
+    return session.exec_baked(_BQ_ACTIVE_SIMULATION, hashid=unicode(hashid)).first()
 
 
 @decorators.validate(validator.validate_retrieve_active_simulations)
@@ -54,6 +131,26 @@ def retrieve_active_simulations(start_date=None):
     :returns: Simulation details.
     :rtype: list
 
+    """
+    return _get_active_simulations_query(start_date).all()
+
+
+@decorators.validate(validator.validate_retrieve_active_simulations)
+def stream_active_simulations(start_date=None):
+    """Streams active simulation details from db.
+
+    :param datetime.datetime start_date: Simulation execution start date.
+
+    :returns: Generator of simulation details.
+    :rtype: generator
+
+    """
+    return session.stream(_get_active_simulations_query(start_date))
+
+
+def _get_active_simulations_query(start_date):
+    """Returns query over active simulation details.
+
     """
     s = types.Simulation
     qry = session.raw_query(
@@ -84,7 +181,7 @@ def retrieve_active_simulations(start_date=None):
         qry = qry.filter(s.execution_start_date >= start_date)
     qry = qry.order_by(s.execution_start_date.desc())
 
-    return qry.all()
+    return qry
 
 
 @decorators.validate(validator.validate_retrieve_simulation)
@@ -97,11 +194,15 @@ def retrieve_simulation(uid):
     :rtype: types.monitoring.Simulation
 
     """
-    s = types.Simulation
+    return cache.retrieve(cache.REGION_SIMULATION, unicode(uid),
+                          lambda: _retrieve_simulation(uid))
 
-    qfilter = s.uid == unicode(uid)
 
-    return dao.get_by_facet(s, qfilter=qfilter)
+def _retrieve_simulation(uid):
+    """Retrieves simulation details from db, i.e. bypassing cache.
+
+    """
+    return session.exec_baked(_BQ_SIMULATION, uid=unicode(uid)).first()
 
 
 # @decorators.validate(validator.validate_retrieve_simulations_by_hashid)
@@ -114,11 +215,9 @@ def retrieve_simulations_by_hashid(hashid):
     :rtype: types.monitoring.Simulation
 
     """
-    s = types.Simulation
-
-    qfilter = s.hashid == unicode(hashid)
+    simulations = session.exec_baked(_BQ_SIMULATIONS_BY_HASHID, hashid=unicode(hashid)).all()
 
-    return dao.get_by_facet(s, qfilter=qfilter, get_iterable=True)
+    return dao.sort(types.Simulation, simulations)
 
 
 @decorators.validate(validator.validate_retrieve_simulation_try)
@@ -132,13 +231,7 @@ def retrieve_simulation_try(hashid, try_id):
     :rtype: types.monitoring.Simulation
 
     """
-    s = types.Simulation
-
-    qry = session.query(s)
-    qry = qry.filter(s.hashid == unicode(hashid))
-    qry = qry.filter(s.try_id == int(try_id))
-
-    return dao.exec_query(s, qry)
+    return session.exec_baked(_BQ_SIMULATION_TRY, hashid=unicode(hashid), try_id=int(try_id)).first()
 
 
 @decorators.validate(validator.validate_retrieve_simulation_previous_tries)
@@ -174,9 +267,7 @@ def retrieve_simulation_configuration(uid):
     :rtype: types.monitoring.SimulationConfiguration
 
     """
-    qfilter = types.SimulationConfiguration.simulation_uid == unicode(uid)
-
-    return dao.get_by_facet(types.SimulationConfiguration, qfilter=qfilter)
+    return session.exec_baked(_BQ_SIMULATION_CONFIGURATION, uid=unicode(uid)).first()
 
 
 @decorators.validate(validator.validate_persist_simulation_start)
@@ -265,7 +356,28 @@ def persist_simulation_start(
         if storage_small_path:
             instance.storage_small_path = unicode(storage_small_path)
 
-    return dao.persist(_assign, types.Simulation, lambda: retrieve_simulation(uid))
+    instance = dao.persist(_assign, types.Simulation, lambda: _retrieve_simulation(uid))
+    _link_simulation(instance)
+    cache.invalidate_simulations([unicode(uid)])
+    cache.invalidate(cache.REGION_ACTIVE_SIMULATION, instance.hashid)
+
+    return instance
+
+
+def _link_simulation(instance):
+    """Assigns a simulation's surrogate key to those of its jobs & job periods persisted before it.
+
+    N.B. changes are flushed within, & committed by, the caller's transaction.  Invoked
+    upon simulation start & again upon simulation end so as to link rows persisted
+    whilst the simulation start was being persisted (see dao_monitoring_job._link_job_periods).
+
+    """
+    for etype in (types.Job, types.JobPeriod):
+        qry = session.query(etype)
+        qry = qry.filter(etype.simulation_uid == instance.uid)
+        qry = qry.filter(etype.simulation_id == None)
+        qry.update({etype.simulation_id: instance.id}, synchronize_session=False)
+    session.flush()
 
 
 @decorators.validate(validator.validate_persist_simulation_end)
@@ -288,7 +400,12 @@ def persist_simulation_end(execution_end_date, is_error, uid):
         instance.is_error = is_error
         instance.uid = unicode(uid)
 
-    return dao.persist(_assign, types.Simulation, lambda: retrieve_simulation(uid))
+    instance = dao.persist(_assign, types.Simulation, lambda: _retrieve_simulation(uid))
+    _link_simulation(instance)
+    session.commit()
+    cache.invalidate_simulations([unicode(uid)])
+
+    return instance
 
 
 def update_simulation_im_flag(uid, is_im):
@@ -298,31 +415,87 @@ def update_simulation_im_flag(uid, is_im):
     :param bool is_im: Flag indicating whether the simulation has inter-monitoring jobs.
 
     """
-    instance = retrieve_simulation(uid)
+    instance = _retrieve_simulation(uid)
     if instance:
         instance.is_im = is_im
+        cache.invalidate_simulations([unicode(uid)])
 
     return instance
 
 
+@decorators.validate(validator.validate_update_simulation_card_fields)
+def update_simulation_card_fields(uid, fields):
+    """Updates a simulation's fields derived from its configuration card.
+
+    :param str uid: Simulation unique identifier.
+    :param dict fields: Map of simulation field to value (see utils.config_card).
+
+    """
+    instance = _retrieve_simulation(uid)
+    if instance:
+        for field, value in fields.items():
+            setattr(instance, field, value)
+        cache.invalidate_simulations([unicode(uid)])
+
+    return instance
+
+
+@decorators.validate(validator.validate_update_simulations_card_fields)
+def update_simulations_card_fields(mappings):
+    """Bulk updates simulation fields derived from configuration cards.
+
+    :param list mappings: Maps of simulation field to value, each including the simulation id.
+
+    """
+    session.bulk_update(types.Simulation, mappings, auto_commit=False)
+    cache.clear()
+
+
 @decorators.validate(validator.validate_persist_simulation_configuration)
 def persist_simulation_configuration(uid, card):
     """Persists a new simulation configuration db record.
 
+    N.B. Card content is stored once, identical cards (e.g. restarts, ensemble members) are shared.
+
     :param str uid: Simulation UID.
     :param str card: Simulation configuration card.
 
     """
+    configuration_card = _persist_configuration_card(card)
+
     def _assign(instance):
         """Assigns instance values from input parameters.
 
         """
         instance.simulation_uid = unicode(uid)
-        instance.card = unicode(card)
+        instance.card_id = configuration_card.id
 
     return dao.persist(_assign, types.SimulationConfiguration, lambda: retrieve_simulation_configuration(uid))
 
 
+def _persist_configuration_card(card):
+    """Returns configuration card db record, persisting it if its content has not been seen before.
+
+    """
+    content, mime_type = config_card.get_content(card)
+    hashid = unicode(hashlib.sha256(content).hexdigest())
+    retriever = lambda: session.exec_baked(_BQ_CONFIGURATION_CARD, hashid=hashid).first()
+
+    instance = retriever()
+    if instance is None:
+        def _assign(instance):
+            """Assigns instance values from input parameters.
+
+            """
+            instance.content = content
+            instance.hashid = hashid
+            instance.mime_type = mime_type
+
+        instance = dao.persist(_assign, types.ConfigurationCard, retriever)
+
+    return instance
+
+
 @decorators.validate(validator.validate_update_active_simulation)
 def update_active_simulation(hashid):
     """Updates the active simulation within a group.
@@ -340,6 +513,10 @@ def update_active_simulation(hashid):
         simulation.try_id = index
         simulation.is_obsolete = (index != len(group))
 
+    # Invalidate cached group members.
+    cache.invalidate_simulations([s.uid for s in group])
+    cache.invalidate(cache.REGION_ACTIVE_SIMULATION, unicode(hashid))
+
     # Return active.
     return group[-1]
 
@@ -349,13 +526,90 @@ def delete_simulation(uid):
     """Deletes a simulation from database.
 
     """
-    dao.delete_by_facet(types.EnvironmentMetric, types.EnvironmentMetric.simulation_uid == uid)
-    dao.delete_by_facet(types.Job, types.Job.simulation_uid == uid)
-    dao.delete_by_facet(types.JobPeriod, types.JobPeriod.simulation_uid == uid)
-    dao.delete_by_facet(types.SimulationConfiguration, types.SimulationConfiguration.simulation_uid == uid)
-    dao.delete_by_facet(types.Message, types.Message.correlation_id_1 == uid)
-    dao.delete_by_facet(types.Simulation, types.Simulation.uid == uid)
-    dao.delete_by_facet(types.Supervision, types.Supervision.simulation_uid == uid)
+    purge_simulations([uid])
+
+
+@decorators.validate(validator.validate_purge_simulations)
+def purge_simulations(uids):
+    """Deletes a set of simulations, and all of their dependent data, from database.
+
+    One set based delete is issued per table, all within the current session
+    transaction.  As no row is retrieved beforehand purging is idempotent.
+
+    :param iterable uids: UIDs of simulations to be purged.
+
+    :returns: Count of deleted rows per table.
+    :rtype: dict
+
+    """
+    uids = sorted(set(unicode(uid) for uid in uids))
+
+    card_ids = _get_configuration_card_ids(uids) if uids else []
+
+    counts = {}
+    for etype, column in _PURGE_TARGETS:
+        if uids:
+            qry = session.query(etype)
+            qry = qry.filter(column.in_(uids))
+            counts[etype.__tablename__] = qry.delete(synchronize_session=False)
+        else:
+            counts[etype.__tablename__] = 0
+    counts[types.ConfigurationCard.__tablename__] = _purge_configuration_cards(card_ids)
+    cache.invalidate_simulations(uids)
+
+    return counts
+
+
+def _get_configuration_card_ids(uids):
+    """Returns ids of configuration cards referenced by a set of simulations.
+
+    """
+    sc = types.SimulationConfiguration
+
+    qry = session.raw_query(sc.card_id)
+    qry = qry.filter(sc.simulation_uid.in_(uids))
+    qry = qry.distinct()
+
+    return [i[0] for i in qry.all()]
+
+
+def _purge_configuration_cards(card_ids):
+    """Deletes configuration cards of purged simulations that are no longer referenced.
+
+    N.B. references are re-checked within the delete statement itself so that
+    cards concurrently shared with another simulation (see
+    persist_simulation_configuration) are retained.
+
+    """
+    if not card_ids:
+        return 0
+
+    cc = types.ConfigurationCard
+    sc = types.SimulationConfiguration
+
+    qry = session.query(cc)
+    qry = qry.filter(cc.id.in_(card_ids))
+    qry = qry.filter(~exists().where(sc.card_id == cc.id))
+
+    return qry.delete(synchronize_session=False)
+
+
+@decorators.validate(validator.validate_retrieve_simulation_uids_by_hashid)
+def retrieve_simulation_uids_by_hashid(hashid):
+    """Retrieves uids of all simulations with matching hashid.
+
+    :param str hashid: Hash ID of simulation.
+
+    :returns: Simulation uids.
+    :rtype: list
+
+    """
+    s = types.Simulation
+
+    qry = session.raw_query(s.uid)
+    qry = qry.filter(s.hashid == unicode(hashid))
+
+    return [i[0] for i in qry.all()]
 
 
 def get_simulation_accounting_project(uid):
@@ -395,24 +649,7 @@ def retrieve_simulation_job_counts(uid):
     :rtype: list
 
     """
-    j = types.Job
-    s = types.Simulation
-    qry = session.raw_query(
-        s.id,
-        j.typeof,
-        j.execution_state,
-        func.count(s.id)
-        )
-    qry = qry.join(j, s.uid == j.simulation_uid)
-
-    qry = qry.group_by(s.id, j.typeof, j.execution_state)
-
-    qry = qry.filter(j.execution_start_date != None)
-    qry = qry.filter(j.execution_state != None)
-    qry = qry.filter(j.typeof != None)
-    qry = qry.filter(s.uid == uid)
-
-    return qry.all()
+    return session.exec_baked(_BQ_SIMULATION_JOB_COUNTS, uid=uid).all()
 
 
 def retrieve_simulation_latest_job(uid, job_type=JOB_TYPE_COMPUTING):
@@ -425,24 +662,4 @@ def retrieve_simulation_latest_job(uid, job_type=JOB_TYPE_COMPUTING):
     :rtype: list
 
     """
-    j = types.Job
-    s = types.Simulation
-    qry = session.raw_query(
-        s.id,                                           #0
-        j.typeof,                                       #1
-        j.execution_state,                              #2
-        cast(j.is_compute_end, Integer),                #3
-        cast(j.is_error, Integer),                      #4
-        as_datetime_string(j.execution_start_date),     #5
-        as_datetime_string(j.execution_end_date)        #6
-        )
-
-    qry = qry.join(j, s.uid == j.simulation_uid)
-    qry = qry.order_by(j.execution_start_date.desc())
-
-    qry = qry.filter(j.execution_start_date != None)
-    qry = qry.filter(j.execution_state != None)
-    qry = qry.filter(j.typeof == job_type)
-    qry = qry.filter(s.uid == uid)
-
-    return qry.first()
+    return session.exec_baked(_BQ_SIMULATION_LATEST_JOB, uid=uid, job_type=job_type).first()
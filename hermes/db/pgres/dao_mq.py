@@ -114,6 +114,27 @@ def retrieve_messages(uid=None, exclude_excessive=True):
     :returns: List of message associated with a simulation.
     :rtype: list
 
+    """
+    return _get_messages_query(uid, exclude_excessive).all()
+
+
+@decorators.validate(validator.validate_retrieve_messages)
+def stream_messages(uid=None, exclude_excessive=True):
+    """Streams message details from db.
+
+    :param str uid: Correlation UID.
+    :param bool exclude_excessive: Flag indicating whether excessive message types are to be excluded from results.
+
+    :returns: Generator of messages associated with a simulation.
+    :rtype: generator
+
+    """
+    return session.stream(_get_messages_query(uid, exclude_excessive))
+
+
+def _get_messages_query(uid, exclude_excessive):
+    """Returns query over message details.
+
     """
     m = types.Message
 
@@ -134,7 +155,7 @@ def retrieve_messages(uid=None, exclude_excessive=True):
             qry = qry.filter(m.type_id != msg_type)
     qry = qry.order_by(m.timestamp)
 
-    return qry.all()
+    return qry
 
 
 def _retrieve_message_email(email_id):
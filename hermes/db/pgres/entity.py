@@ -10,11 +10,14 @@
 
 """
 import datetime
+import uuid
 
 from sqlalchemy import Column
 from sqlalchemy import DateTime
 from sqlalchemy import Integer
+from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.types import TypeDecorator
 
 from hermes.db.pgres import convertor
 from hermes.db.pgres.meta import METADATA
@@ -54,3 +57,46 @@ class _BaseEntity(object):
 
 # Mixin with sql alchemy.
 Entity = declarative_base(metadata=METADATA, cls=_BaseEntity)
+
+
+class Uid(TypeDecorator):
+    """A unique identifier stored as a native uuid but exposed as text.
+
+    Callers bind & receive unicode values so that dao signatures and api payloads are unaffected by the storage type.
+
+    """
+    impl = UUID
+
+    def __init__(self, hexadecimal=False):
+        """Constructor.
+
+        :param bool hexadecimal: Flag indicating whether values are exposed as 32 hexadecimal digits (e.g. md5 hashes).
+
+        """
+        super(Uid, self).__init__()
+        self.hexadecimal = hexadecimal
+
+
+    @property
+    def python_type(self):
+        """Returns python type of values that may be bound, e.g. when hydrating test instances.
+
+        """
+        return uuid.UUID
+
+
+    def process_bind_param(self, value, dialect):
+        """Converts a textual identifier to its canonical uuid representation.
+
+        """
+        if value is not None:
+            return unicode(uuid.UUID(unicode(value)))
+
+
+    def process_result_value(self, value, dialect):
+        """Converts a uuid to its textual representation.
+
+        """
+        if value is not None:
+            value = uuid.UUID(unicode(value))
+            return unicode(value.hex if self.hexadecimal else value)
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: hermes.db.pgres.fastpath.py
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL/CeCIL
+   :platform: Unix, Windows
+   :synopsis: Executes textual sql statements directly against the DBAPI cursor.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import time
+import uuid
+
+from hermes.db.pgres import instrumentation
+from hermes.db.pgres import session
+
+
+
+# Result layout: list of row tuples.
+LAYOUT_ROWS = 'rows'
+
+# Result layout: list of column value lists.
+LAYOUT_COLUMNS = 'columns'
+
+# Result layout: list of dictionaries keyed by column name.
+LAYOUT_RECORDS = 'records'
+
+
+def _get_cursor(name=None):
+    """Returns a DBAPI cursor bound to the current session.
+
+    """
+    connection = session.get_dbapi_connection()
+    if connection is None:
+        raise RuntimeError("A db session must be open prior to fast-path execution.")
+
+    return connection.cursor() if name is None else connection.cursor(name)
+
+
+def _execute(cursor, sql, params):
+    """Executes a sql statement, recording its execution time (fast-path statements bypass engine events).
+
+    """
+    if not instrumentation.is_enabled():
+        cursor.execute(sql, params)
+        return
+
+    started_at = time.time()
+    cursor.execute(sql, params)
+    instrumentation.record(sql, (time.time() - started_at) * 1000)
+
+
+def _format(cursor, rows, layout):
+    """Formats result rows according to layout.
+
+    """
+    if layout == LAYOUT_ROWS:
+        return rows
+
+    names = [i[0] for i in cursor.description]
+    if layout == LAYOUT_COLUMNS:
+        return [list(i) for i in zip(*rows)] if rows else [[] for _ in names]
+    if layout == LAYOUT_RECORDS:
+        return [dict(zip(names, i)) for i in rows]
+
+    raise ValueError("Unsupported fast-path result layout: {}".format(layout))
+
+
+def execute(sql, params=None, layout=LAYOUT_ROWS):
+    """Executes a sql statement and returns all result rows.
+
+    :param str sql: Sql statement (psycopg2 parameter style).
+    :param dict params: Statement parameters.
+    :param str layout: Result layout.
+
+    :returns: Result set formatted as per layout.
+    :rtype: list
+
+    """
+    cursor = _get_cursor()
+    try:
+        _execute(cursor, sql, params)
+        return _format(cursor, cursor.fetchall(), layout)
+    finally:
+        cursor.close()
+
+
+def execute_one(sql, params=None, layout=LAYOUT_ROWS):
+    """Executes a sql statement and returns first result row.
+
+    :param str sql: Sql statement (psycopg2 parameter style).
+    :param dict params: Statement parameters.
+    :param str layout: Result layout (either rows or records).
+
+    :returns: First result row or None.
+    :rtype: tuple | dict
+
+    """
+    cursor = _get_cursor()
+    try:
+        _execute(cursor, sql, params)
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return _format(cursor, [row], layout)[0]
+    finally:
+        cursor.close()
+
+
+def execute_command(sql, params=None):
+    """Executes a sql statement that returns no result rows, e.g. a ddl statement.
+
+    :param str sql: Sql statement (psycopg2 parameter style).
+    :param dict params: Statement parameters.
+
+    :returns: Number of rows affected.
+    :rtype: int
+
+    """
+    cursor = _get_cursor()
+    try:
+        _execute(cursor, sql, params)
+        return cursor.rowcount
+    finally:
+        cursor.close()
+
+
+def stream(sql, params=None, batch_size=session.STREAM_BATCH_SIZE):
+    """Executes a sql statement via a named (i.e. server side) cursor and yields result rows.
+
+    :param str sql: Sql statement (psycopg2 parameter style).
+    :param dict params: Statement parameters.
+    :param int batch_size: Number of rows to be fetched per round trip.
+
+    :returns: Generator of row tuples.
+    :rtype: generator
+
+    """
+    cursor = _get_cursor("hermes_fastpath_{}".format(uuid.uuid4().hex))
+    cursor.itersize = batch_size
+    try:
+        _execute(cursor, sql, params)
+        for row in cursor:
+            yield row
+    finally:
+        cursor.close()
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: hermes.db.pgres.instrumentation.py
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL/CeCIL
+   :platform: Unix, Windows
+   :synopsis: Per-statement timing, slow statement logging & periodic timing summaries.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import re
+import sys
+import threading
+import time
+
+from sqlalchemy import event
+
+from hermes.utils import config
+from hermes.utils import logger
+
+
+
+# Flag indicating whether statements are timed.
+_ENABLED = getattr(config.db.pgres, 'statementTimingEnabled', True)
+
+# Duration (in milliseconds) above which a statement is logged as slow.
+_SLOW_THRESHOLD = getattr(config.db.pgres, 'slowStatementThresholdInMS', 500)
+
+# Interval (in seconds) between timing summaries.
+_SUMMARY_INTERVAL = getattr(config.db.pgres, 'statementSummaryIntervalInSeconds', 300)
+
+# Number of statement fingerprints reported per timing summary.
+_SUMMARY_SIZE = getattr(config.db.pgres, 'statementSummarySize', 10)
+
+# Maximum number of statements whose fingerprint is memoized.
+_MAX_FINGERPRINTS = 10000
+
+# Maximum length of a fingerprint when written to log.
+_MAX_LOGGED_LENGTH = 240
+
+# Key under which statement start times are stacked within connection info.
+_CONNECTION_INFO_KEY = 'hermes_statement_start'
+
+# Module name prefix of dao modules (used to identify the caller of a slow statement).
+_DAO_MODULE_PREFIX = 'hermes.db.pgres.dao_'
+
+# Regular expressions (and replacements) used to normalise sql into a fingerprint.
+_NORMALISERS = (
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"%\(\w+\)s|%s"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)"), "(...)"),
+    (re.compile(r"\s+"), " ")
+    )
+
+# Map of statement to fingerprint.
+_FINGERPRINTS = {}
+
+# Map of fingerprint to timings: [count, total duration, max duration].
+_TIMINGS = {}
+
+# Guards timings against concurrent update.
+_LOCK = threading.Lock()
+
+# Timestamp of last timing summary.
+_summarised_at = time.time()
+
+
+def is_enabled():
+    """Returns flag indicating whether statement timing is enabled.
+
+    """
+    return _ENABLED
+
+
+def get_fingerprint(statement):
+    """Returns a statement's fingerprint, i.e. the statement stripped of literals & parameters.
+
+    :param str statement: A sql statement.
+
+    :returns: Statement fingerprint.
+    :rtype: str
+
+    """
+    try:
+        return _FINGERPRINTS[statement]
+    except KeyError:
+        fingerprint = statement
+        for expression, replacement in _NORMALISERS:
+            fingerprint = expression.sub(replacement, fingerprint)
+        fingerprint = fingerprint.strip()
+        if len(_FINGERPRINTS) < _MAX_FINGERPRINTS:
+            _FINGERPRINTS[statement] = fingerprint
+
+        return fingerprint
+
+
+def _get_caller():
+    """Returns name of dao function on whose behalf a statement is being executed.
+
+    """
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if module.startswith(_DAO_MODULE_PREFIX):
+            return "{}.{}".format(module, frame.f_code.co_name)
+        frame = frame.f_back
+
+    return "--"
+
+
+def _format(fingerprint):
+    """Returns a fingerprint formatted for logging.
+
+    """
+    if len(fingerprint) > _MAX_LOGGED_LENGTH:
+        return fingerprint[:_MAX_LOGGED_LENGTH] + " ..."
+
+    return fingerprint
+
+
+def record(statement, duration):
+    """Records a statement's execution time.
+
+    :param str statement: A sql statement.
+    :param float duration: Execution time (in milliseconds).
+
+    """
+    fingerprint = get_fingerprint(statement)
+    with _LOCK:
+        try:
+            timings = _TIMINGS[fingerprint]
+        except KeyError:
+            timings = _TIMINGS[fingerprint] = [0, 0.0, 0.0]
+        timings[0] += 1
+        timings[1] += duration
+        timings[2] = max(timings[2], duration)
+
+    if duration >= _SLOW_THRESHOLD:
+        logger.log_db_warning("slow statement :: {:.1f}ms :: {} :: {}".format(
+            duration, _get_caller(), _format(fingerprint)
+            ))
+
+    if time.time() - _summarised_at >= _SUMMARY_INTERVAL:
+        log_summary()
+
+
+def get_timings():
+    """Returns statement timings accumulated since the last summary.
+
+    :returns: Map of fingerprint to (count, total duration, max duration).
+    :rtype: dict
+
+    """
+    with _LOCK:
+        return {k: tuple(v) for k, v in _TIMINGS.items()}
+
+
+def log_summary(size=_SUMMARY_SIZE):
+    """Writes the statements that dominated execution time since the last summary to log.
+
+    :param int size: Number of statement fingerprints to be reported.
+
+    """
+    global _summarised_at
+
+    with _LOCK:
+        timings = sorted(_TIMINGS.items(), key=lambda i: i[1][1], reverse=True)
+        _TIMINGS.clear()
+        _summarised_at = time.time()
+    if not timings:
+        return
+
+    logger.log_db("statement timing summary :: top {} of {} statements :: {:.1f}ms total".format(
+        min(size, len(timings)), len(timings), sum(i[1][1] for i in timings)
+        ))
+    for fingerprint, (count, total, longest) in timings[:size]:
+        logger.log_db("... {:.1f}ms :: {} calls :: {:.1f}ms avg :: {:.1f}ms max :: {}".format(
+            total, count, total / count, longest, _format(fingerprint)
+            ))
+
+
+def _on_before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """Engine event handler: stacks statement start time.
+
+    """
+    conn.info.setdefault(_CONNECTION_INFO_KEY, []).append(time.time())
+
+
+def _on_after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """Engine event handler: records statement execution time.
+
+    """
+    record(statement, (time.time() - conn.info[_CONNECTION_INFO_KEY].pop()) * 1000)
+
+
+def _on_handle_error(context):
+    """Engine event handler: discards start time of a failed statement.
+
+    """
+    starts = context.connection.info.get(_CONNECTION_INFO_KEY)
+    if starts:
+        starts.pop()
+
+
+def instrument(engine):
+    """Attaches statement timing listeners to an engine.
+
+    :param sqlalchemy.Engine engine: A SQLAlchemy engine.
+
+    """
+    if _ENABLED:
+        event.listen(engine, "before_cursor_execute", _on_before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _on_after_cursor_execute)
+        event.listen(engine, "handle_error", _on_handle_error)
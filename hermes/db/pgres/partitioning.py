@@ -0,0 +1,485 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: hermes.db.pgres.partitioning.py
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL/CeCIL
+   :platform: Unix, Windows
+   :synopsis: Monthly partitioning & cold archival of high volume tables.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import datetime
+import os
+import re
+import subprocess
+
+from hermes.db.pgres import fastpath
+from hermes.db.pgres import session
+from hermes.db.pgres import types
+from hermes.utils import logger
+
+
+
+# Partitioned tables.
+# N.B. tbl_job is excluded as job upserts depend upon a global unique constraint over job_uid.
+TABLES = (
+    types.JobPeriod.__table__,
+    )
+
+# Partition key, i.e. row insertion timestamp.
+PARTITION_KEY = 'row_create_date'
+
+# Safety margin applied to partition pruning predicates in order to absorb clock skew
+# between compute nodes (i.e. simulation/job dates) and the db server (i.e. row dates).
+PRUNING_MARGIN = datetime.timedelta(days=1)
+
+# Default number of months for which partitions are created in advance.
+DEFAULT_MONTHS_AHEAD = 2
+
+# Default age (in months) after which a partition may be archived.
+DEFAULT_ARCHIVE_AFTER = 6
+
+# Regular expression matching monthly partition names.
+_PARTITION_NAME = re.compile(r"^(?P<table>.+)_y(?P<year>\d{4})m(?P<month>\d{2})$")
+
+# Indexes created upon partitioned tables.
+_INDEXES = {
+    types.JobPeriod.__tablename__: (
+        ('simulation_id', ),
+        ('simulation_uid', ),
+        ('job_uid', 'period_id', 'period_date_begin', 'period_date_end')
+    )
+}
+
+# Unique constraints enforced per partition, i.e. a unique index cannot span partitions
+# unless it includes the partition key (see dao_monitoring_job.persist_job_period).
+_UNIQUE_INDEXES = {
+    types.JobPeriod.__tablename__: (
+        ('job_uid', 'period_id', 'period_date_begin', 'period_date_end'),
+    )
+}
+
+# Sql: is table partitioned.
+_SQL_IS_PARTITIONED = """
+SELECT EXISTS (
+    SELECT
+        1
+    FROM
+        pg_partitioned_table AS pt
+    WHERE
+        pt.partrelid = %(table)s::regclass
+    )
+"""
+
+# Sql: attached partitions.
+_SQL_PARTITIONS = """
+SELECT
+    c.relname
+FROM
+    pg_inherits AS i
+JOIN
+    pg_class AS c ON i.inhrelid = c.oid
+WHERE
+    i.inhparent = %(table)s::regclass
+ORDER BY
+    c.relname
+"""
+
+# Sql: does partition reference simulations that are neither obsolete nor complete.
+_SQL_HAS_ACTIVE_SIMULATIONS = """
+SELECT EXISTS (
+    SELECT
+        1
+    FROM
+        {} AS p
+    JOIN
+        monitoring.tbl_simulation AS s ON p.simulation_id = s.id
+    WHERE
+        s.is_obsolete = false AND
+        s.execution_end_date IS NULL
+    )
+"""
+
+# Sql: converts a table into a partitioned table.
+_SQL_PARTITION_TABLE = """
+ALTER TABLE {table} RENAME TO {name}_unpartitioned;
+ALTER INDEX {table}_pkey RENAME TO {name}_unpartitioned_pkey;
+CREATE TABLE {table} (LIKE {table}_unpartitioned INCLUDING DEFAULTS) PARTITION BY RANGE ({key});
+ALTER TABLE {table} ADD PRIMARY KEY (id, {key});
+ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id;
+CREATE TABLE {table}_default PARTITION OF {table} DEFAULT;
+"""
+
+# Sql: does default partition hold rows falling within a month.
+_SQL_HAS_DEFAULT_ROWS = """
+SELECT EXISTS (
+    SELECT
+        1
+    FROM
+        {default}
+    WHERE
+        {key} >= %(start)s AND
+        {key} < %(end)s
+    )
+"""
+
+# Sql: creates a monthly partition, moving rows falling within its month out of the default partition.
+# N.B. a partition cannot be created whilst the default partition holds rows falling within its bounds.
+_SQL_CREATE_PARTITION_FROM_DEFAULT = """
+ALTER TABLE {table} DETACH PARTITION {default};
+CREATE TABLE {partition} PARTITION OF {table} {bounds};
+INSERT INTO {partition} SELECT * FROM {default} WHERE {key} >= %(start)s AND {key} < %(end)s;
+DELETE FROM {default} WHERE {key} >= %(start)s AND {key} < %(end)s;
+ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT;
+"""
+
+# Sql: copies rows from a table's unpartitioned predecessor.
+_SQL_COPY_UNPARTITIONED = """
+INSERT INTO {table} SELECT * FROM {table}_unpartitioned;
+DROP TABLE {table}_unpartitioned;
+"""
+
+
+def _get_qualified_name(table, name=None):
+    """Returns schema qualified name of a table or of one of its partitions.
+
+    """
+    return "{}.{}".format(table.schema, name or table.name)
+
+
+def _get_default_name(table):
+    """Returns name of a table's default partition.
+
+    """
+    return "{}_default".format(table.name)
+
+
+def _get_month(value):
+    """Returns first instant of month within which a date falls.
+
+    """
+    return datetime.datetime(value.year, value.month, 1)
+
+
+def _get_next_month(month):
+    """Returns first instant of following month.
+
+    """
+    return datetime.datetime(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _get_bounds(month):
+    """Returns partition bound specification of a month.
+
+    """
+    return "FOR VALUES FROM ('{:%Y-%m-%d}') TO ('{:%Y-%m-%d}')".format(month, _get_next_month(month))
+
+
+def _get_attached(table):
+    """Returns names of all partitions (including the default partition) attached to a table.
+
+    """
+    return [i[0] for i in fastpath.execute(_SQL_PARTITIONS, {'table': _get_qualified_name(table)})]
+
+
+def _create_unique_indexes(table, name):
+    """Creates unique indexes upon a partition if they do not already exist.
+
+    """
+    for index, columns in enumerate(_UNIQUE_INDEXES.get(table.name, ()), 1):
+        fastpath.execute_command("CREATE UNIQUE INDEX IF NOT EXISTS {}_uq{} ON {} ({})".format(
+            name, index, _get_qualified_name(table, name), ", ".join(columns)
+            ))
+
+
+def get_partition_name(table, month):
+    """Returns name of a monthly partition.
+
+    :param sqlalchemy.Table table: A partitioned table.
+    :param datetime.datetime month: A date falling within the partition's month.
+
+    :returns: Partition name.
+    :rtype: str
+
+    """
+    return "{}_y{:04d}m{:02d}".format(table.name, month.year, month.month)
+
+
+def get_partition_month(name):
+    """Returns month covered by a monthly partition.
+
+    :param str name: Partition name.
+
+    :returns: First instant of month covered by partition or None if not a monthly partition.
+    :rtype: datetime.datetime
+
+    """
+    match = _PARTITION_NAME.match(name)
+    if match:
+        return datetime.datetime(int(match.group('year')), int(match.group('month')), 1)
+
+
+def get_pruning_date(start_date):
+    """Returns lower bound of partition key to be applied to time filtered queries.
+
+    Rows related to a simulation (or job) are inserted after it starts, hence
+    filtering by execution start date implies filtering by row insertion date.
+
+    :param datetime.datetime start_date: Simulation (or job) execution start date.
+
+    :returns: Lower bound of partition key.
+    :rtype: datetime.datetime
+
+    """
+    if start_date is not None:
+        return start_date - PRUNING_MARGIN
+
+
+def is_partitioned(table):
+    """Returns flag indicating whether a table is partitioned.
+
+    :param sqlalchemy.Table table: A table.
+
+    :returns: True if table is partitioned, false otherwise.
+    :rtype: bool
+
+    """
+    return fastpath.execute_one(_SQL_IS_PARTITIONED, {'table': _get_qualified_name(table)})[0]
+
+
+def get_partitions(table):
+    """Returns names of monthly partitions attached to a table.
+
+    :param sqlalchemy.Table table: A partitioned table.
+
+    :returns: Partition names.
+    :rtype: list
+
+    """
+    return [i for i in _get_attached(table) if get_partition_month(i) is not None]
+
+
+def create_partition(table, month):
+    """Creates a monthly partition if it does not already exist.
+
+    Rows that landed in the default partition for want of the monthly partition
+    (e.g. partition maintenance lagged) are moved into it.
+
+    :param sqlalchemy.Table table: A partitioned table.
+    :param datetime.datetime month: A date falling within the partition's month.
+
+    :returns: Partition name.
+    :rtype: str
+
+    """
+    month = _get_month(month)
+    name = get_partition_name(table, month)
+    attached = _get_attached(table)
+    if name not in attached:
+        default = _get_qualified_name(table, _get_default_name(table))
+        params = {'start': month, 'end': _get_next_month(month)}
+        if _get_default_name(table) in attached and \
+           fastpath.execute_one(_SQL_HAS_DEFAULT_ROWS.format(default=default, key=PARTITION_KEY), params)[0]:
+            logger.log_db_warning("Moving rows out of default partition: {}".format(name))
+            fastpath.execute_command(_SQL_CREATE_PARTITION_FROM_DEFAULT.format(
+                table=_get_qualified_name(table),
+                partition=_get_qualified_name(table, name),
+                default=default,
+                bounds=_get_bounds(month),
+                key=PARTITION_KEY
+                ), params)
+        else:
+            fastpath.execute_command("CREATE TABLE IF NOT EXISTS {} PARTITION OF {} {}".format(
+                _get_qualified_name(table, name), _get_qualified_name(table), _get_bounds(month)
+                ))
+    _create_unique_indexes(table, name)
+
+    return name
+
+
+def create_partitions(table, start=None, months_ahead=DEFAULT_MONTHS_AHEAD):
+    """Creates monthly partitions from a start month up to a number of months ahead of now.
+
+    :param sqlalchemy.Table table: A partitioned table.
+    :param datetime.datetime start: Start month (defaults to current month).
+    :param int months_ahead: Number of months ahead of now for which partitions are created.
+
+    :returns: Partition names.
+    :rtype: list
+
+    """
+    end = _get_month(datetime.datetime.utcnow())
+    for _ in range(months_ahead):
+        end = _get_next_month(end)
+
+    month = _get_month(start or datetime.datetime.utcnow())
+    names = []
+    while month <= end:
+        names.append(create_partition(table, month))
+        month = _get_next_month(month)
+
+    return names
+
+
+def init_table(table, months_ahead=DEFAULT_MONTHS_AHEAD):
+    """Converts a table into a table partitioned by month, migrating existing rows.
+
+    :param sqlalchemy.Table table: Table to be partitioned.
+    :param int months_ahead: Number of months ahead of now for which partitions are created.
+
+    """
+    if is_partitioned(table):
+        return
+
+    qualified_name = _get_qualified_name(table)
+    logger.log_db("Partitioning table: {}".format(qualified_name))
+    fastpath.execute_command(_SQL_PARTITION_TABLE.format(
+        table=qualified_name, name=table.name, key=PARTITION_KEY
+        ))
+    for columns in _INDEXES.get(table.name, ()):
+        fastpath.execute_command("CREATE INDEX ON {} ({})".format(qualified_name, ", ".join(columns)))
+    _create_unique_indexes(table, _get_default_name(table))
+
+    earliest = fastpath.execute_one("SELECT min({}) FROM {}_unpartitioned".format(
+        PARTITION_KEY, qualified_name
+        ))[0]
+    create_partitions(table, earliest, months_ahead)
+    fastpath.execute_command(_SQL_COPY_UNPARTITIONED.format(table=qualified_name))
+
+
+def init(months_ahead=DEFAULT_MONTHS_AHEAD):
+    """Converts all partitioned tables.
+
+    :param int months_ahead: Number of months ahead of now for which partitions are created.
+
+    """
+    for table in TABLES:
+        init_table(table, months_ahead)
+
+
+def get_archivable_partitions(table, archive_after=DEFAULT_ARCHIVE_AFTER):
+    """Returns partitions eligible for archival.
+
+    A partition is eligible when it is older than the archival age and all
+    simulations referenced by its rows are either obsolete or complete.
+
+    :param sqlalchemy.Table table: A partitioned table.
+    :param int archive_after: Age (in months) after which a partition may be archived.
+
+    :returns: Partition names.
+    :rtype: list
+
+    """
+    threshold = _get_month(datetime.datetime.utcnow() - datetime.timedelta(days=31 * archive_after))
+
+    return [name for name in get_partitions(table)
+            if get_partition_month(name) < threshold and
+               not fastpath.execute_one(_SQL_HAS_ACTIVE_SIMULATIONS.format(_get_qualified_name(table, name)))[0]]
+
+
+def _get_archive_path(directory, name):
+    """Returns path to a partition's archive file.
+
+    """
+    return os.path.join(directory, "{}.dump".format(name))
+
+
+def _exec_pg_command(command, args):
+    """Executes a postgres client command against the db to which the session is bound.
+
+    """
+    url = session.sa_engine.url
+    env = dict(os.environ, PGPASSWORD=url.password or "")
+    args = [command,
+            "--host", url.host or "localhost",
+            "--port", str(url.port or 5432),
+            "--username", url.username] + args
+
+    subprocess.check_call(args, env=env)
+
+
+def _verify_archive(fpath):
+    """Verifies that an archive file is readable, raising an error otherwise.
+
+    """
+    if not os.path.exists(fpath) or not os.path.getsize(fpath):
+        raise IOError("Partition archive is empty: {}".format(fpath))
+
+    with open(os.devnull, 'w') as devnull:
+        subprocess.check_call(["pg_restore", "--list", fpath], stdout=devnull)
+
+
+def archive_partition(table, name, directory):
+    """Dumps a partition into a compressed archive file, then detaches & drops it.
+
+    N.B. the partition is only detached once its archive has been verified, i.e.
+    a failed dump leaves the partition attached (& the archive file removed).
+    Archivable partitions no longer receive rows (see get_archivable_partitions).
+
+    :param sqlalchemy.Table table: A partitioned table.
+    :param str name: Partition name.
+    :param str directory: Directory into which archive file is written.
+
+    :returns: Path to archive file.
+    :rtype: str
+
+    """
+    qualified_name = _get_qualified_name(table, name)
+    fpath = _get_archive_path(directory, name)
+    if os.path.exists(fpath):
+        raise ValueError("Partition archive already exists: {}".format(fpath))
+
+    try:
+        _exec_pg_command("pg_dump", [
+            "--format", "custom",
+            "--compress", "9",
+            "--table", qualified_name,
+            "--file", fpath,
+            session.sa_engine.url.database
+            ])
+        _verify_archive(fpath)
+    except Exception:
+        if os.path.exists(fpath):
+            os.remove(fpath)
+        raise
+
+    fastpath.execute_command("ALTER TABLE {} DETACH PARTITION {}".format(
+        _get_qualified_name(table), qualified_name
+        ))
+    fastpath.execute_command("DROP TABLE {}".format(qualified_name))
+    session.commit()
+
+    return fpath
+
+
+def restore_partition(table, name, directory):
+    """Restores a partition from its archive file & re-attaches it.
+
+    N.B. archives are dumped whilst partitions are attached, hence pg_restore
+    normally re-attaches the partition itself.
+
+    :param sqlalchemy.Table table: A partitioned table.
+    :param str name: Partition name.
+    :param str directory: Directory from which archive file is read.
+
+    """
+    month = get_partition_month(name)
+    fpath = _get_archive_path(directory, name)
+    if month is None:
+        raise ValueError("Invalid partition name: {}".format(name))
+    if not os.path.exists(fpath):
+        raise ValueError("Partition archive does not exist: {}".format(fpath))
+
+    _exec_pg_command("pg_restore", [
+        "--dbname", session.sa_engine.url.database,
+        fpath
+        ])
+
+    if name not in get_partitions(table):
+        fastpath.execute_command("ALTER TABLE {} ATTACH PARTITION {} {}".format(
+            _get_qualified_name(table), _get_qualified_name(table, name), _get_bounds(month)
+            ))
+    session.commit()
@@ -11,10 +11,15 @@
 """
 import contextlib
 import logging
+import threading
+import time
 
 from sqlalchemy import create_engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext import baked
 from sqlalchemy.orm import sessionmaker
 
+from hermes.db.pgres import instrumentation
 from hermes.utils import config
 from hermes.utils import logger
 
@@ -23,11 +28,66 @@ from hermes.utils import logger
 # SQLAlchemy engine.
 sa_engine = None
 
-# DB connection string used to create SQLAlchemy engine.
-_sa_connection = None
+# SQLAlchemy engines keyed by connection string.
+_sa_engines = {}
 
-# SQLAlchemy session.
-_sa_session = None
+# Guards engine instantiation against concurrent sessions.
+_sa_engines_lock = threading.Lock()
+
+
+class _ThreadState(threading.local):
+    """Per thread session state (web requests execute db tasks upon a thread pool).
+
+    """
+    # SQLAlchemy session.
+    sa_session = None
+
+
+# Session state of current thread.
+_state = _ThreadState()
+
+# Session routes.
+ROUTE_PRIMARY = 'primary'
+ROUTE_REPLICA = 'replica'
+ROUTE_REPLICA_STALE = 'replica-stale'
+ROUTE_REPLICA_UNAVAILABLE = 'replica-unavailable'
+
+# Count of sessions opened per route.
+_ROUTE_COUNTS = {
+    ROUTE_PRIMARY: 0,
+    ROUTE_REPLICA: 0,
+    ROUTE_REPLICA_STALE: 0,
+    ROUTE_REPLICA_UNAVAILABLE: 0
+}
+
+# Default maximum replica lag (in seconds) tolerated by read-only sessions.
+_DEFAULT_REPLICA_MAX_LAG = 30
+
+# Default interval (in seconds) between replica lag checks.
+_DEFAULT_REPLICA_LAG_CHECK_INTERVAL = 5
+
+# Default number of rows fetched per round trip when streaming query results.
+STREAM_BATCH_SIZE = 1000
+
+# Cache of baked queries, i.e. queries constructed & compiled once.
+_BAKERY = baked.bakery()
+
+# Flag indicating whether baked queries are cached (disabled when benchmarking).
+_baking_enabled = True
+
+# Replica lag check state: (timestamp of last check, route decided upon).
+_replica_state = (None, None)
+
+# SQL used to determine replication lag (in seconds).
+# N.B. a replica that has replayed all received wal is up to date however long ago its
+# last replayed transaction was (e.g. idle primary), otherwise lag is measured from
+# that transaction, and is null (i.e. stale) if none has been replayed.
+_SQL_REPLICA_LAG = """
+    SELECT CASE WHEN NOT pg_is_in_recovery() THEN 0
+                WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                ELSE EXTRACT(EPOCH FROM (now() - pg_last_xact_replay_timestamp()))
+           END
+"""
 
 
 # Set of SQLAlchemy loggers.
@@ -48,17 +108,31 @@ def init_logging():
         logging.getLogger(sa_logger_type).setLevel(level)
 
 
+def get_route_counts():
+    """Returns count of sessions opened per route.
+
+    :returns: Map of route name to session count.
+    :rtype: dict
+
+    """
+    return dict(_ROUTE_COUNTS)
+
+
 @contextlib.contextmanager
-def create(connection=None, commitable=False):
+def create(connection=None, commitable=False, read_only=False):
     """Starts & manages a db session.
 
     :param connection: DB connection information.
     :type connection: str | sqlalchemy.Engine
     :param bool commitable: Flag indicating whether to auto-commit.
+    :param bool read_only: Flag indicating whether session may be routed to a read replica.
 
     """
-    _start(connection)
-    # logger.log_db("db connection [{}] opened".format(id(_sa_session)))
+    if commitable and read_only:
+        raise ValueError("A read-only db session cannot be commitable.")
+
+    _start(connection, read_only)
+    # logger.log_db("db connection [{}] opened".format(id(_state.sa_session)))
 
     try:
         yield
@@ -70,63 +144,150 @@ def create(connection=None, commitable=False):
     else:
         if commitable:
             commit()
-        # logger.log_db("db connection [{}] closed".format(id(_sa_session)))
+        # logger.log_db("db connection [{}] closed".format(id(_state.sa_session)))
     finally:
         _end()
 
 
-def _start(connection=None):
+def _start(connection=None, read_only=False):
     """Starts a db session.
 
     :param connection: Either a db connection string or a SQLAlchemy db engine.
     :type connection: str | sqlalchemy.Engine
+    :param bool read_only: Flag indicating whether session may be routed to a read replica.
 
     """
     global sa_engine
-    global _sa_session
-    global _sa_connection
 
     # Set default connection.
     if connection is None:
-        connection = config.db.pgres.main
+        connection = _get_routed_connection(read_only)
 
     # Set engine.
-    if _sa_connection != connection:
-        _sa_connection = connection
-        sa_engine = create_engine(connection,
-                                  echo=False,
-                                  connect_args={"options": "-c timezone=utc"})
-        logger.log_db("db engine instantiated: {}".format(id(sa_engine)))
+    sa_engine = _get_engine(connection)
 
     # Set session.
-    _sa_session = sessionmaker(bind=sa_engine)()
+    _state.sa_session = sessionmaker(bind=sa_engine)()
+
+
+def _get_engine(connection):
+    """Returns SQLAlchemy engine mapped to a connection, instantiating it if necessary.
+
+    :param connection: Either a db connection string or a SQLAlchemy db engine.
+    :type connection: str | sqlalchemy.Engine
+
+    :returns: A SQLAlchemy engine.
+    :rtype: sqlalchemy.Engine
+
+    """
+    if not isinstance(connection, basestring):
+        return connection
+
+    try:
+        return _sa_engines[connection]
+    except KeyError:
+        with _sa_engines_lock:
+            if connection not in _sa_engines:
+                engine = create_engine(connection,
+                                       echo=False,
+                                       connect_args={"options": "-c timezone=utc"})
+                instrumentation.instrument(engine)
+                logger.log_db("db engine instantiated: {}".format(id(engine)))
+                _sa_engines[connection] = engine
+
+        return _sa_engines[connection]
+
+
+def _get_routed_connection(read_only):
+    """Returns connection string to which a session is to be routed.
+
+    Read-only sessions are routed to the replica (when configured) unless
+    it is unavailable or lagging too far behind the primary.
+
+    :param bool read_only: Flag indicating whether session may be routed to a read replica.
+
+    :returns: A db connection string.
+    :rtype: str
+
+    """
+    replica = getattr(config.db.pgres, 'replica', None)
+    if not read_only or not replica or replica == config.db.pgres.main:
+        route = ROUTE_PRIMARY
+    else:
+        route = _get_replica_route(replica)
+    _ROUTE_COUNTS[route] += 1
+
+    return replica if route == ROUTE_REPLICA else config.db.pgres.main
+
+
+def _get_replica_route(replica):
+    """Returns route to be taken by a read-only session, i.e. guards against a stale replica.
+
+    :param str replica: Replica db connection string.
+
+    :returns: Route name.
+    :rtype: str
+
+    """
+    global _replica_state
+
+    # Reuse outcome of most recent check.
+    checked_at, route = _replica_state
+    interval = getattr(config.db.pgres, 'replicaLagCheckIntervalInSeconds',
+                       _DEFAULT_REPLICA_LAG_CHECK_INTERVAL)
+    if checked_at is not None and time.time() - checked_at < interval:
+        return route
+
+    # Check replica lag.
+    max_lag = getattr(config.db.pgres, 'replicaMaxLagInSeconds', _DEFAULT_REPLICA_MAX_LAG)
+    try:
+        lag = _get_engine(replica).execute(_SQL_REPLICA_LAG).scalar()
+    except SQLAlchemyError as err:
+        logger.log_db_warning("db replica unavailable, routing to primary: {}".format(err))
+        route = ROUTE_REPLICA_UNAVAILABLE
+    else:
+        if lag is None or lag > max_lag:
+            logger.log_db_warning("db replica lag exceeds {}s, routing to primary: {}".format(max_lag, lag))
+            route = ROUTE_REPLICA_STALE
+        else:
+            route = ROUTE_REPLICA
+
+    _replica_state = (time.time(), route)
+
+    return route
 
 
 def _end():
     """Ends a session.
 
     """
-    global _sa_session
-
-    if _sa_session is not None:
-        _sa_session.close()
-        _sa_session = None
+    if _state.sa_session is not None:
+        _state.sa_session.close()
+        _state.sa_session = None
 
 
 def commit():
     """Commits a session.
 
     """
-    if _sa_session is not None:
-        _sa_session.commit()
+    if _state.sa_session is not None:
+        _state.sa_session.commit()
+
+
+def flush():
+    """Flushes pending changes to db within the current transaction.
+
+    """
+    if _state.sa_session is not None:
+        _state.sa_session.flush()
 
 
 def rollback():
     """Rolls back a session.
 
     """
-    if _sa_session is not None:
-        _sa_session.rollback()
+    if _state.sa_session is not None:
+        _state.sa_session.rollback()
 
 
 def insert(instance, auto_commit=True):
@@ -136,8 +297,8 @@ def insert(instance, auto_commit=True):
     :param bool auto_commit: Flag indicating whether a commit is to be issued.
 
     """
-    if instance is not None and _sa_session is not None:
-        _sa_session.add(instance)
+    if instance is not None and _state.sa_session is not None:
+        _state.sa_session.add(instance)
         if auto_commit:
             commit()
 
@@ -154,8 +315,8 @@ def delete(instance, auto_commit=True):
     :type auto_commit: bool
 
     """
-    if instance is not None and _sa_session is not None:
-        _sa_session.delete(instance)
+    if instance is not None and _state.sa_session is not None:
+        _state.sa_session.delete(instance)
         if auto_commit:
             commit()
 
@@ -167,23 +328,65 @@ def update(instance, auto_commit=True):
     :param bool auto_commit: Flag indicating whether a commit is to be issued.
 
     """
-    if instance is not None and _sa_session is not None:
+    if instance is not None and _state.sa_session is not None:
+        if auto_commit:
+            commit()
+
+    return instance
+
+
+def bulk_update(etype, mappings, auto_commit=True):
+    """Updates a set of type instances without loading them and optionally commits the session.
+
+    :param class etype: Type of instances being updated.
+    :param list mappings: Maps of attribute name to value, each including the instance's primary key.
+    :param bool auto_commit: Flag indicating whether a commit is to be issued.
+
+    """
+    if mappings and _state.sa_session is not None:
+        _state.sa_session.bulk_update_mappings(etype, mappings)
         if auto_commit:
             commit()
 
+
+def merge(instance, load=True):
+    """Merges a type instance into the session.
+
+    :param db.Entity instance: A db type instance.
+    :param bool load: Flag indicating whether instance state is to be loaded from db.
+
+    :returns: Instance attached to the session.
+    :rtype: db.Entity
+
+    """
+    if instance is not None and _state.sa_session is not None:
+        return _state.sa_session.merge(instance, load=load)
+
     return instance
 
 
+def get_dbapi_connection():
+    """Returns DBAPI connection underlying the session.
+
+    Statements executed against it participate in the session transaction.
+
+    :returns: A DBAPI (i.e. psycopg2) connection proxy.
+
+    """
+    if _state.sa_session is not None:
+        return _state.sa_session.connection().connection
+
+
 def query(*etypes):
     """Begins a query operation against a session.
 
     """
-    if len(etypes) == 0 or _sa_session is None:
+    if len(etypes) == 0 or _state.sa_session is None:
         return None
 
     q = None
     for etype in etypes:
-        q = _sa_session.query(etype) if q is None else q.join(etype)
+        q = _state.sa_session.query(etype) if q is None else q.join(etype)
     return q
 
 
@@ -193,4 +396,64 @@ def raw_query(*args):
     Avoids having to expose directly the underlying SQLAlchemy session.
 
     """
-    return _sa_session.query(*args)
+    return _state.sa_session.query(*args)
+
+
+def bake(factory):
+    """Returns a baked query, i.e. a query whose construction & sql compilation are cached.
+
+    Criteria are appended via the += operator and must be expressed with bound
+    parameters (sqlalchemy.bindparam) rather than with call specific values.
+
+    :param function factory: Function returning a query from a SQLAlchemy session.
+
+    :returns: A baked query.
+    :rtype: sqlalchemy.ext.baked.BakedQuery
+
+    """
+    return _BAKERY(factory)
+
+
+def set_baking(enabled):
+    """Enables / disables caching of baked queries.
+
+    :param bool enabled: Flag indicating whether baked queries are to be cached.
+
+    """
+    global _baking_enabled
+
+    _baking_enabled = enabled
+
+
+def exec_baked(bq, **params):
+    """Binds a baked query to the current session.
+
+    :param sqlalchemy.ext.baked.BakedQuery bq: A baked query.
+    :param dict params: Values of the query's bound parameters.
+
+    :returns: A result upon which first(), one(), all() ... may be invoked.
+    :rtype: sqlalchemy.ext.baked.Result
+
+    """
+    if not _baking_enabled:
+        bq = bq.with_criteria(lambda q: q).spoil(full=True)
+
+    return bq(_state.sa_session).params(**params)
+
+
+def stream(qry, batch_size=STREAM_BATCH_SIZE):
+    """Streams results of a query via a server side cursor.
+
+    Rows are fetched from the db in batches so that memory usage is independent
+    of result set size.  The generator must be consumed within the db session.
+
+    :param sqlalchemy.orm.query.Query qry: Query to be executed.
+    :param int batch_size: Number of rows to be fetched per round trip.
+
+    :returns: Generator of query result rows.
+    :rtype: generator
+
+    """
+    qry = qry.execution_options(stream_results=True)
+    for row in qry.yield_per(batch_size):
+        yield row
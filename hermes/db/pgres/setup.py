@@ -16,6 +16,8 @@ from sqlalchemy.schema import CreateSchema
 from sqlalchemy.schema import DropSchema
 
 from hermes import cv
+from hermes.db.pgres import change_tracking
+from hermes.db.pgres import partitioning
 from hermes.db.pgres import session as db_session
 from hermes.db.pgres.meta import METADATA
 from hermes.db.pgres.types import ControlledVocabularyTerm
@@ -105,6 +107,13 @@ def execute():
     # Initialize tables.
     METADATA.create_all(db_session.sa_engine)
 
+    # Partition high volume tables.
+    partitioning.init()
+
+    # Track simulation changes (timeslice deltas).
+    change_tracking.init()
+    db_session.commit()
+
     # Seed tables.
     init_cv_terms()
     _init_simulations()
@@ -14,10 +14,13 @@ from hermes.db.pgres.types_conso import Consumption
 from hermes.db.pgres.types_conso import CPUState
 from hermes.db.pgres.types_conso import OccupationStore
 from hermes.db.pgres.types_cv import ControlledVocabularyTerm
+from hermes.db.pgres.types_monitoring import ConfigurationCard
 from hermes.db.pgres.types_monitoring import EnvironmentMetric
 from hermes.db.pgres.types_monitoring import Job
 from hermes.db.pgres.types_monitoring import JobPeriod
+from hermes.db.pgres.types_monitoring import JobPeriodRange
 from hermes.db.pgres.types_monitoring import Simulation
+from hermes.db.pgres.types_monitoring import SimulationChange
 from hermes.db.pgres.types_monitoring import SimulationConfiguration
 from hermes.db.pgres.types_mq import Message
 from hermes.db.pgres.types_mq import MessageEmail
@@ -40,10 +43,13 @@ SUPPORTED = TYPES = [
     # ... cv types
     ControlledVocabularyTerm,
     # ... monitoring types
+    ConfigurationCard,
     EnvironmentMetric,
     Job,
     JobPeriod,
+    JobPeriodRange,
     Simulation,
+    SimulationChange,
     SimulationConfiguration,
     # ... mq types
     Message,
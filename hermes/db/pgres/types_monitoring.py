@@ -9,18 +9,24 @@
 
 
 """
+import base64
 import hashlib
 
+from sqlalchemy import BigInteger
 from sqlalchemy import Boolean
 from sqlalchemy import Column
 from sqlalchemy import DateTime
 from sqlalchemy import Float
+from sqlalchemy import ForeignKey
+from sqlalchemy import Index
 from sqlalchemy import Integer
-from sqlalchemy import Text
+from sqlalchemy import LargeBinary
 from sqlalchemy import Unicode
 from sqlalchemy import UniqueConstraint
+from sqlalchemy.orm import relationship
 
 from hermes.db.pgres.entity import Entity
+from hermes.db.pgres.entity import Uid
 from hermes.cv.constants import EXECUTION_STATE_COMPLETE
 from hermes.cv.constants import EXECUTION_STATE_ERROR
 from hermes.cv.constants import EXECUTION_STATE_LATE
@@ -50,14 +56,15 @@ class Job(Entity):
     is_compute_end = Column(Boolean, default=False)
     is_error = Column(Boolean, default=False)
     is_im = Column(Boolean, default=False)
-    job_uid = Column(Unicode(63), nullable=False, unique=True)
+    job_uid = Column(Uid, nullable=False, unique=True)
     post_processing_component = Column(Unicode(63))
     post_processing_date = Column(DateTime)
     post_processing_dimension = Column(Unicode(63))
     post_processing_file = Column(Unicode(127))
     post_processing_name = Column(Unicode(63))
     scheduler_id = Column(Unicode(255))
-    simulation_uid = Column(Unicode(63))
+    simulation_id = Column(Integer, index=True)
+    simulation_uid = Column(Uid)
     typeof = Column(Unicode(63))
     warning_delay = Column(Integer)
     warning_limit = Column(DateTime)
@@ -86,6 +93,10 @@ class Job(Entity):
 class JobPeriod(Entity):
     """History of job period related events.
 
+    N.B. Table is partitioned by month of row creation date (see partitioning.py).
+    Postgres cannot enforce the unique constraint across partitions, it is enforced
+    per partition and duplicates are skipped upon insert (see persist_job_period).
+
     """
     # SQLAlchemy directives.
     __tablename__ = 'tbl_job_period'
@@ -100,13 +111,46 @@ class JobPeriod(Entity):
     )
 
     # Attributes.
-    simulation_uid = Column(Unicode(63), nullable=False)
-    job_uid = Column(Unicode(63), nullable=False)
+    simulation_id = Column(Integer, index=True)
+    simulation_uid = Column(Uid, nullable=False)
+    job_uid = Column(Uid, nullable=False)
     period_id = Column(Integer, nullable=False)
     period_date_begin = Column(Integer, nullable=False)
     period_date_end = Column(Integer, nullable=False)
 
 
+
+class JobPeriodRange(Entity):
+    """Contiguous range of job periods reported by a job, i.e. compacted job period history.
+
+    Ranges are extended as job period events are ingested (see compaction.py).
+
+    """
+    # SQLAlchemy directives.
+    __tablename__ = 'tbl_job_period_range'
+    __table_args__ = (
+        UniqueConstraint(
+            'job_uid',
+            'period_id_first'
+            ),
+        Index('ix_tbl_job_period_range_latest', 'simulation_uid', 'last_period_date_begin'),
+        Index('ix_tbl_job_period_range_last', 'simulation_uid', 'period_id_last'),
+        {'schema':_SCHEMA}
+    )
+
+    # Attributes.
+    simulation_uid = Column(Uid, nullable=False)
+    job_uid = Column(Uid, nullable=False)
+    period_id_first = Column(Integer, nullable=False)
+    period_id_last = Column(Integer, nullable=False)
+    period_date_begin = Column(Integer, nullable=False)
+    period_date_end = Column(Integer, nullable=False)
+    period_count = Column(Integer, nullable=False, default=1)
+    last_period_count = Column(Integer, nullable=False, default=1)
+    last_period_date_begin = Column(Integer, nullable=False)
+    last_job_period_id = Column(Integer)
+    last_job_period_date = Column(DateTime)
+
 class Simulation(Entity):
     """A simulation being run in order to test a climate model against an experiment.
 
@@ -128,7 +172,7 @@ class Simulation(Entity):
     compute_node_machine_raw = Column(Unicode(127))
     experiment = Column(Unicode(127))
     experiment_raw = Column(Unicode(127))
-    hashid = Column(Unicode(63))
+    hashid = Column(Uid(hexadecimal=True))
     model = Column(Unicode(127))
     model_raw = Column(Unicode(127))
     name = Column(Unicode(511))
@@ -137,7 +181,7 @@ class Simulation(Entity):
     space = Column(Unicode(127))
     space_raw = Column(Unicode(127))
     try_id = Column(Integer, nullable=False, default=1)
-    uid = Column(Unicode(63), nullable=False, unique=True)
+    uid = Column(Uid, nullable=False, unique=True)
 
     # ... mutable
     execution_end_date = Column(DateTime)
@@ -152,6 +196,13 @@ class Simulation(Entity):
     storage_path = Column(Unicode(2047))
     storage_small_path = Column(Unicode(2047))
 
+    # Derived from configuration card (see utils.config_card).
+    # N.B. added to existing databases by hermes_jobs/db/run_update_monitoring_fields.py.
+    exp_type = Column(Unicode(511))
+    long_name = Column(Unicode(2047))
+    period_length = Column(Unicode(15))
+    tag_name = Column(Unicode(127))
+
     # Obsolete ???
     ensemble_member = Column(Unicode(15))
     parent_simulation_name = Column(Unicode(511))
@@ -184,9 +235,63 @@ class Simulation(Entity):
         return unicode(hashlib.md5(hashid).hexdigest())
 
 
+class SimulationChange(Entity):
+    """Latest change to a simulation or to its jobs / job periods, i.e. timeslice change log.
+
+    Rows are maintained by db triggers (see change_tracking.py) and outlive
+    deleted simulations, i.e. act as tombstones.
+
+    """
+    # SQLAlchemy directives.
+    __tablename__ = 'tbl_simulation_change'
+    __table_args__ = (
+        {'schema':_SCHEMA}
+    )
+
+    # Attributes.
+    simulation_id = Column(Integer, nullable=False, unique=True)
+    change_seq = Column(BigInteger, nullable=False, index=True)
+
+
+class ConfigurationCard(Entity):
+    """Distinct simulation configuration cards.
+
+    N.B. Cards are stored once per distinct (decoded) content.  As content is
+    stored as raw bytes rather than base64 text it is compressed by postgres
+    (TOAST) when written.
+
+    """
+    # SQLAlchemy directives.
+    __tablename__ = 'tbl_configuration_card'
+    __table_args__ = (
+        {'schema':_SCHEMA}
+    )
+
+    # Attributes.
+    hashid = Column(Unicode(64), nullable=False, unique=True)
+    content = Column(LargeBinary, nullable=False)
+    encoding = Column(Unicode(63), nullable=True, default=u"utf-8")
+    mime_type = Column(Unicode(63),
+                       nullable=True,
+                       default=u"application/base64")
+
+
+    @property
+    def card(self):
+        """Returns card as originally received.
+
+        """
+        if self.mime_type == u"application/base64":
+            return unicode(base64.b64encode(self.content))
+
+        return self.content.decode(self.encoding or 'utf-8')
+
+
 class SimulationConfiguration(Entity):
     """Simulation configuration cards.
 
+    N.B. Card content is held in tbl_configuration_card, shared across simulations.
+
     """
     # SQLAlchemy directives.
     __tablename__ = 'tbl_simulation_configuration'
@@ -195,12 +300,41 @@ class SimulationConfiguration(Entity):
     )
 
     # Attributes.
-    simulation_uid = Column(Unicode(63), nullable=False, unique=True)
-    card = Column(Text, nullable=True)
-    card_encoding = Column(Unicode(63), nullable=True, default=u"utf-8")
-    card_mime_type = Column(Unicode(63),
-                            nullable=True,
-                            default=u"application/base64")
+    simulation_uid = Column(Uid, nullable=False, unique=True)
+    card_id = Column(Integer,
+                     ForeignKey('monitoring.tbl_configuration_card.id'),
+                     nullable=False,
+                     index=True)
+
+    # Relationships.
+    configuration_card = relationship(ConfigurationCard, lazy='joined')
+
+
+    @property
+    def card(self):
+        """Returns configuration card as originally received.
+
+        """
+        if self.configuration_card:
+            return self.configuration_card.card
+
+
+    @property
+    def card_encoding(self):
+        """Returns configuration card encoding.
+
+        """
+        if self.configuration_card:
+            return self.configuration_card.encoding
+
+
+    @property
+    def card_mime_type(self):
+        """Returns configuration card mime type.
+
+        """
+        if self.configuration_card:
+            return self.configuration_card.mime_type
 
 
 class EnvironmentMetric(Entity):
@@ -214,8 +348,8 @@ class EnvironmentMetric(Entity):
     )
 
     # Attributes.
-    simulation_uid = Column(Unicode(63), nullable=False)
-    job_uid = Column(Unicode(63), nullable=False)
+    simulation_uid = Column(Uid, nullable=False)
+    job_uid = Column(Uid, nullable=False)
     action_name = Column(Unicode(511), nullable=False)
     action_timestamp = Column(DateTime, nullable=False)
     dir_to = Column(Unicode(4096), nullable=False)
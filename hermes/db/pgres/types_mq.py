@@ -49,6 +49,9 @@ class Message(Entity):
                  nullable=False,
                  unique=True,
                  default=unicode(uuid.uuid4()))
+    # N.B. correlation identifiers remain textual: the message table is shared by all
+    # message types, is by far the largest table (rewriting it to uuid is prohibitive)
+    # and simulation uids are compared to it by bound value only, never by join.
     correlation_id_1 = Column(Unicode(63), nullable=True, index=True)
     correlation_id_2 = Column(Unicode(63), nullable=True)
     correlation_id_3 = Column(Unicode(63), nullable=True)
@@ -18,6 +18,7 @@ from sqlalchemy import Text
 from sqlalchemy import Unicode
 
 from hermes.db.pgres.entity import Entity
+from hermes.db.pgres.entity import Uid
 
 
 
@@ -36,8 +37,8 @@ class Supervision(Entity):
     )
 
     # Attributes.
-    simulation_uid = Column(Unicode(63), nullable=False)
-    job_uid = Column(Unicode(63), nullable=False)
+    simulation_uid = Column(Uid, nullable=False)
+    job_uid = Column(Uid, nullable=False)
     dispatch_date = Column(DateTime)
     dispatch_error = Column(Text)
     dispatch_try_count = Column(Integer, default=0)
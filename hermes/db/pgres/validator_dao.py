@@ -92,6 +92,13 @@ def validate_get_all(etype):
     validate_entity_type(etype)
 
 
+def validate_stream_all(etype):
+    """Function input validator: stream_all.
+
+    """
+    validate_entity_type(etype)
+
+
 def validate_get_by_facet(etype, qfilter=None, order_by=None, get_iterable=False):
     """Function input validator: get_all.
 
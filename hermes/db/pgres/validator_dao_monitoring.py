@@ -13,10 +13,12 @@
 
 """
 from hermes import cv
+from hermes.utils import config_card
 from hermes.utils.validation import validate_bool
 from hermes.utils.validation import validate_date
 from hermes.utils.validation import validate_int
 from hermes.utils.validation import validate_iterable
+from hermes.utils.validation import validate_mbr
 from hermes.utils.validation import validate_str
 from hermes.utils.validation import validate_uid
 from hermes.utils.validation import validate_ucode
@@ -253,6 +255,15 @@ def validate_persist_simulation_configuration(uid, card):
     validate_str(card, "Simulation config card")
 
 
+def validate_purge_simulations(uids):
+    """Function input validator: purge_simulations.
+
+    """
+    validate_iterable(uids, "Simulation uids")
+    for uid in uids:
+        validate_uid(uid, "Simulation uid")
+
+
 def validate_retrieve_active_simulation(hashid):
     """Function input validator: retrieve_active_simulation.
 
@@ -268,6 +279,15 @@ def validate_retrieve_active_simulations(start_date=None):
         validate_date(start_date, 'Simulation execution start date')
 
 
+def validate_retrieve_timeslice_delta_json(since, start_date=None):
+    """Function input validator: retrieve_timeslice_delta_json.
+
+    """
+    validate_int(since, 'Change log cursor')
+    if start_date is not None:
+        validate_date(start_date, 'Simulation execution start date')
+
+
 def validate_retrieve_latest_active_job_periods(start_date=None, simulation_identifers=None):
     """Function input validator: retrieve_latest_active_job_periods.
 
@@ -293,6 +313,15 @@ def validate_retrieve_job_info(uid):
     """
     validate_uid(uid, "Job uid")
 
+
+def validate_retrieve_jobs_by_interval(interval_start, interval_end):
+    """Function input validator: retrieve_jobs_by_interval.
+
+    """
+    validate_date(interval_start, "Interval start date")
+    validate_date(interval_end, "Interval end date")
+
+
 def validate_retrieve_latest_job_periods(uid):
     """Function input validator: retrieve_latest_job_periods.
 
@@ -314,6 +343,14 @@ def validate_retrieve_simulation(uid):
     validate_uid(uid, "Simulation uid")
 
 
+def validate_retrieve_simulation_marker(uid, include_messages=False):
+    """Function input validator: retrieve_simulation_marker.
+
+    """
+    validate_uid(uid, "Simulation uid")
+    validate_bool(include_messages, "Include messages flag")
+
+
 def validate_retrieve_simulation_configuration(uid):
     """Function input validator: retrieve_simulation_configuration.
 
@@ -328,6 +365,13 @@ def validate_retrieve_simulation_jobs(uid):
     validate_uid(uid, "Simulation uid")
 
 
+def validate_retrieve_simulation_uids_by_hashid(hashid):
+    """Function input validator: retrieve_simulation_uids_by_hashid.
+
+    """
+    validate_ucode(hashid, "Simulation hash identifier")
+
+
 def validate_retrieve_simulation_try(hashid, try_id):
     """Function input validator: retrieve_simulation_try.
 
@@ -349,3 +393,36 @@ def validate_update_active_simulation(hashid):
 
     """
     validate_ucode(hashid, "Simulation hash identifier")
+
+
+def _validate_card_field(field, value):
+    """Validates a simulation field derived from a configuration card.
+
+    """
+    validate_mbr(field, config_card.FIELDS, "Simulation card fields")
+    if field in config_card.MAX_LENGTHS and value is not None and \
+       len(value) > config_card.MAX_LENGTHS[field]:
+        raise ValueError('Simulation card field {} exceeds {} characters'.format(
+            field, config_card.MAX_LENGTHS[field]))
+
+
+def validate_update_simulation_card_fields(uid, fields):
+    """Function input validator: update_simulation_card_fields.
+
+    """
+    validate_uid(uid, "Simulation uid")
+    validate_iterable(fields, "Simulation card fields")
+    for field in fields:
+        _validate_card_field(field, fields[field])
+
+
+def validate_update_simulations_card_fields(mappings):
+    """Function input validator: update_simulations_card_fields.
+
+    """
+    validate_iterable(mappings, "Simulation card field mappings")
+    for fields in mappings:
+        validate_int(fields.get('id'), "Simulation id")
+        for field in fields:
+            if field != 'id':
+                _validate_card_field(field, fields[field])
@@ -12,6 +12,7 @@
 
 """
 from hermes.mq import constants
+from hermes.utils import decorators
 from hermes.utils.validation import validate_bool
 from hermes.utils.validation import validate_date
 from hermes.utils.validation import validate_int
@@ -85,6 +86,7 @@ def validate_has_messages(uid):
     validate_uid(uid, "Simulation uid")
 
 
+@decorators.noop_validator
 def validate_retrieve_message_emails(arrival_date):
     """Function input validator: retrieve_message_emails.
 
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+from . import cache
 from . import convert
 from . import data_convertor
 from . import mail
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: hermes.utils.cache.py
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL/CeCIL
+   :platform: Unix, Windows
+   :synopsis: In-process bounded cache with time to live.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import collections
+import threading
+import time
+
+
+
+class TimedCache(object):
+    """A thread-safe, size bounded, least recently used cache whose items expire.
+
+    """
+    def __init__(self, ttl, max_size):
+        """Object constructor.
+
+        :param int ttl: Time to live (in seconds) of cached items.
+        :param int max_size: Maximum number of cached items.
+
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self._items = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+
+    def __len__(self):
+        """Returns number of cached items.
+
+        """
+        return len(self._items)
+
+
+    def get(self, key, default=None):
+        """Returns a cached item.
+
+        :param key: Item key.
+        :param default: Value returned when item is not cached or has expired.
+
+        :returns: Cached item or default.
+
+        """
+        with self._lock:
+            try:
+                expires_at, value = self._items.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+
+            if expires_at < time.time():
+                self.misses += 1
+                self.evictions += 1
+                return default
+
+            self._items[key] = (expires_at, value)
+            self.hits += 1
+
+            return value
+
+
+    def set(self, key, value):
+        """Caches an item.
+
+        :param key: Item key.
+        :param value: Item value.
+
+        """
+        with self._lock:
+            self._items.pop(key, None)
+            self._items[key] = (time.time() + self.ttl, value)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+
+    def invalidate(self, key):
+        """Removes an item from the cache.
+
+        :param key: Item key.
+
+        """
+        with self._lock:
+            if self._items.pop(key, None) is not None:
+                self.invalidations += 1
+
+
+    def invalidate_where(self, predicate):
+        """Removes all items matching a predicate from the cache.
+
+        :param function predicate: Predicate invoked with key & value of each cached item.
+
+        """
+        with self._lock:
+            for key in [k for k, (_, v) in self._items.iteritems() if predicate(k, v)]:
+                del self._items[key]
+                self.invalidations += 1
+
+
+    def clear(self):
+        """Removes all items from the cache.
+
+        """
+        with self._lock:
+            self.invalidations += len(self._items)
+            self._items.clear()
+
+
+    def get_stats(self):
+        """Returns cache usage statistics.
+
+        :returns: Cache usage statistics.
+        :rtype: dict
+
+        """
+        lookups = self.hits + self.misses
+
+        return {
+            'evictions': self.evictions,
+            'hits': self.hits,
+            'hit_rate': float(self.hits) / lookups if lookups else 0.0,
+            'invalidations': self.invalidations,
+            'misses': self.misses,
+            'size': len(self._items)
+        }
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: hermes.utils.config_card.py
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL/CeCIL
+   :platform: Unix, Windows
+   :synopsis: Extraction of simulation fields from libIGCM configuration cards.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import base64
+import binascii
+import ConfigParser
+import datetime
+import io
+
+
+
+# Map of simulation fields to card (section, option) from which they are derived.
+FIELDS = {
+    'exp_type': ('UserChoices', 'ExpType'),
+    'long_name': ('UserChoices', 'LongName'),
+    'period_length': ('UserChoices', 'PeriodLength'),
+    'tag_name': ('UserChoices', 'TagName'),
+    'parent_simulation_name': ('Restarts', 'RestartJobName'),
+    'parent_simulation_branch_date': ('Restarts', 'RestartDate')
+}
+
+# Map of textual simulation fields to maximum length, i.e. that of their db column (see types.Simulation).
+MAX_LENGTHS = {
+    'exp_type': 511,
+    'long_name': 2047,
+    'period_length': 15,
+    'tag_name': 127,
+    'parent_simulation_name': 511
+}
+
+# Fields that are only meaningful when restart options are overruled.
+_RESTART_FIELDS = {
+    'parent_simulation_branch_date',
+    'parent_simulation_name'
+}
+
+# Supported card date formats.
+_DATE_FORMATS = ('%Y-%m-%d', '%Y%m%d')
+
+
+def decode(card, mime_type=u"application/base64"):
+    """Decodes a stored configuration card.
+
+    :param str card: Configuration card as persisted.
+    :param str mime_type: Configuration card mime type.
+
+    :returns: Configuration card text.
+    :rtype: str
+
+    """
+    if mime_type == u"application/base64":
+        return base64.b64decode(card)
+
+    return card.encode('utf-8') if isinstance(card, unicode) else card
+
+
+def get_content(card):
+    """Returns raw content of a configuration card as received.
+
+    N.B. Whitespace within base64 encoded cards (i.e. line breaks) is not
+    preserved.
+
+    :param str card: Configuration card as received.
+
+    :returns: Card content & mime type.
+    :rtype: tuple
+
+    """
+    if isinstance(card, unicode):
+        card = card.encode('utf-8')
+    try:
+        content = base64.b64decode(card)
+    except (binascii.Error, TypeError):
+        pass
+    else:
+        if base64.b64encode(content) == "".join(card.split()):
+            return content, u"application/base64"
+
+    return card, u"text/plain"
+
+
+def _parse_value(field, value):
+    """Parses a card option value.
+
+    """
+    value = value.split('#', 1)[0].strip().strip('"').strip()
+    if not value:
+        return None
+
+    if field == 'parent_simulation_branch_date':
+        for date_format in _DATE_FORMATS:
+            try:
+                return datetime.datetime.strptime(value, date_format)
+            except ValueError:
+                pass
+        return None
+
+    value = value.decode('utf-8', 'replace')
+    if len(value) > MAX_LENGTHS.get(field, len(value)):
+        return None
+
+    return value
+
+
+def parse(card, mime_type=u"application/base64"):
+    """Returns simulation fields derived from a configuration card.
+
+    :param str card: Configuration card as persisted.
+    :param str mime_type: Configuration card mime type.
+
+    :returns: Map of simulation field to value (empty if card is unparseable, over-long values are dropped).
+    :rtype: dict
+
+    """
+    if not card:
+        return {}
+
+    parser = ConfigParser.RawConfigParser(allow_no_value=True)
+    try:
+        parser.readfp(io.BytesIO(decode(card, mime_type)))
+    except (binascii.Error, TypeError, ConfigParser.Error):
+        return {}
+
+    try:
+        is_overruled = parser.get('Restarts', 'OverRule').strip().lower() == 'y'
+    except (ConfigParser.Error, AttributeError):
+        is_overruled = False
+
+    fields = {}
+    for field, (section, option) in FIELDS.items():
+        if field in _RESTART_FIELDS and not is_overruled:
+            continue
+        try:
+            value = parser.get(section, option)
+        except ConfigParser.Error:
+            continue
+        if value is not None:
+            value = _parse_value(field, value)
+            if value is not None:
+                fields[field] = value
+
+    return fields
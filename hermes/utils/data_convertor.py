@@ -14,6 +14,7 @@
 import collections
 import datetime
 import json
+import operator
 import uuid
 
 import sqlalchemy as sa
@@ -28,17 +29,91 @@ _IGNOREABLE = (int, float, long, type(None), unicode)
 # Set of unicodeable types used in jsonifying.
 _UNICODEABLE = (basestring, uuid.UUID)
 
+# Set of column types whose values are serialised as is.
+_IGNOREABLE_COLUMNS = (sa.Boolean, sa.Float, sa.Integer, sa.Unicode)
+
+# Map of mapped entity types (& key convertors) to compiled serializers.
+_SERIALIZERS = {}
+
+
+def _format_datetime(value):
+    """Formats a datetime column value.
+
+    """
+    if isinstance(value, datetime.datetime):
+        return unicode("{}Z".format(value.isoformat()))
+
+    return convert(value)
+
+
+def _get_column_formatter(column):
+    """Returns formatter applied to non-null values of a mapped column.
+
+    """
+    if isinstance(column.type, sa.DateTime):
+        return _format_datetime
+    elif isinstance(column.type, _IGNOREABLE_COLUMNS):
+        return None
+    else:
+        return convert
+
+
+def _compile_serializer(entity_type, key_convertor):
+    """Returns serializer of a mapped entity type compiled from its mapper.
+
+    Keys are converted once & values are formatted as per their column type.  Keys
+    are inserted in the same order as a generic conversion so that the json
+    encoding of a serialised instance is unaffected.
+
+    """
+    columns = {c.name: c for c in sa.inspect(entity_type).columns}
+    names = columns.keys()
+    keys = names if key_convertor is None else [key_convertor(i) for i in names]
+    formatters = [(i, _get_column_formatter(columns[n])) for i, n in enumerate(names)]
+    formatters = [(i, f) for i, f in formatters if f is not None]
+
+    # N.B. entities map at least the base entity columns, hence the getter returns a tuple.
+    getter = operator.attrgetter(*names)
+
+    def _serialize(instance):
+        values = list(getter(instance))
+        for i, formatter in formatters:
+            if values[i] is not None:
+                values[i] = formatter(values[i])
+
+        return dict(zip(keys, values))
+
+    return _serialize
+
+
+def _get_serializer(entity_type, key_convertor):
+    """Returns serializer of a mapped entity type, compiling it upon first use.
+
+    """
+    try:
+        return _SERIALIZERS[(entity_type, key_convertor)]
+    except KeyError:
+        serializer = _SERIALIZERS[(entity_type, key_convertor)] = \
+            _compile_serializer(entity_type, key_convertor)
+        return serializer
+
 
 def convert(data, key_convertor=None):
     """Converts input data to a dictionary.
 
+    Mapped entity instances are converted by serializers compiled per entity type.
+
     :param object data: Data to be converted.
 
     :returns: Converted data.
     :rtype: object
 
     """
-    if isinstance(data, _IGNOREABLE):
+    serializer = _SERIALIZERS.get((type(data), key_convertor))
+    if serializer is not None:
+        return serializer(data)
+
+    elif isinstance(data, _IGNOREABLE):
         return data
 
     elif isinstance(data, datetime.datetime):
@@ -55,8 +130,7 @@ def convert(data, key_convertor=None):
         return [convert(i, key_convertor) for i in data]
 
     elif sa.inspect(data, False):
-        return  convert({c.name: getattr(data, c.name)
-                         for c in sa.inspect(data).mapper.columns}, key_convertor)
+        return _get_serializer(type(data), key_convertor)(data)
 
     else:
         return data
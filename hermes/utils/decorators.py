@@ -11,17 +11,163 @@
 
 
 """
+import functools
+import os
+import threading
+
+from hermes.utils.config import data as config
+
+
+
+# Validation mode: every call is validated.
+VALIDATION_MODE_ALL = 'all'
+
+# Validation mode: outermost calls are validated, nested (i.e. internal) calls are trusted.
+VALIDATION_MODE_EXTERNAL = 'external'
+
+# Validation mode: no call is validated.
+VALIDATION_MODE_NONE = 'none'
+
+# Set of supported validation modes.
+VALIDATION_MODES = (
+    VALIDATION_MODE_ALL,
+    VALIDATION_MODE_EXTERNAL,
+    VALIDATION_MODE_NONE
+    )
+
+# Environment variable overriding configured validation mode (MQ agents default it to none, see hermes_jobs.mq).
+VALIDATION_MODE_ENV_VAR = 'HERMES_DAO_VALIDATION_MODE'
+
+# Name of attribute flagging validators that do nothing (see noop_validator).
+_NOOP_ATTR = '_hermes_noop_validator'
+
+
+class _Nesting(threading.local):
+    """Per thread validated call nesting state.
+
+    """
+    active = False
+
+
+# Per thread validated call nesting state.
+_nesting = _Nesting()
+
+
+def _get_configured_mode():
+    """Returns validation mode of current process.
+
+    """
+    mode = os.getenv(VALIDATION_MODE_ENV_VAR) or \
+           getattr(config.db.pgres, 'validationMode', VALIDATION_MODE_ALL)
+    if mode not in VALIDATION_MODES:
+        raise ValueError("Unsupported validation mode: {}".format(mode))
+
+    return mode
+
+
+# Current validation mode, resolved upon import, i.e. before any dao module is decorated.
+_mode = _get_configured_mode()
+
+
+def get_validation_mode():
+    """Returns current validation mode.
+
+    :returns: Current validation mode.
+    :rtype: str
+
+    """
+    return _mode
+
+
+def set_validation_mode(mode):
+    """Sets validation mode of functions decorated from now on (e.g. by tests & benchmarks).
+
+    N.B. functions already decorated are unaffected, a process's mode is
+    configured via db.pgres.validationMode or the HERMES_DAO_VALIDATION_MODE
+    environment variable, which MQ agents default to none before importing
+    any dao module.
+
+    :param str mode: Validation mode.
+
+    """
+    global _mode
+
+    if mode not in VALIDATION_MODES:
+        raise ValueError("Unsupported validation mode: {}".format(mode))
+
+    _mode = mode
+
+
+def noop_validator(func):
+    """Validator function decorator flagging that the validator does nothing, e.g. a placeholder.
+
+    """
+    setattr(func, _NOOP_ATTR, True)
+
+    return func
+
+
+def _compile_all(validator, func):
+    """Returns function validating every call.
+
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        """Validates & invokes."""
+        validator(*args, **kwargs)
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
+def _compile_external(validator, func):
+    """Returns function validating outermost calls only.
+
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        """Validates (if outermost) & invokes."""
+        if _nesting.active:
+            return func(*args, **kwargs)
+        validator(*args, **kwargs)
+        _nesting.active = True
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _nesting.active = False
+
+    return wrapper
+
+
+def _compile_none(validator, func):
+    """Returns function that is not validated, i.e. the function itself.
+
+    """
+    return func
+
+
+# Map of validation modes to function compilers.
+_COMPILERS = {
+    VALIDATION_MODE_ALL: _compile_all,
+    VALIDATION_MODE_EXTERNAL: _compile_external,
+    VALIDATION_MODE_NONE: _compile_none
+}
+
 
 def validate(validator):
     """Validation function decorator.
 
+    Each function is compiled upon decoration, as per the current validation
+    mode, into either the function itself or a single closure performing
+    validation, i.e. the mode is not checked per call.  Validators flagged as
+    doing nothing (see noop_validator) are compiled away.
+
     """
     def decorate(func):
         """The decorator."""
-        def wrapper(*args, **kwargs):
-            """The wrapper."""
-            validator(*args, **kwargs)
-            return func(*args, **kwargs)
-        return wrapper
-    return decorate
+        if getattr(validator, _NOOP_ATTR, False):
+            return func
 
+        return _COMPILERS[_mode](validator, func)
+
+    return decorate
@@ -11,6 +11,9 @@
 
 
 """
+import tornado.httpserver
+import tornado.netutil
+import tornado.process
 import tornado.web
 
 from hermes.cv import session as cv_session
@@ -22,6 +25,8 @@ from hermes.web.endpoints import cv
 from hermes.web.endpoints import monitoring
 from hermes.web.endpoints import ops
 from hermes.web.endpoints import metrics_pcmdi
+from hermes.web.utils import executor
+from hermes.web.utils import fanout
 from hermes.web.utils import websockets
 
 
@@ -102,9 +107,46 @@ def _get_app():
                                    **_get_app_settings())
 
 
-def run():
+def _get_process_count(processes):
+    """Returns number of web worker processes to be forked (0 = one per cpu).
+
+    """
+    if processes is None:
+        processes = int(getattr(config.web, 'processes', 1))
+    if processes != 1 and _is_in_debug_mode():
+        log("Debug mode (i.e. autoreload) --> running a single web worker process")
+        processes = 1
+
+    return processes
+
+
+def _listen(app, processes):
+    """Opens port, pre-forking worker processes if required.
+
+    """
+    port = int(config.web.port)
+
+    # Single process.
+    if processes == 1:
+        app.listen(port)
+        return
+
+    # Multiple processes: each worker binds its own socket (SO_REUSEPORT),
+    # thereby letting the kernel balance connections across workers.
+    worker_id = tornado.process.fork_processes(processes)
+    server = tornado.httpserver.HTTPServer(app)
+    server.add_sockets(tornado.netutil.bind_sockets(port, reuse_port=True))
+    log("Web worker {} listening on port {}".format(worker_id, port))
+
+    # Events received by any worker (e.g. web-socket events) are fanned out to all workers.
+    fanout.init(worker_id)
+
+
+def run(processes=None):
     """Runs web service.
 
+    :param int processes: Number of web worker processes (0 = one per cpu, defaults to web.processes config).
+
     """
     # Initialize application.
     log("Initializing")
@@ -116,7 +158,7 @@ def run():
     app = _get_app()
 
     # Open port.
-    app.listen(int(config.web.port))
+    _listen(app, _get_process_count(processes))
 
     # Set web-socket keep alive.
     websockets.keep_alive()
@@ -125,6 +167,10 @@ def run():
     # Start processing requests.
     tornado.ioloop.IOLoop.instance().start()
 
+    # Release executor threads & fanout socket.
+    executor.shutdown()
+    fanout.close()
+
 
 def stop():
     """Stops web service.
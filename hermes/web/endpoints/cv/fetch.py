@@ -16,6 +16,7 @@ import tornado
 from hermes.db import pgres as db
 from hermes.db.pgres import dao
 from hermes.utils import logger
+from hermes.web.utils import executor
 from hermes.web.utils.http1 import process_request
 
 
@@ -39,18 +40,20 @@ class FetchRequestHandler(tornado.web.RequestHandler):
     """Fetch controlled vocabulary setup request handler.
 
     """
+    @tornado.gen.coroutine
     def get(self, *args):
         """HTTP GET handler.
 
         """
+        @executor.blocking
         def _set_data():
             """Pulls data from db.
 
             """
-            with db.session.create():
+            with db.session.create(read_only=True):
                 logger.log_web("[{}]: executing db query: retrieve_cv_terms".format(id(self)))
                 self.cv_terms = [(t.display_name, t.name, t.sort_key, t.synonyms or [], t.typeof, t.uid)
-                                 for t in dao.get_all(db.types.ControlledVocabularyTerm)
+                                 for t in dao.stream_all(db.types.ControlledVocabularyTerm)
                                  if t.typeof not in _EXCLUDED_TERMSETS]
 
 
@@ -72,7 +75,7 @@ class FetchRequestHandler(tornado.web.RequestHandler):
 
 
         # Process request.
-        process_request(self, [
+        yield process_request(self, [
             _set_data,
             _set_output,
             _cleanup
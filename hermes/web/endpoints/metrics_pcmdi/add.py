@@ -17,6 +17,7 @@ from collections import OrderedDict
 
 from hermes.db.mongo import dao_metrics as dao
 from hermes.web.request_validation import validator_metrics_pcmdi as rv
+from hermes.web.utils import executor
 from hermes.web.utils.http import HermesHTTPRequestHandler
 
 
@@ -30,6 +31,7 @@ class AddRequestHandler(HermesHTTPRequestHandler):
     """Simulation metric group add method request handler.
 
     """
+    @tornado.gen.coroutine
     def post(self):
         """HTTP POST handler.
 
@@ -42,6 +44,7 @@ class AddRequestHandler(HermesHTTPRequestHandler):
             self.payload = self.decode_json_body()
 
 
+        @executor.blocking
         def _insert_metrics():
             """Inserts metrics to the db.
 
@@ -78,7 +81,7 @@ class AddRequestHandler(HermesHTTPRequestHandler):
             del self.duplicates
 
         # Invoke tasks.
-        self.invoke(rv.validate_add, [
+        yield self.invoke(rv.validate_add, [
             _decode_request,
             _insert_metrics,
             _set_output,
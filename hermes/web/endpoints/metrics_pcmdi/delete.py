@@ -15,6 +15,7 @@ import tornado
 
 from hermes.db.mongo import dao_metrics as dao
 from hermes.web.request_validation import validator_metrics_pcmdi as rv
+from hermes.web.utils import executor
 from hermes.web.utils.http import HermesHTTPRequestHandler
 
 
@@ -27,17 +28,36 @@ class DeleteRequestHandler(HermesHTTPRequestHandler):
     """Simulation metric group delete method request handler.
 
     """
+    @tornado.gen.coroutine
     def post(self):
         """HTTP POST handler.
 
         """
-        def _do_work():
+        def _decode_request():
+            """Decodes request.
+
+            """
+            self.group = self.get_argument(_PARAM_GROUP)
+            self.query = self.decode_json_body(False)
+
+        @executor.blocking
+        def _delete_metrics():
             """Deletes metrics from db.
 
             """
-            query = self.decode_json_body(False)
+            dao.delete(self.group, self.query)
+            rv.invalidate_group(self.group)
 
-            dao.delete(self.get_argument(_PARAM_GROUP), query)
+        def _cleanup():
+            """Performs cleanup after request processing.
+
+            """
+            del self.group
+            del self.query
 
         # Invoke tasks.
-        self.invoke(rv.validate_delete, _do_work)
+        yield self.invoke(rv.validate_delete, [
+            _decode_request,
+            _delete_metrics,
+            _cleanup
+        ])
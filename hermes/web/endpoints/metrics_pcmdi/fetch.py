@@ -14,6 +14,8 @@
 import tornado
 
 from hermes.db.mongo import dao_metrics as dao
+from hermes.web.utils import executor
+from hermes.web.utils import http_stream
 from hermes.web.utils.http1 import process_request
 from hermes.web.utils.http1 import decode_json_payload
 
@@ -26,12 +28,25 @@ _CONTENT_TYPE_JSON = ["application/json", "application/json; charset=UTF-8"]
 _PARAM_GROUP = 'group'
 
 
+def _format_metric(metric):
+    """Formats a metric set, i.e. moves _id column to the end of the set.
+
+    """
+    values = metric.values()
+
+    return values[1:] + [values[0]]
+
 
 
 class FetchRequestHandler(tornado.web.RequestHandler):
     """Fetches a metrics group.
 
     """
+    # Number of concurrently executing db queries.
+    executor_concurrency = 2
+
+
+    @tornado.gen.coroutine
     def get(self, *args):
         """HTTP GET handler.
 
@@ -44,6 +59,27 @@ class FetchRequestHandler(tornado.web.RequestHandler):
             self.query = decode_json_payload(self, False)
 
 
+        def _begin_stream():
+            """Begins streamed response.
+
+            """
+            http_stream.begin(self)
+            _set_headers()
+
+
+        @executor.blocking
+        def _stream_data():
+            """Streams data from db to client.
+
+            """
+            http_stream.write(self, http_stream.iter_json([
+                ('group', self.group),
+                ('columns', dao.fetch_columns(self.group)),
+                ('metrics', (_format_metric(m) for m in dao.stream(self.group, self.query)))
+                ]))
+
+
+        @executor.blocking
         def _fetch_data():
             """Fetches data from db.
 
@@ -52,13 +88,12 @@ class FetchRequestHandler(tornado.web.RequestHandler):
             self.metrics = dao.fetch(self.group, self.query)
 
 
+        @executor.blocking
         def _format_data():
             """Formats data.
 
             """
-            # Move _id column to the end of each metric set.
-            self.metrics = [m[1:] + [m[0]] for m in
-                            [m.values() for m in self.metrics]]
+            self.metrics = [_format_metric(m) for m in self.metrics]
 
 
         def _set_output():
@@ -90,11 +125,18 @@ class FetchRequestHandler(tornado.web.RequestHandler):
 
 
         # Process request.
-        process_request(self, [
-            _decode_request,
-            _fetch_data,
-            _format_data,
-            _set_output,
-            _set_headers,
-            _cleanup
-            ])
+        if http_stream.is_streamable(self):
+            yield process_request(self, [
+                _decode_request,
+                _begin_stream,
+                _stream_data
+                ])
+        else:
+            yield process_request(self, [
+                _decode_request,
+                _fetch_data,
+                _format_data,
+                _set_output,
+                _set_headers,
+                _cleanup
+                ])
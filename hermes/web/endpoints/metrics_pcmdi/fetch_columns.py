@@ -14,6 +14,7 @@ import tornado
 
 from hermes.db.mongo import dao_metrics as dao
 from hermes.web.request_validation import validator_metrics_pcmdi as rv
+from hermes.web.utils import executor
 from hermes.web.utils.http import HermesHTTPRequestHandler
 
 
@@ -26,6 +27,7 @@ class FetchColumnsRequestHandler(HermesHTTPRequestHandler):
     """Simulation metric group fetch columns method request handler.
 
     """
+    @tornado.gen.coroutine
     def get(self):
         """HTTP GET handler.
 
@@ -36,6 +38,7 @@ class FetchColumnsRequestHandler(HermesHTTPRequestHandler):
             """
             self.group = self.get_argument(_PARAM_GROUP)
 
+        @executor.blocking
         def _set_output():
             """Sets response to be returned to client.
 
@@ -60,7 +63,7 @@ class FetchColumnsRequestHandler(HermesHTTPRequestHandler):
 
 
         # Invoke tasks.
-        self.invoke(rv.validate_fetch_columns, [
+        yield self.invoke(rv.validate_fetch_columns, [
             _decode_request,
             _set_output,
             _set_headers,
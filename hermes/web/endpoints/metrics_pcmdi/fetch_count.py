@@ -10,8 +10,11 @@
 
 
 """
+import tornado
+
 from hermes.db.mongo import dao_metrics as dao
 from hermes.web.request_validation import validator_metrics_pcmdi as rv
+from hermes.web.utils import executor
 from hermes.web.utils.http import HermesHTTPRequestHandler
 
 
@@ -27,6 +30,7 @@ class FetchCountRequestHandler(HermesHTTPRequestHandler):
     """Simulation metric group fetch line count method request handler.
 
     """
+    @tornado.gen.coroutine
     def get(self):
         """HTTP GET handler.
 
@@ -39,6 +43,7 @@ class FetchCountRequestHandler(HermesHTTPRequestHandler):
             self.query = self.decode_json_body(False)
 
 
+        @executor.blocking
         def _set_output():
             """Sets response to be returned to client.
 
@@ -64,7 +69,7 @@ class FetchCountRequestHandler(HermesHTTPRequestHandler):
 
 
         # Invoke tasks.
-        self.invoke(rv.validate_fetch_count, [
+        yield self.invoke(rv.validate_fetch_count, [
             _decode_request,
             _set_output,
             _set_headers,
@@ -14,6 +14,7 @@ import tornado
 
 from hermes.db.mongo import dao_metrics as dao
 from hermes.web.request_validation import validator_metrics_pcmdi as rv
+from hermes.web.utils import executor
 from hermes.web.utils.http import HermesHTTPRequestHandler
 
 
@@ -22,10 +23,12 @@ class FetchListRequestHandler(HermesHTTPRequestHandler):
     """Simulation list metric request handler.
 
     """
+    @tornado.gen.coroutine
     def get(self):
         """HTTP GET handler.
 
         """
+        @executor.blocking
         def _set_output():
             """Sets response to be returned to client.
 
@@ -41,7 +44,7 @@ class FetchListRequestHandler(HermesHTTPRequestHandler):
             self.set_header("Access-Control-Allow-Origin", "*")
 
         # Invoke tasks.
-        self.invoke(rv.validate_fetch_list, [
+        yield self.invoke(rv.validate_fetch_list, [
             _set_output,
             _set_headers
             ])
@@ -14,6 +14,7 @@ import tornado
 
 from hermes.db.mongo import dao_metrics as dao
 from hermes.web.request_validation import validator_metrics_pcmdi as rv
+from hermes.web.utils import executor
 from hermes.web.utils.http import HermesHTTPRequestHandler
 
 
@@ -29,6 +30,7 @@ class FetchSetupRequestHandler(HermesHTTPRequestHandler):
     """Simulation metric group fetch setup method request handler.
 
     """
+    @tornado.gen.coroutine
     def get(self):
         """HTTP GET handler.
 
@@ -40,6 +42,7 @@ class FetchSetupRequestHandler(HermesHTTPRequestHandler):
             self.group = self.get_argument(_PARAM_GROUP)
             self.query = self.decode_json_body(False)
 
+        @executor.blocking
         def _set_output():
             """Sets response to be returned to client.
 
@@ -64,7 +67,7 @@ class FetchSetupRequestHandler(HermesHTTPRequestHandler):
             del self.query
 
         # Invoke tasks.
-        self.invoke(rv.validate_fetch_setup, [
+        yield self.invoke(rv.validate_fetch_setup, [
             _decode_request,
             _set_output,
             _set_headers,
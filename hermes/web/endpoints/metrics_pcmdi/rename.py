@@ -15,6 +15,7 @@ import tornado
 
 from hermes.db.mongo import dao_metrics as dao
 from hermes.web.request_validation import validator_metrics_pcmdi as rv
+from hermes.web.utils import executor
 from hermes.web.utils.http import HermesHTTPRequestHandler
 
 
@@ -28,6 +29,7 @@ class RenameRequestHandler(HermesHTTPRequestHandler):
     """Simulation metric group rename method request handler.
 
     """
+    @tornado.gen.coroutine
     def post(self):
     	"""HTTP POST handler.
 
@@ -39,11 +41,13 @@ class RenameRequestHandler(HermesHTTPRequestHandler):
             self.group = self.get_argument(_PARAM_GROUP)
             self.new_name = self.get_argument(_PARAM_NEW_NAME)
 
+        @executor.blocking
         def _rename_metric_group():
             """Renames metrics group within db.
 
             """
             dao.rename(self.group, self.new_name)
+            rv.invalidate_group(self.group)
 
         def _cleanup():
             """Performs cleanup after request processing.
@@ -53,7 +57,7 @@ class RenameRequestHandler(HermesHTTPRequestHandler):
             del self.new_name
 
         # Invoke tasks.
-        self.invoke(rv.validate_rename, [
+        yield self.invoke(rv.validate_rename, [
             _decode_request,
             _rename_metric_group,
             _cleanup
@@ -15,6 +15,7 @@ import tornado
 
 from hermes.db.mongo import dao_metrics as dao
 from hermes.web.request_validation import validator_metrics_pcmdi as rv
+from hermes.web.utils import executor
 from hermes.web.utils.http import HermesHTTPRequestHandler
 
 
@@ -27,10 +28,12 @@ class SetHashesRequestHandler(HermesHTTPRequestHandler):
     """Simulation metric group set hashes method request handler.
 
     """
+    @tornado.gen.coroutine
     def post(self):
         """HTTP POST handler.
 
         """
+        @executor.blocking
         def _do_work(self):
             """Sets the hash identifiers for all metrics within the group.
 
@@ -38,4 +41,4 @@ class SetHashesRequestHandler(HermesHTTPRequestHandler):
             dao.set_hashes(self.get_argument(_PARAM_GROUP))
 
         # Invoke tasks.
-        self.invoke(rv.validate_set_hashes, _do_work)
+        yield self.invoke(rv.validate_set_hashes, _do_work)
@@ -12,8 +12,8 @@
 
 """
 import datetime
-import json
 
+import tornado.gen
 import tornado.web
 
 from hermes.db import pgres as db
@@ -24,6 +24,10 @@ from hermes.db.pgres.dao_monitoring import retrieve_simulation_job_counts
 from hermes.db.pgres.dao_monitoring import retrieve_simulation_latest_job
 from hermes.utils import logger
 from hermes.utils import string_convertor as sc
+from hermes.web.utils import executor
+from hermes.web.utils import fanout
+from hermes.web.utils import http_validator
+from hermes.web.utils import response_cache
 from hermes.web.utils import websockets
 
 
@@ -32,6 +36,9 @@ from hermes.web.utils import websockets
 # Key used for web socket cache and logging.
 _WS_KEY = 'monitoring'
 
+# Channel upon which entity cache invalidations are fanned out to other web workers.
+_FANOUT_CHANNEL = 'entity-cache'
+
 
 def _log(msg):
     """Helper: logging.
@@ -40,6 +47,35 @@ def _log(msg):
     logger.log_web("{0} :: {1}".format(_WS_KEY, msg))
 
 
+def _invalidate_entity_cache(event_type, simulation_uid, job_uid):
+    """Removes entities affected by a monitoring event from entity cache.
+
+    """
+    if event_type.startswith("simulation"):
+        db.cache.invalidate_simulations([simulation_uid])
+    elif event_type.startswith("job") and not event_type.startswith("job_period"):
+        db.cache.invalidate(db.cache.REGION_JOB, job_uid)
+
+
+def _invalidate_entities(event_type, simulation_uid, job_uid=None):
+    """Removes entities affected by a monitoring event from entity cache (upon all web workers).
+
+    """
+    _invalidate_entity_cache(event_type, simulation_uid, job_uid)
+    fanout.publish(_FANOUT_CHANNEL, {
+        'event_type': event_type,
+        'simulation_uid': simulation_uid,
+        'job_uid': job_uid
+        })
+
+
+def _on_fanout(message):
+    """Removes entities affected by a monitoring event received by another web worker.
+
+    """
+    _invalidate_entity_cache(message['event_type'], message['simulation_uid'], message['job_uid'])
+
+
 def _get_simulation_event_data(request_data):
     """Event data factory: returns simulation event data.
 
@@ -89,7 +125,7 @@ class _EventManager(object):
         """Object initializer.
 
         """
-        self.request_data = json.loads(handler.request.body)
+        self.request_data = http_validator.decode_json_body(handler)
         self.type = self.request_data['event_type']
         if self.type.startswith("simulation"):
             self.data_factory = _get_simulation_event_data
@@ -120,10 +156,12 @@ class EventRequestHandler(tornado.web.RequestHandler):
     """Simulation monitoring web socket event request handler.
 
     """
-    @tornado.web.asynchronous
+    @tornado.gen.coroutine
     def post(self):
         """HTTP POST handler.
 
+        N.B. event data is pulled from db upon the executor thread pool (see executor).
+
         """
         # Signal asynch.
         self.finish()
@@ -136,8 +174,12 @@ class EventRequestHandler(tornado.web.RequestHandler):
         event = _EventManager(self)
         _log("{0} event received: {1}".format(event.type, event.request_data))
 
+        # Invalidate cached entities & responses (prior to notifying web-socket clients who may refetch).
+        _invalidate_entities(event.type, event.request_data['simulation_uid'], event.request_data.get('job_uid'))
+        response_cache.invalidate(event.type, event.request_data['simulation_uid'])
+
         # Set event data.
-        data = event.get_websocket_data()
+        data = yield executor.execute_request(self, event.get_websocket_data)
 
         # Publish web-socket event.
         if data is not None:
@@ -146,3 +188,7 @@ class EventRequestHandler(tornado.web.RequestHandler):
                 'event_timestamp': datetime.datetime.utcnow(),
             })
             websockets.on_write(_WS_KEY, data, _ws_client_filter)
+
+
+# Receive entity cache invalidations fanned out by other web workers.
+fanout.subscribe(_FANOUT_CHANNEL, _on_fanout)
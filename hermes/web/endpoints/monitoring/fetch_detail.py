@@ -14,13 +14,12 @@
 import tornado
 
 from hermes.db import pgres as db
-from hermes.db.pgres.dao_monitoring import retrieve_simulation
-from hermes.db.pgres.dao_monitoring import retrieve_simulation_jobs
-from hermes.db.pgres.dao_monitoring import retrieve_simulation_configuration
-from hermes.db.pgres.dao_monitoring import retrieve_latest_job_period
-from hermes.db.pgres.dao_monitoring import retrieve_simulation_previous_tries
-from hermes.db.pgres.dao_mq import has_messages
+from hermes.db.pgres.dao_monitoring_fastpath import retrieve_simulation_detail_json
+from hermes.db.pgres.dao_monitoring_fastpath import retrieve_simulation_marker
 from hermes.utils import logger
+from hermes.web.utils import executor
+from hermes.web.utils import http_conditional
+from hermes.web.utils import response_cache
 from hermes.web.utils.http1 import process_request
 
 
@@ -33,6 +32,7 @@ class FetchDetailRequestHandler(tornado.web.RequestHandler):
     """Simulation monitor front end setup request handler.
 
     """
+    @tornado.gen.coroutine
     def get(self, *args):
         """HTTP GET handler.
 
@@ -44,62 +44,70 @@ class FetchDetailRequestHandler(tornado.web.RequestHandler):
             self.uid = self.get_argument(_PARAM_UID)
 
 
-        def _set_data():
-            """Pulls data from db.
+        def _set_cached_data():
+            """Pulls data (& the marker from which it was built) from response cache.
+
+            """
+            self.detail, self.marker = response_cache.get_marked(self)
+            self.response_cached = self.detail is not None
+
+
+        @executor.blocking
+        def _set_marker():
+            """Pulls simulation last update marker from db.
 
             """
-            with db.session.create():
-                logger.log_web("[{}]: executing db query: retrieve_simulation_try".format(id(self)))
-                self.simulation = retrieve_simulation(self.uid)
+            with db.session.create(read_only=True):
+                self.marker = retrieve_simulation_marker(self.uid)
 
-                logger.log_web("[{}]: executing db query: retrieve_simulation_jobs".format(id(self)))
-                self.job_list = retrieve_simulation_jobs(self.uid)
 
-                logger.log_web("[{}]: executing db query: retrieve_simulation_configuration".format(id(self)))
-                self.configuration = retrieve_simulation_configuration(self.uid)
+        def _set_validators():
+            """Sets response validators (a 304 is returned if client's copy is up to date).
 
-                logger.log_web("[{}]: executing db query: has_messages".format(id(self)))
-                self.has_messages = has_messages(self.uid)
+            """
+            http_conditional.set_validators(self, self.marker)
+
+
+        @executor.blocking
+        def _set_data():
+            """Pulls data from db.
 
-                logger.log_web("[{}]: executing db query: retrieve_latest_job_period".format(id(self)))
-                self.latest_job_period = retrieve_latest_job_period(self.uid)
+            N.B. the marker is pulled beforehand, hence the data is at least as recent as the
+            marker from which the response validators are derived.
 
-                if self.simulation.try_id == 1:
-                    self.previous_tries = []
-                else:
-                    logger.log_web("[{}]: executing db query: retrieve_previous_tries".format(id(self)))
-                    self.previous_tries = retrieve_simulation_previous_tries(self.simulation.hashid, self.simulation.try_id)
+            """
+            with db.session.create(read_only=True):
+                logger.log_web("[{}]: executing db query: retrieve_simulation_detail_json".format(id(self)))
+                self.detail = retrieve_simulation_detail_json(self.uid)
+            if self.detail is None:
+                raise ValueError("Simulation not found: {}".format(self.uid))
+            response_cache.set(self, self.detail, self.marker)
 
 
-        def _set_output(self):
+        def _set_output():
             """Sets response to be returned to client.
 
             """
-            self.output = {
-                'config_card': self.configuration.card if self.configuration else None,
-                'has_messages': self.has_messages,
-                'job_list': self.job_list,
-                'latest_job_period': self.latest_job_period,
-                'previous_tries': self.previous_tries,
-                'simulation': self.simulation
-            }
+            # N.B. json document is assembled by db and written as is.
+            self.write_raw_output = True
+            self.output = self.detail
 
 
         def _cleanup():
             """Performs cleanup after request processing.
 
             """
-            del self.configuration
-            del self.has_messages
-            del self.job_list
-            del self.previous_tries
-            del self.simulation
+            del self.detail
+            del self.marker
             del self.uid
 
 
         # Process request.
-        process_request(self, [
+        yield process_request(self, [
             _set_criteria,
+            _set_cached_data,
+            _set_marker,
+            _set_validators,
             _set_data,
             _set_output,
             _cleanup
@@ -15,8 +15,13 @@ import tornado
 
 from hermes.db import pgres as db
 from hermes.db.pgres.dao_monitoring import retrieve_simulation
+from hermes.db.pgres.dao_monitoring_fastpath import retrieve_simulation_marker
 from hermes.db.pgres.dao_mq import retrieve_messages
+from hermes.db.pgres.dao_mq import stream_messages
 from hermes.utils import logger
+from hermes.web.utils import executor
+from hermes.web.utils import http_conditional
+from hermes.web.utils import http_stream
 from hermes.web.utils.http1 import process_request
 
 
@@ -29,6 +34,7 @@ class FetchMessagesRequestHandler(tornado.web.RequestHandler):
     """Simulation monitor fetch messages request handler.
 
     """
+    @tornado.gen.coroutine
     def get(self, *args):
         """HTTP GET handler.
 
@@ -40,11 +46,51 @@ class FetchMessagesRequestHandler(tornado.web.RequestHandler):
             self.simulation_uid = self.get_argument(_PARAM_UID)
 
 
+        @executor.blocking
+        def _set_marker():
+            """Pulls simulation last update marker from db.
+
+            """
+            with db.session.create(read_only=True):
+                self.marker = retrieve_simulation_marker(self.simulation_uid, include_messages=True)
+
+
+        def _set_validators():
+            """Sets response validators (a 304 is returned if client's copy is up to date).
+
+            """
+            http_conditional.set_validators(self, self.marker)
+
+
+        def _begin_stream():
+            """Begins streamed response.
+
+            """
+            http_stream.begin(self)
+
+
+        @executor.blocking
+        def _stream_data():
+            """Streams data from db to client.
+
+            """
+            with db.session.create(read_only=True):
+                logger.log_web("[{}]: executing db query: retrieve_simulation".format(id(self)))
+                simulation = retrieve_simulation(self.simulation_uid)
+
+                logger.log_web("[{}]: executing db query: stream_messages".format(id(self)))
+                http_stream.write(self, http_stream.iter_json([
+                    ('message_history', stream_messages(self.simulation_uid)),
+                    ('simulation', simulation)
+                    ]))
+
+
+        @executor.blocking
         def _set_data():
             """Pulls data from db.
 
             """
-            with db.session.create():
+            with db.session.create(read_only=True):
                 logger.log_web("[{}]: executing db query: retrieve_simulation".format(id(self)))
                 self.simulation = retrieve_simulation(self.simulation_uid)
 
@@ -68,13 +114,25 @@ class FetchMessagesRequestHandler(tornado.web.RequestHandler):
             """
             del self.simulation_uid
             del self.simulation
+            del self.marker
             del self.message_history
 
 
         # Process request.
-        process_request(self, [
-            _set_criteria,
-            _set_data,
-            _set_output,
-            _cleanup
-            ])
+        if http_stream.is_streamable(self):
+            yield process_request(self, [
+                _set_criteria,
+                _set_marker,
+                _set_validators,
+                _begin_stream,
+                _stream_data
+                ])
+        else:
+            yield process_request(self, [
+                _set_criteria,
+                _set_marker,
+                _set_validators,
+                _set_data,
+                _set_output,
+                _cleanup
+                ])
@@ -17,21 +17,27 @@ import arrow
 import tornado
 
 from hermes.db import pgres as db
-from hermes.db.pgres.dao_monitoring import retrieve_active_simulations
-from hermes.db.pgres.dao_monitoring import retrieve_active_job_counts
-from hermes.db.pgres.dao_monitoring import retrieve_latest_active_jobs
-from hermes.db.pgres.dao_monitoring import retrieve_latest_active_job_periods
+from hermes.db.pgres.dao_monitoring_fastpath import retrieve_timeslice_delta_json
+from hermes.db.pgres.dao_monitoring_fastpath import retrieve_timeslice_json
+from hermes.db.pgres.dao_monitoring_fastpath import stream_timeslice
 from hermes.utils import logger
+from hermes.web.utils import executor
+from hermes.web.utils import http_stream
+from hermes.web.utils import response_cache
 from hermes.web.utils.http1 import process_request
 
 
 
 # Query parameter names.
+_PARAM_SINCE = 'since'
 _PARAM_TIMESLICE = 'timeslice'
 
+# Timeslice: all active simulations.
+_TIMESLICE_ALL = "*"
+
 # Map of timeslices to time deltas (in days).
 _TIMESLICE_DELTAS = {
-    "*": None,
+    _TIMESLICE_ALL: None,
     "1W": 7,
     "2W": 14,
     "1M": 31,
@@ -45,7 +51,19 @@ _TIMESLICE_DELTAS = {
 class FetchTimeSliceRequestHandler(tornado.web.RequestHandler):
     """Fetches a time slice of simulations.
 
+    Responses carry a change log cursor.  When passed back via the since parameter
+    only simulations changed (or removed) since the cursor are returned.  The complete
+    timeslice is served from the response cache when available, otherwise it is
+    streamed from db to client rather than assembled in memory.  N.B. streamed
+    responses are not themselves cached as doing so would hold them in memory, hence
+    the cache is populated by non-streamed requests.
+
     """
+    # Number of concurrently executing db queries.
+    executor_concurrency = 2
+
+
+    @tornado.gen.coroutine
     def get(self, *args):
         """HTTP GET handler.
 
@@ -57,54 +75,90 @@ class FetchTimeSliceRequestHandler(tornado.web.RequestHandler):
             delta = _TIMESLICE_DELTAS[self.get_argument(_PARAM_TIMESLICE)]
             self.start_date = None if delta is None else \
                               (arrow.utcnow() - datetime.timedelta(days=delta)).datetime
+            self.since = self.get_argument(_PARAM_SINCE, None)
 
 
-        def _set_data():
-            """Pulls data from db.
+        def _set_cached_data():
+            """Pulls data from response cache.
+
+            """
+            # N.B. deltas are cursor specific & are therefore not cached.
+            self.timeslice = None if self.since else response_cache.get(self)
+            self.response_cached = self.timeslice is not None
+
+
+        def _begin_stream():
+            """Begins streamed response (unless served from cache).
 
             """
-            with db.session.create():
-                logger.log_web("[{}]: executing db query: retrieve_active_simulations".format(id(self)))
-                self.simulations = retrieve_active_simulations(self.start_date)
+            if not self.response_cached:
+                http_stream.begin(self)
+
 
-                logger.log_web("[{}]: executing db query: retrieve_active_job_counts".format(id(self)))
-                self.job_counts = retrieve_active_job_counts(self.start_date)
+        @executor.blocking
+        def _stream_data():
+            """Streams data from db to client.
 
-                logger.log_web("[{}]: executing db query: retrieve_latest_active_jobs".format(id(self)))
-                self.latest_compute_jobs = retrieve_latest_active_jobs(self.start_date)
+            """
+            with db.session.create(read_only=True):
+                logger.log_web("[{}]: executing db query: stream_timeslice".format(id(self)))
+                http_stream.write(self, http_stream.iter_json(stream_timeslice(self.start_date)))
 
-                logger.log_web("[{}]: executing db query: retrieve_latest_active_job_periods".format(id(self)))
-                self.job_periods = retrieve_latest_active_job_periods(self.start_date)
+
+        @executor.blocking
+        def _set_data():
+            """Pulls data from db.
+
+            """
+            with db.session.create(read_only=True):
+                if self.since:
+                    logger.log_web("[{}]: executing db query: retrieve_timeslice_delta_json".format(id(self)))
+                    self.timeslice = retrieve_timeslice_delta_json(self.since, self.start_date)
+                else:
+                    logger.log_web("[{}]: executing db query: retrieve_timeslice_json".format(id(self)))
+                    self.timeslice = retrieve_timeslice_json(self.start_date)
+            response_cache.set(self, self.timeslice)
 
 
         def _set_output():
             """Sets response to be returned to client.
 
             """
+            # N.B. streamed responses are written as data is pulled from db.
+            if self.timeslice is None:
+                return
+
+            # N.B. json document is assembled by db and written as is.
             self.write_raw_output = True
-            self.output = {
-                'jobCounts': self.job_counts,
-                'jobPeriodList': self.job_periods,
-                'simulationList': self.simulations,
-                'latestComputeJobs': self.latest_compute_jobs
-            }
+            self.output = self.timeslice
 
 
         def _cleanup():
             """Performs cleanup after request processing.
 
             """
-            del self.job_counts
-            del self.job_periods
-            del self.latest_compute_jobs
-            del self.simulations
+            del self.since
             del self.start_date
+            del self.timeslice
 
 
         # Process request.
-        process_request(self, [
-            _set_criteria,
-            _set_data,
-            _set_output,
-            _cleanup
-            ])
+        if self.get_argument(_PARAM_TIMESLICE, None) == _TIMESLICE_ALL and \
+           self.get_argument(_PARAM_SINCE, None) is None and \
+           http_stream.is_streamable(self):
+            yield process_request(self, [
+                _set_criteria,
+                _set_cached_data,
+                _begin_stream,
+                _stream_data,
+                _set_output,
+                _cleanup
+                ])
+        else:
+            yield process_request(self, [
+                _set_criteria,
+                _set_cached_data,
+                _set_data,
+                _set_output,
+                _cleanup
+                ])
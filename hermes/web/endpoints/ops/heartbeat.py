@@ -16,6 +16,7 @@ import datetime as dt
 import tornado
 
 import hermes
+from hermes.web.utils import response_cache
 from hermes.web.utils.http1 import process_request
 
 
@@ -25,6 +26,7 @@ class HeartbeatRequestHandler(tornado.web.RequestHandler):
     """Operations heartbeat request handler.
 
     """
+    @tornado.gen.coroutine
     def get(self):
         """HTTP GET handler.
 
@@ -35,9 +37,10 @@ class HeartbeatRequestHandler(tornado.web.RequestHandler):
             """
             self.output = {
                 "message": "HERMES web service is operational @ {}".format(dt.datetime.now()),
+                "response_cache": response_cache.get_stats(),
                 "version": hermes.__version__
             }
 
 
         # Process request.
-        process_request(self, _set_output)
+        yield process_request(self, _set_output)
@@ -21,14 +21,18 @@ from voluptuous import Schema
 _HTTP_HEADER_CONTENT_TYPE = "Content-Type"
 
 
-def validate_data(data, schema_config):
+def validate_data(data, schema):
     """Validates input data by applying a schema.
 
+    N.B. schemas are best compiled once (at module level) rather than per request.
+
     :param dict data: Input data to be validated.
-    :param dict schema_config: Schema to apply.
+    :param voluptuous.Schema | dict schema: Schema (or schema configuration) to apply.
 
     """
-    Schema(schema_config)(data)
+    if not isinstance(schema, Schema):
+        schema = Schema(schema)
+    schema(data)
 
 
 def Sequence(expected_type, expected_length=1, expected_sequence_type=list):
@@ -15,14 +15,19 @@ import re
 
 from voluptuous import All
 from voluptuous import Required
+from voluptuous import Schema
 
 from hermes.db.mongo import dao_metrics as dao
+from hermes.utils import config
+from hermes.utils.cache import TimedCache
 from hermes.web.request_validation import validator as rv
+from hermes.web.utils import executor
+from hermes.web.utils import fanout
 
 
 
 # Regular expression for validating group name.
-_GROUP_NAME_REGEX = '[^a-zA-Z0-9_-]'
+_GROUP_NAME_REGEX = re.compile('[^a-zA-Z0-9_-]')
 
 # Min/max length of group name.
 _GROUP_NAME_MIN_LENGTH = 4
@@ -38,6 +43,46 @@ _PARAM_NEW_NAME = 'new_name'
 # Set of allowed duplicate actions.
 _DUPLICATE_ACTIONS = {u'skip', u'force'}
 
+# Cache of names of existing groups, i.e. avoids a db round trip per request.
+# N.B. validators asserting that a group exists are therefore flagged as blocking (see executor).
+# N.B. names are invalidated when a group is dropped or renamed (see invalidate_group).
+_EXISTING_GROUPS = TimedCache(getattr(config.web, 'metricGroupCacheTTLInSeconds', 30), 1000)
+
+# Channel upon which group name invalidations are fanned out to other web workers.
+_FANOUT_CHANNEL = 'metric-group-cache'
+
+
+def invalidate_group(name):
+    """Removes a group name from the cache of existing groups (upon all web workers).
+
+    :param str name: Name of a metric group.
+
+    """
+    _EXISTING_GROUPS.invalidate(name)
+    fanout.publish(_FANOUT_CHANNEL, {
+        'group': name
+        })
+
+
+def _on_fanout(message):
+    """Removes a group name from the cache of existing groups upon receipt of an invalidation from another web worker.
+
+    """
+    _EXISTING_GROUPS.invalidate(message['group'])
+
+
+def _group_exists(name):
+    """Returns flag indicating whether a group exists, only positive results are cached.
+
+    """
+    if _EXISTING_GROUPS.get(name, False):
+        return True
+    if dao.exists(name):
+        _EXISTING_GROUPS.set(name, True)
+        return True
+
+    return False
+
 
 def _GroupName(assert_exists):
     """Validates group name.
@@ -48,7 +93,7 @@ def _GroupName(assert_exists):
 
         """
         # Validate reg-ex.
-        if re.compile(_GROUP_NAME_REGEX).search(val):
+        if _GROUP_NAME_REGEX.search(val):
             raise ValueError("Metric group name contains invalid characters: {0}".format(val))
 
         # Validate length.
@@ -57,9 +102,11 @@ def _GroupName(assert_exists):
             raise ValueError("Metric group name length is out of bounds: {0}".format(val))
 
         # Validate exists in db.
-        if assert_exists and not dao.exists(val):
+        if assert_exists and not _group_exists(val):
             raise ValueError("{0} db collection not found".format(val))
 
+        return val
+
     return f
 
 
@@ -77,27 +124,52 @@ def _DuplicateAction():
     return f
 
 
-def _Metrics(body):
+def _Metrics():
     """Validates a set of metrics.
 
     """
-    def f(val):
+    def f(body):
         """Inner function.
 
         """
         # Validate metrics count > 0.
-        if len(val) == 0:
+        if len(body[_PARAM_METRICS]) == 0:
             raise ValueError("No metrics to add")
 
         # Validate that length of each metric is same as length of group columns.
-        for metric in val:
-            if len(metric) != len(body['columns']):
+        for metric in body[_PARAM_METRICS]:
+            if len(metric) != len(body[_PARAM_COLUMNS]):
                 raise ValueError("Number of values does not match number of columns")
 
+        return body
 
     return f
 
 
+# Schema: add endpoint query arguments.
+_SCHEMA_ADD_QUERY = Schema({
+    _PARAM_DUPLICATE_ACTION: All(rv.Sequence(unicode), _DuplicateAction())
+    })
+
+# Schema: add endpoint body.
+_SCHEMA_ADD_BODY = Schema(All({
+    Required(_PARAM_GROUP): All(unicode, _GroupName(False)),
+    Required(_PARAM_COLUMNS): All(rv.Sequence(unicode, 0)),
+    Required(_PARAM_METRICS): All(rv.Sequence(list, 0))
+    }, _Metrics()))
+
+# Schema: query arguments referencing an existing group.
+_SCHEMA_GROUP_QUERY = Schema({
+    Required(_PARAM_GROUP): All(rv.Sequence(unicode), _GroupName(True))
+    })
+
+# Schema: rename endpoint query arguments.
+_SCHEMA_RENAME_QUERY = Schema({
+    Required(_PARAM_GROUP): All(rv.Sequence(unicode), _GroupName(True)),
+    Required(_PARAM_NEW_NAME): All(rv.Sequence(unicode), _GroupName(False))
+    })
+
+
 def validate_add(handler):
     """Validates add endpoint HTTP request.
 
@@ -106,27 +178,20 @@ def validate_add(handler):
         """Validates HTTP request query arguments.
 
         """
-        rv.validate_data(handler.request.query_arguments, {
-            _PARAM_DUPLICATE_ACTION: All(rv.Sequence(unicode), _DuplicateAction())
-            })
+        rv.validate_data(handler.request.query_arguments, _SCHEMA_ADD_QUERY)
 
 
     def _validate_body():
         """Validates HTTP request body.
 
         """
-        body = handler.decode_json_body(False)
-
-        rv.validate_data(body, {
-            Required(_PARAM_GROUP): All(unicode, _GroupName(False)),
-            Required(_PARAM_COLUMNS): All(rv.Sequence(unicode, 0)),
-            Required(_PARAM_METRICS): All(rv.Sequence(list, 0), _Metrics(body))
-            })
+        rv.validate_data(handler.decode_json_body(False), _SCHEMA_ADD_BODY)
 
 
     rv.validate(handler, body_validator=_validate_body, query_validator=_validate_query)
 
 
+@executor.blocking
 def validate_delete(handler):
     """Validates delete endpoint HTTP request.
 
@@ -135,9 +200,7 @@ def validate_delete(handler):
         """Validates HTTP request query arguments.
 
         """
-        rv.validate_data(handler.request.query_arguments, {
-            Required(_PARAM_GROUP): All(rv.Sequence(unicode), _GroupName(True))
-        })
+        rv.validate_data(handler.request.query_arguments, _SCHEMA_GROUP_QUERY)
 
     def _validate_body():
         """Validates HTTP request query arguments.
@@ -153,6 +216,7 @@ def validate_delete(handler):
         )
 
 
+@executor.blocking
 def validate_fetch(handler):
     """Validates fetch endpoint HTTP request.
 
@@ -161,9 +225,7 @@ def validate_fetch(handler):
         """Validates HTTP request query arguments.
 
         """
-        rv.validate_data(handler.request.query_arguments, {
-            Required(_PARAM_GROUP): All(rv.Sequence(unicode), _GroupName(True))
-        })
+        rv.validate_data(handler.request.query_arguments, _SCHEMA_GROUP_QUERY)
 
     def _validate_body():
         """Validates HTTP request query arguments.
@@ -179,6 +241,7 @@ def validate_fetch(handler):
         )
 
 
+@executor.blocking
 def validate_fetch_columns(handler):
     """Validates fetch_columns endpoint HTTP request.
 
@@ -187,13 +250,12 @@ def validate_fetch_columns(handler):
         """Validates HTTP request query arguments.
 
         """
-        rv.validate_data(handler.request.query_arguments, {
-            Required(_PARAM_GROUP): All(rv.Sequence(unicode), _GroupName(True))
-        })
+        rv.validate_data(handler.request.query_arguments, _SCHEMA_GROUP_QUERY)
 
     rv.validate(handler, query_validator=_validate_query)
 
 
+@executor.blocking
 def validate_fetch_count(handler):
     """Validates fetch_count endpoint HTTP request.
 
@@ -202,9 +264,7 @@ def validate_fetch_count(handler):
         """Validates HTTP request query arguments.
 
         """
-        rv.validate_data(handler.request.query_arguments, {
-            Required(_PARAM_GROUP): All(rv.Sequence(unicode), _GroupName(True))
-        })
+        rv.validate_data(handler.request.query_arguments, _SCHEMA_GROUP_QUERY)
 
     def _validate_body():
         """Validates HTTP request query arguments.
@@ -227,6 +287,7 @@ def validate_fetch_list(handler):
     rv.validate(handler)
 
 
+@executor.blocking
 def validate_fetch_setup(handler):
     """Validates fetch_setup endpoint HTTP request.
 
@@ -235,9 +296,7 @@ def validate_fetch_setup(handler):
         """Validates HTTP request query arguments.
 
         """
-        rv.validate_data(handler.request.query_arguments, {
-            Required(_PARAM_GROUP): All(rv.Sequence(unicode), _GroupName(True))
-        })
+        rv.validate_data(handler.request.query_arguments, _SCHEMA_GROUP_QUERY)
 
     def _validate_body():
         """Validates HTTP request query arguments.
@@ -253,6 +312,7 @@ def validate_fetch_setup(handler):
         )
 
 
+@executor.blocking
 def validate_rename(handler):
     """Validates rename endpoint HTTP request.
 
@@ -261,14 +321,12 @@ def validate_rename(handler):
         """Validates HTTP request query arguments.
 
         """
-        rv.validate_data(handler.request.query_arguments, {
-            Required(_PARAM_GROUP): All(rv.Sequence(unicode), _GroupName(True)),
-            Required(_PARAM_NEW_NAME): All(rv.Sequence(unicode), _GroupName(False))
-        })
+        rv.validate_data(handler.request.query_arguments, _SCHEMA_RENAME_QUERY)
 
     rv.validate(handler, query_validator=_validate_query)
 
 
+@executor.blocking
 def validate_set_hashes(handler):
     """Validates set_hashes endpoint HTTP request.
 
@@ -277,8 +335,10 @@ def validate_set_hashes(handler):
         """Validates HTTP request query arguments.
 
         """
-        rv.validate_data(handler.request.query_arguments, {
-            Required(_PARAM_GROUP): All(rv.Sequence(unicode), _GroupName(True))
-        })
+        rv.validate_data(handler.request.query_arguments, _SCHEMA_GROUP_QUERY)
 
     rv.validate(handler, query_validator=_validate_query)
+
+
+# Receive group name invalidations fanned out by other web workers.
+fanout.subscribe(_FANOUT_CHANNEL, _on_fanout)
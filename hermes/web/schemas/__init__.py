@@ -1,2 +1,3 @@
 from hermes.web.schemas.cache import init
-from hermes.web.schemas.cache import get_schema
\ No newline at end of file
+from hermes.web.schemas.cache import get_schema
+from hermes.web.schemas.cache import get_validator
@@ -12,6 +12,8 @@
 """
 import collections
 
+import jsonschema
+
 from hermes.web.schemas import loader
 
 
@@ -19,6 +21,9 @@ from hermes.web.schemas import loader
 # Cached store of loaded schemas.
 _store = collections.defaultdict(dict)
 
+# Cached store of validators compiled from loaded schemas.
+_validators = collections.defaultdict(dict)
+
 
 
 def init(endpoints):
@@ -29,7 +34,21 @@ def init(endpoints):
 	"""
 	for endpoint in endpoints:
 		for typeof in {'body', 'params', 'headers'}:
-			_store[typeof][endpoint] = loader.load(typeof, endpoint)
+			_store[typeof][endpoint] = schema = loader.load(typeof, endpoint)
+			_validators[typeof][endpoint] = _compile(schema)
+
+
+def _compile(schema):
+	"""Returns a validator compiled from a schema, i.e. the schema is checked & resolved once only.
+
+	"""
+	if schema is None:
+		return None
+
+	cls = jsonschema.validators.validator_for(schema)
+	cls.check_schema(schema)
+
+	return cls(schema)
 
 
 def get_schema(typeof, endpoint):
@@ -37,3 +56,10 @@ def get_schema(typeof, endpoint):
 
 	"""
 	return _store[typeof][endpoint]
+
+
+def get_validator(typeof, endpoint):
+	"""Gets a compiled schema validator from cache.
+
+	"""
+	return _validators[typeof][endpoint]
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: hermes.web.utils.executor.py
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL/CeCIL
+   :platform: Unix, Windows
+   :synopsis: Executes blocking (i.e. db bound) request tasks off the IOLoop.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+from concurrent.futures import ThreadPoolExecutor
+import tornado.gen
+import tornado.locks
+
+from hermes.utils import config
+from hermes.utils import logger
+
+
+
+# Number of executor threads (N.B. each thread may hold a db connection).
+_WORKERS = getattr(config.web, 'executorWorkers', 8)
+
+# Default number of concurrently executing blocking task chains per endpoint.
+_DEFAULT_CONCURRENCY = getattr(config.web, 'executorEndpointConcurrency', 4)
+
+# Name of attribute flagging a task as blocking.
+_BLOCKING_ATTR = '_hermes_blocking'
+
+# Thread pool upon which blocking tasks are executed.
+_pool = None
+
+# Semaphores limiting concurrency keyed by endpoint.
+_semaphores = {}
+
+
+def blocking(task):
+    """Decorator flagging a request task as blocking, i.e. to be executed off the IOLoop.
+
+    N.B. Blocking tasks must not write to the request handler.
+
+    """
+    setattr(task, _BLOCKING_ATTR, True)
+
+    return task
+
+
+def is_blocking(task):
+    """Returns flag indicating whether a request task is blocking.
+
+    """
+    return getattr(task, _BLOCKING_ATTR, False)
+
+
+def get_chains(tasks):
+    """Returns request tasks grouped into chains, consecutive blocking tasks forming a single chain.
+
+    :param list tasks: Request tasks.
+
+    :returns: Sequence of (is blocking flag, tasks) pairs.
+    :rtype: list
+
+    """
+    chains = []
+    for task in tasks:
+        task_is_blocking = is_blocking(task)
+        if chains and task_is_blocking and chains[-1][0]:
+            chains[-1][1].append(task)
+        else:
+            chains.append((task_is_blocking, [task]))
+
+    return chains
+
+
+def get_pool():
+    """Returns thread pool upon which blocking tasks are executed.
+
+    """
+    global _pool
+
+    if _pool is None:
+        _pool = ThreadPoolExecutor(_WORKERS)
+
+    return _pool
+
+
+def get_semaphore(key, concurrency=None):
+    """Returns semaphore limiting concurrency of an endpoint.
+
+    :param str key: Endpoint key.
+    :param int concurrency: Number of task chains that may execute concurrently.
+
+    """
+    try:
+        return _semaphores[key]
+    except KeyError:
+        semaphore = _semaphores[key] = tornado.locks.Semaphore(concurrency or _DEFAULT_CONCURRENCY)
+
+        return semaphore
+
+
+@tornado.gen.coroutine
+def execute(key, chain, concurrency=None):
+    """Executes a blocking task chain upon the thread pool.
+
+    :param str key: Endpoint key.
+    :param function chain: Blocking task chain.
+    :param int concurrency: Number of task chains of the endpoint that may execute concurrently.
+
+    :returns: Future resolved with chain result.
+    :rtype: tornado.concurrent.Future
+
+    """
+    semaphore = get_semaphore(key, concurrency)
+    yield semaphore.acquire()
+    try:
+        result = yield get_pool().submit(chain)
+    finally:
+        semaphore.release()
+
+    raise tornado.gen.Return(result)
+
+
+def get_key(handler):
+    """Returns endpoint key of a request handler, i.e. qualified handler class name.
+
+    N.B. handler class names are not unique across endpoints (e.g. FetchRequestHandler).
+
+    :param tornado.web.RequestHandler handler: A web request handler.
+
+    :returns: Endpoint key.
+    :rtype: str
+
+    """
+    cls = handler.__class__
+
+    return "{}.{}".format(cls.__module__, cls.__name__)
+
+
+def execute_request(handler, chain):
+    """Executes a blocking task chain of a request upon the thread pool.
+
+    Concurrency is limited per endpoint, handlers may override the default limit
+    via an executor_concurrency attribute.
+
+    :param tornado.web.RequestHandler handler: A web request handler.
+    :param function chain: Blocking task chain.
+
+    :returns: Future resolved with chain result.
+    :rtype: tornado.concurrent.Future
+
+    """
+    return execute(get_key(handler), chain, getattr(handler, 'executor_concurrency', None))
+
+
+def shutdown():
+    """Shuts down thread pool.
+
+    """
+    global _pool
+
+    if _pool is not None:
+        logger.log_web("shutting down executor")
+        _pool.shutdown(wait=True)
+        _pool = None
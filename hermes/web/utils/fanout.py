@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: hermes.web.utils.fanout.py
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL/CeCIL
+   :platform: Unix
+   :synopsis: Fans out messages across web worker processes via unix datagram sockets.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import errno
+import glob
+import json
+import os
+import socket
+import tempfile
+
+import tornado.ioloop
+
+from hermes.utils import config
+from hermes.utils import logger
+
+
+
+# Directory within which worker sockets are bound.
+_SOCKET_DIRECTORY = getattr(config.web, 'fanoutSocketDirectory', tempfile.gettempdir())
+
+# Maximum size (in bytes) of a fanned out message.
+_MAX_MESSAGE_SIZE = 1 << 20
+
+# Socket of current worker.
+_socket = None
+
+# Path to socket of current worker.
+_path = None
+
+# Message handlers keyed by channel.
+_subscribers = {}
+
+
+def get_path(worker_id):
+    """Returns path to a worker socket.
+
+    :param int worker_id: Worker process identifier.
+
+    :returns: Path to worker's socket.
+    :rtype: str
+
+    """
+    return os.path.join(_SOCKET_DIRECTORY, "hermes-web-{}-{}.sock".format(config.web.port, worker_id))
+
+
+def _get_peers():
+    """Returns paths to sockets of other workers.
+
+    """
+    return [i for i in glob.glob(get_path('*')) if i != _path]
+
+
+def is_initialized():
+    """Returns flag indicating whether current worker has joined the fanout channels.
+
+    """
+    return _socket is not None
+
+
+def subscribe(channel, on_message):
+    """Subscribes to messages published upon a channel by other workers.
+
+    :param str channel: Channel name.
+    :param function on_message: Callback invoked with each message received from another worker.
+
+    """
+    _subscribers[channel] = on_message
+
+
+def _dispatch(envelope):
+    """Dispatches a received message to the channel subscriber.
+
+    """
+    try:
+        on_message = _subscribers[envelope['channel']]
+    except KeyError:
+        logger.log_web_warning("fanout message upon unsubscribed channel :: {}".format(envelope['channel']))
+    else:
+        on_message(envelope['message'])
+
+
+def init(worker_id):
+    """Joins current worker to the fanout channels.
+
+    :param int worker_id: Worker process identifier.
+
+    """
+    global _socket, _path
+
+    _path = get_path(worker_id)
+    if os.path.exists(_path):
+        os.remove(_path)
+
+    _socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    _socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, _MAX_MESSAGE_SIZE)
+    _socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, _MAX_MESSAGE_SIZE)
+    _socket.setblocking(0)
+    _socket.bind(_path)
+
+    def _on_read(fd, events):
+        """Dispatches received messages.
+
+        """
+        while True:
+            try:
+                data = _socket.recv(_MAX_MESSAGE_SIZE)
+            except socket.error as err:
+                if err.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    return
+                raise
+            try:
+                _dispatch(json.loads(data))
+            except Exception as err:
+                logger.log_web_error("fanout message dispatch error :: {}".format(err))
+
+    tornado.ioloop.IOLoop.current().add_handler(_socket.fileno(), _on_read, tornado.ioloop.IOLoop.READ)
+    logger.log_web("fanout channels joined :: {}".format(_path))
+
+
+def publish(channel, message):
+    """Publishes a message to other workers (no-op unless current worker has joined the fanout channels).
+
+    N.B. Delivery is best effort, i.e. messages to absent or saturated workers are dropped.
+
+    :param str channel: Channel name.
+    :param dict message: JSON serializable message.
+
+    """
+    if _socket is None:
+        return
+
+    data = json.dumps({
+        'channel': channel,
+        'message': message
+        })
+    for path in _get_peers():
+        try:
+            _socket.sendto(data, path)
+        except socket.error as err:
+            if err.errno in (errno.ECONNREFUSED, errno.ENOENT):
+                continue
+            logger.log_web_error("fanout message dropped :: {} :: {}".format(path, err))
+
+
+def close():
+    """Leaves the fanout channels.
+
+    """
+    global _socket, _path
+
+    if _socket is not None:
+        tornado.ioloop.IOLoop.current().remove_handler(_socket.fileno())
+        _socket.close()
+        if os.path.exists(_path):
+            os.remove(_path)
+        _socket = _path = None
@@ -11,7 +11,7 @@
 
 
 """
-import json
+import functools
 
 import tornado
 
@@ -19,6 +19,10 @@ from hermes.utils import convert
 from hermes.utils import data_convertor
 from hermes.utils import logger
 from hermes.utils import string_convertor
+from hermes.web.utils import executor
+from hermes.web.utils import http_timing
+from hermes.web.utils import http_validator
+from hermes.web.utils import profiler
 
 
 
@@ -49,14 +53,14 @@ class HermesHTTPRequestHandler(tornado.web.RequestHandler):
         :rtype: namedtuple | None
 
         """
-        if not self.request.body:
+        body = http_validator.decode_json_body(self)
+        if body is None:
             return None
 
-        body = json.loads(self.request.body)
-
         return convert.dict_to_namedtuple(body) if as_namedtuple else body
 
 
+    @tornado.gen.coroutine
     def invoke(
         self,
         validation_taskset,
@@ -66,6 +70,13 @@ class HermesHTTPRequestHandler(tornado.web.RequestHandler):
         ):
         """Invokes handler tasks.
 
+        Blocking validation & processing tasks (see executor.blocking) are
+        executed upon the executor thread pool, all other tasks (e.g. those
+        setting headers) & response writing are executed upon the IOLoop.
+
+        :returns: Future resolved when request processing completes.
+        :rtype: tornado.concurrent.Future
+
         """
         def _write(data):
             """Writes HTTP response data.
@@ -112,6 +123,7 @@ class HermesHTTPRequestHandler(tornado.web.RequestHandler):
             """Writes processing success to response stream.
 
             """
+            http_timing.set_header(self)
             try:
                 self.output
             except AttributeError:
@@ -185,38 +197,63 @@ class HermesHTTPRequestHandler(tornado.web.RequestHandler):
                     task()
 
 
-        def _invoke_taskset(taskset, error_taskset):
-            """Invokes a set of tasks.
+        def _invoke_taskset(taskset):
+            """Invokes a set of tasks, each of which is timed (see http_timing).
 
             """
             for task in taskset:
-                try:
+                with http_timing.timed(self, task):
                     _invoke(task)
-                except Exception as err:
-                    try:
-                        for error_task in error_taskset:
-                            _invoke(error_task, err)
-                    # ... suppress inner exceptions.
-                    except Exception:
-                        pass
-                    return err
+
+
+        @tornado.gen.coroutine
+        def _execute_taskset(taskset):
+            """Executes a set of tasks, chains of blocking tasks upon the executor thread pool.
+
+            """
+            for is_blocking, chain in executor.get_chains(taskset):
+                if is_blocking:
+                    yield executor.execute_request(self, functools.partial(_invoke_taskset, chain))
+                else:
+                    _invoke_taskset(chain)
+
+
+        def _invoke_error_taskset(error_taskset, err):
+            """Invokes a set of error tasks.
+
+            """
+            try:
+                for error_task in error_taskset:
+                    _invoke(error_task, err)
+            # ... suppress inner exceptions.
+            except Exception:
+                pass
 
 
         # Log start.
         _log_start()
 
-        # Validate request.
-        taskset = _get_taskset(validation_taskset)
-        error_taskset = [_log_error, _write_invalid_request]
-        error = _invoke_taskset(taskset, error_taskset)
-        if error:
-            return
-
-        # Process request.
-        taskset = _get_taskset(processing_taskset)
-        taskset.append(_log_success)
-        taskset.append(_write_success)
-        error_taskset = _get_taskset(processing_error_taskset)
-        error_taskset.append(_log_error)
-        error_taskset.append(_write_failure)
-        _invoke_taskset(taskset, error_taskset)
+        # Profile request (if sampled).
+        profiler.begin(self)
+        try:
+            # Validate request.
+            taskset = _get_taskset(validation_taskset)
+            try:
+                yield _execute_taskset(taskset)
+            except Exception as err:
+                _invoke_error_taskset([_log_error, _write_invalid_request], err)
+                return
+
+            # Process request.
+            taskset = _get_taskset(processing_taskset)
+            try:
+                yield _execute_taskset(taskset)
+            except Exception as err:
+                error_taskset = list(_get_taskset(processing_error_taskset))
+                error_taskset.append(_log_error)
+                error_taskset.append(_write_failure)
+                _invoke_error_taskset(error_taskset, err)
+            else:
+                _invoke_taskset([_log_success, _write_success])
+        finally:
+            profiler.end(self)
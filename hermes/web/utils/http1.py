@@ -9,14 +9,22 @@
 
 
 """
+import functools
 import json
 
+import tornado.gen
+
 from hermes.utils import logger
 from hermes.utils import convert
 from hermes.utils import string_convertor
 from hermes.utils import data_convertor
+from hermes.web.utils import executor
+from hermes.web.utils import http_encoder
 from hermes.web.utils import http_exceptions as exceptions
+from hermes.web.utils import http_stream
+from hermes.web.utils import http_timing
 from hermes.web.utils import http_validator as validator
+from hermes.web.utils import profiler
 
 
 
@@ -75,7 +83,7 @@ def _write_csv(handler, data):
 
 
 def _write_json(handler, data):
-    """Writes HTTP response JSON data.
+    """Writes HTTP response JSON data (encoded as per negotiated media type, see http_encoder).
 
     """
     try:
@@ -85,12 +93,21 @@ def _write_json(handler, data):
     else:
         write_raw_output = True
 
-    if write_raw_output:
-        handler.write(data)
+    mime = http_encoder.negotiate(handler.request.headers.get("Accept"))
+    if mime == http_encoder.MIME_JSON:
+        if write_raw_output:
+            handler.write(data)
+        else:
+            handler.write(data_convertor.convert(data, string_convertor.to_camel_case))
     else:
-        handler.write(data_convertor.convert(data, string_convertor.to_camel_case))
+        if write_raw_output:
+            data = json.loads(data)
+        else:
+            data = data_convertor.convert(data, string_convertor.to_camel_case)
+        handler.write(http_encoder.encode(data, mime))
 
-    handler.set_header("Content-Type", "application/json; charset=utf-8")
+    handler.set_header("Content-Type", http_encoder.CONTENT_TYPES[mime])
+    handler.set_header("Vary", "Accept")
 
 
 def _write_html(handler, data):
@@ -143,9 +160,13 @@ def _write(handler, data, encoding):
 
 
 def write_error(handler, error):
-    """Writes processing error to response stream.
+    """Writes processing error to response stream (streamed responses that are under way are aborted).
 
     """
+    if http_stream.abort(handler):
+        _log(handler, "streamed response aborted --> {}".format(handler), True)
+        return
+
     handler.clear()
     reason = unicode(error) if _can_return_debug_info(handler) else None
     if isinstance(error, exceptions.RequestValidationException):
@@ -170,6 +191,7 @@ def _write_success(handler):
         data = unicode()
         encoding = None
 
+    http_timing.set_header(handler)
     _write(handler, data, encoding)
 
     try:
@@ -181,6 +203,15 @@ def _write_success(handler):
         del handler.output
 
 
+def _write_not_modified(handler):
+    """Writes not modified response, i.e. client's copy is up to date.
+
+    """
+    _log(handler, "not modified --> {}".format(handler))
+    http_timing.set_header(handler)
+    handler.set_status(304)
+
+
 def _get_tasks(pre_tasks, tasks, post_tasks):
     """Returns formatted & extended taskset.
 
@@ -209,6 +240,16 @@ def _invoke(handler, task, err=None):
             task()
 
 
+def _invoke_chain(handler, chain):
+    """Invokes a chain of tasks, each of which is timed (see http_timing).
+
+    """
+    for task in chain:
+        with http_timing.timed(handler, task):
+            _invoke(handler, task)
+
+
+@tornado.gen.coroutine
 def process_request(
     handler,
     tasks,
@@ -216,10 +257,21 @@ def process_request(
     ):
     """Invokes a set of HTTP request processing tasks.
 
+    Blocking tasks (see executor.blocking) are executed upon the executor thread
+    pool, all other tasks are executed upon the IOLoop.  Handlers may limit
+    concurrent execution of their blocking tasks via an executor_concurrency attribute,
+    and bypass them by flagging a response served from cache via a response_cached attribute.
+    Processing stops with a 304 once a task flags a response_not_modified attribute
+    (see http_conditional).  Task timings are reported via a Server-Timing header
+    and a configurable fraction of requests are profiled (see profiler).
+
     :param HTTPRequestHandler handler: Request processing handler.
     :param list tasks: Collection of processing tasks.
     :param list error_tasks: Collection of error processing tasks.
 
+    :returns: Future resolved when request processing completes.
+    :rtype: tornado.concurrent.Future
+
     """
     # Log request.
     msg = "[{0}]: executing --> {1}"
@@ -239,19 +291,31 @@ def process_request(
         )
 
     # Invoke tasksets:
-    # ... normal processing;
-    for task in tasks:
-        try:
-            _invoke(handler, task)
-        except Exception as err:
-            # ... error processing;
+    profiler.begin(handler)
+    try:
+        # ... normal processing;
+        for is_blocking, chain in executor.get_chains(tasks):
+            if getattr(handler, 'response_not_modified', False):
+                _write_not_modified(handler)
+                break
+            if is_blocking and getattr(handler, 'response_cached', False):
+                continue
             try:
-                for task in error_tasks:
-                    _invoke(handler, task, err)
-            # ... error processing exceptions are suppressed
-            except:
-                pass
-            break
+                if is_blocking:
+                    yield executor.execute_request(handler, functools.partial(_invoke_chain, handler, chain))
+                else:
+                    _invoke_chain(handler, chain)
+            except Exception as err:
+                # ... error processing;
+                try:
+                    for task in error_tasks:
+                        _invoke(handler, task, err)
+                # ... error processing exceptions are suppressed
+                except:
+                    pass
+                break
+    finally:
+        profiler.end(handler)
 
 
 def decode_json_payload(handler, as_namedtuple=True):
@@ -264,9 +328,8 @@ def decode_json_payload(handler, as_namedtuple=True):
     :rtype: namedtuple | None
 
     """
-    if not handler.request.body:
+    body = validator.decode_json_body(handler)
+    if body is None:
         return None
 
-    body = json.loads(handler.request.body)
-
     return convert.dict_to_namedtuple(body) if as_namedtuple else body
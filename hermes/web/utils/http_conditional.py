@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: hermes.web.utils.http_conditional.py
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL/CeCIL
+   :platform: Unix, Windows
+   :synopsis: Conditional GET support (ETag / 304) for responses describing finished simulations.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import hashlib
+
+import hermes
+from hermes.utils import config
+from hermes.web.utils import http_encoder
+
+
+
+# Time (in seconds) for which clients may reuse responses describing obsolete (i.e. immutable) simulations.
+_IMMUTABLE_MAX_AGE = getattr(config.web, 'immutableMaxAgeInSeconds', 86400)
+
+
+def _get_etag(handler, marker):
+    """Returns strong entity tag of a response derived from a simulation's last update marker.
+
+    N.B. responses vary by negotiated encoding & service version.
+
+    """
+    return '"{}"'.format(hashlib.sha1(":".join([
+        hermes.__version__,
+        handler.request.path,
+        http_encoder.negotiate(handler.request.headers.get("Accept")),
+        str(marker['id']),
+        str(marker['change_seq']),
+        marker['row_update_date'].isoformat(),
+        str(marker.get('message_marker'))
+        ])).hexdigest())
+
+
+def set_validators(handler, marker):
+    """Sets response validators & flags whether the client's copy of a response is up to date.
+
+    Responses describing a finished (i.e. complete or obsolete) simulation are
+    tagged so that clients may revalidate them via If-None-Match.  Obsolete
+    simulations no longer change, hence their responses may also be reused
+    without revalidation.  Responses describing running simulations are untagged.
+
+    :param tornado.web.RequestHandler handler: A web request handler.
+    :param dict marker: Simulation last update marker (see dao_monitoring_fastpath.retrieve_simulation_marker).
+
+    """
+    if marker is None or not (marker['is_complete'] or marker['is_obsolete']):
+        return
+
+    handler.set_header("Etag", _get_etag(handler, marker))
+    handler.set_header("Vary", "Accept")
+    if marker['is_obsolete']:
+        handler.set_header("Cache-Control", "public, max-age={}, immutable".format(_IMMUTABLE_MAX_AGE))
+    else:
+        handler.set_header("Cache-Control", "no-cache")
+    handler.response_not_modified = handler.check_etag_header()
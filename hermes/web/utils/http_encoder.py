@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: hermes.web.utils.http_encoder.py
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL/CeCIL
+   :platform: Unix, Windows
+   :synopsis: Negotiated encodings of JSON response data: row, columnar & MessagePack.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import json
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+
+# Media type: row (i.e. default) json.
+MIME_JSON = "application/json"
+
+# Media type: columnar json.
+MIME_JSON_COLUMNAR = "application/vnd.hermes.columnar+json"
+
+# Media type: columnar MessagePack (supported if msgpack is installed).
+MIME_MSGPACK = "application/x-msgpack"
+
+# Map of media types to response content types.
+CONTENT_TYPES = {
+    MIME_JSON: "application/json; charset=utf-8",
+    MIME_JSON_COLUMNAR: "application/vnd.hermes.columnar+json; charset=utf-8",
+    MIME_MSGPACK: "application/x-msgpack"
+}
+
+# Columnar table keys.
+KEY_COLUMNS = "$columns"
+KEY_DICTIONARIES = "$dictionaries"
+KEY_FIELDS = "$fields"
+KEY_LENGTH = "$length"
+
+# Minimum number of rows for an array to be encoded as a columnar table.
+_MIN_ROWS = 2
+
+# Maximum ratio of distinct to total values for a string column to be dictionary encoded.
+_MAX_DICTIONARY_RATIO = 0.5
+
+
+def get_supported():
+    """Returns supported media types in order of preference.
+
+    :returns: Supported media types.
+    :rtype: list
+
+    """
+    supported = [MIME_JSON, MIME_JSON_COLUMNAR]
+    if msgpack is not None:
+        supported.append(MIME_MSGPACK)
+
+    return supported
+
+
+def _parse_accept(accept):
+    """Yields (media type, quality) pairs of an Accept header.
+
+    """
+    for item in accept.split(","):
+        parts = [i.strip() for i in item.split(";")]
+        quality = 1.0
+        for param in parts[1:]:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        yield parts[0].lower(), quality
+
+
+def negotiate(accept):
+    """Returns media type with which response data is to be encoded.
+
+    N.B. Row json is returned unless a supported alternative is explicitly preferred.
+
+    :param str accept: Request Accept header.
+
+    :returns: Negotiated media type.
+    :rtype: str
+
+    """
+    if not accept:
+        return MIME_JSON
+
+    supported = get_supported()
+    candidates = [(quality, -supported.index(mime), mime)
+                  for mime, quality in _parse_accept(accept) if mime in supported and quality > 0]
+
+    return max(candidates)[2] if candidates else MIME_JSON
+
+
+def _get_rows(data):
+    """Returns (fields, columns) of an array of uniform rows (objects or arrays) or None.
+
+    """
+    if len(data) < _MIN_ROWS:
+        return None
+
+    first = data[0]
+    if isinstance(first, dict):
+        fields = first.viewkeys()
+        if fields and all(isinstance(i, dict) and i.viewkeys() == fields for i in data):
+            fields = sorted(fields)
+            return fields, [[i[f] for i in data] for f in fields]
+
+    elif isinstance(first, (list, tuple)):
+        width = len(first)
+        if width and all(isinstance(i, (list, tuple)) and len(i) == width for i in data):
+            return None, [list(i) for i in zip(*data)]
+
+
+def _get_dictionary(column):
+    """Returns distinct values of a repetitive string column or None.
+
+    """
+    if not all(i is None or isinstance(i, basestring) for i in column):
+        return None
+
+    distinct = set(column)
+    distinct.discard(None)
+    if len(distinct) > len(column) * _MAX_DICTIONARY_RATIO:
+        return None
+
+    return sorted(distinct)
+
+
+def to_columnar(data):
+    """Returns data with arrays of uniform rows encoded as columnar tables.
+
+    A columnar table holds one array per field (object key or array position),
+    repetitive string columns being encoded as indexes into a dictionary of
+    distinct values.  N.B. table cells are not themselves encoded.
+
+    :param object data: JSON serializable data.
+
+    :returns: JSON serializable data.
+    :rtype: object
+
+    """
+    if isinstance(data, dict):
+        return {k: to_columnar(v) for k, v in data.iteritems()}
+
+    if isinstance(data, (list, tuple)):
+        rows = _get_rows(data)
+        if rows is None:
+            return [to_columnar(i) for i in data]
+
+        fields, columns = rows
+        table = {
+            KEY_COLUMNS: columns,
+            KEY_DICTIONARIES: {},
+            KEY_LENGTH: len(data)
+        }
+        if fields is not None:
+            table[KEY_FIELDS] = fields
+        for idx, column in enumerate(columns):
+            dictionary = _get_dictionary(column)
+            if dictionary is not None:
+                indexes = {v: i for i, v in enumerate(dictionary)}
+                columns[idx] = [None if i is None else indexes[i] for i in column]
+                table[KEY_DICTIONARIES][str(idx)] = dictionary
+
+        return table
+
+    return data
+
+
+def from_columnar(data):
+    """Returns data with columnar tables decoded into arrays of rows.
+
+    :param object data: Columnar encoded data.
+
+    :returns: Row encoded data.
+    :rtype: object
+
+    """
+    if isinstance(data, dict):
+        if KEY_COLUMNS not in data:
+            return {k: from_columnar(v) for k, v in data.iteritems()}
+
+        columns = list(data[KEY_COLUMNS])
+        for idx, dictionary in data[KEY_DICTIONARIES].iteritems():
+            idx = int(idx)
+            columns[idx] = [None if i is None else dictionary[i] for i in columns[idx]]
+        fields = data.get(KEY_FIELDS)
+        if fields is None:
+            return [list(i) for i in zip(*columns)]
+
+        return [dict(zip(fields, i)) for i in zip(*columns)]
+
+    if isinstance(data, list):
+        return [from_columnar(i) for i in data]
+
+    return data
+
+
+def encode(data, mime):
+    """Encodes response data.
+
+    :param object data: JSON serializable data.
+    :param str mime: Negotiated media type.
+
+    :returns: Encoded data.
+    :rtype: str
+
+    """
+    if mime == MIME_JSON:
+        return json.dumps(data)
+    elif mime == MIME_JSON_COLUMNAR:
+        return json.dumps(to_columnar(data))
+    elif mime == MIME_MSGPACK:
+        # N.B. python 2 str (e.g. object keys) must be packed as msgpack str, not bin, for non python clients.
+        return msgpack.packb(to_columnar(data), use_bin_type=False)
+
+    raise ValueError("Unsupported media type: {}".format(mime))
+
+
+def decode(data, mime):
+    """Decodes response data (i.e. client side counterpart of encode).
+
+    :param str data: Encoded data.
+    :param str mime: Media type.
+
+    :returns: Decoded data.
+    :rtype: object
+
+    """
+    if mime == MIME_JSON:
+        return json.loads(data)
+    elif mime == MIME_JSON_COLUMNAR:
+        return from_columnar(json.loads(data))
+    elif mime == MIME_MSGPACK:
+        return from_columnar(msgpack.unpackb(data, raw=False))
+
+    raise ValueError("Unsupported media type: {}".format(mime))
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: hermes.web.utils.http_stream.py
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL/CeCIL
+   :platform: Unix, Windows
+   :synopsis: Streams JSON responses to clients (chunked transfer encoding) with bounded memory.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import collections
+import json
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError
+
+import tornado.gen
+import tornado.ioloop
+
+from hermes.utils import config
+from hermes.utils import data_convertor
+from hermes.utils.string_convertor import to_camel_case
+from hermes.web.utils import http_encoder
+from hermes.web.utils import http_timing
+
+
+
+# Number of rows serialised per written chunk.
+_CHUNK_ROWS = getattr(config.web, 'streamChunkRows', 1000)
+
+# Minimum size (in bytes) of data flushed to client, i.e. small chunks are coalesced.
+_FLUSH_SIZE = 1 << 16
+
+# Time (in seconds) a client may take to accept a flushed chunk, i.e. stalled clients do not hold executor threads.
+_WRITE_TIMEOUT = getattr(config.web, 'streamWriteTimeoutInSeconds', 30)
+
+# Name of attribute holding IOLoop upon which a streamed response is written.
+_IO_LOOP_ATTR = '_hermes_stream_io_loop'
+
+# Name of attribute flagging that data has been written to client, i.e. headers have been sent.
+_STARTED_ATTR = '_hermes_stream_started'
+
+
+def is_streamable(handler):
+    """Returns flag indicating whether a response may be streamed, i.e. row json has been negotiated.
+
+    N.B. alternative encodings (see http_encoder) require the complete response.
+
+    :param tornado.web.RequestHandler handler: A web request handler.
+
+    """
+    return http_encoder.negotiate(handler.request.headers.get("Accept")) == http_encoder.MIME_JSON
+
+
+def begin(handler):
+    """Begins a streamed response (to be invoked upon the IOLoop).
+
+    N.B. Streamed responses are written by blocking tasks (see executor.blocking)
+    and hence do not set the handler's output attribute.  Server-Timing reports
+    tasks executed prior to streaming.
+
+    :param tornado.web.RequestHandler handler: A web request handler.
+
+    """
+    setattr(handler, _IO_LOOP_ATTR, tornado.ioloop.IOLoop.current())
+    handler.set_header("Content-Type", http_encoder.CONTENT_TYPES[http_encoder.MIME_JSON])
+    handler.set_header("Vary", "Accept")
+    http_timing.set_header(handler)
+
+
+@tornado.gen.coroutine
+def _flush(handler, chunk, flushed):
+    """Writes a chunk to the client & signals once flushed (executed upon the IOLoop).
+
+    """
+    try:
+        handler.write(chunk)
+        yield handler.flush()
+    except Exception as err:
+        flushed.set_exception(err)
+    else:
+        flushed.set_result(None)
+
+
+def _write(io_loop, handler, data):
+    """Writes data to the client & waits until flushed (the response is aborted if the client stalls).
+
+    """
+    flushed = Future()
+    io_loop.add_callback(_flush, handler, data, flushed)
+    try:
+        flushed.result(_WRITE_TIMEOUT)
+    except TimeoutError:
+        raise IOError("Streamed response write timed out after {}s".format(_WRITE_TIMEOUT))
+
+
+def write(handler, chunks):
+    """Writes chunks to the client (to be invoked from a blocking task).
+
+    Data is flushed before further chunks are pulled, i.e. memory usage is bounded
+    by chunk size & the pace of the response is set by the client.  As the
+    executor thread (& db connection) is held meanwhile, a client that does not
+    accept a chunk within a timeout has its response aborted.
+
+    :param tornado.web.RequestHandler handler: A web request handler.
+    :param iterable chunks: Response chunks.
+
+    """
+    io_loop = getattr(handler, _IO_LOOP_ATTR)
+    buffer, size = [], 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= _FLUSH_SIZE:
+            setattr(handler, _STARTED_ATTR, True)
+            _write(io_loop, handler, "".join(buffer))
+            buffer, size = [], 0
+    if buffer:
+        setattr(handler, _STARTED_ATTR, True)
+        _write(io_loop, handler, "".join(buffer))
+
+
+def abort(handler):
+    """Aborts a streamed response that failed after data was written (to be invoked upon the IOLoop).
+
+    Once headers are sent the response status can no longer be changed, hence the
+    connection is closed so that the client sees a failed transfer rather than a
+    truncated document with a success status.
+
+    :param tornado.web.RequestHandler handler: A web request handler.
+
+    :returns: Flag indicating whether the response was aborted.
+    :rtype: bool
+
+    """
+    if not getattr(handler, _STARTED_ATTR, False):
+        return False
+
+    handler.request.connection.close()
+    try:
+        handler.finish()
+    except Exception:
+        pass
+
+    return True
+
+
+def _iter_rows(rows):
+    """Yields json array chunks of a row iterable.
+
+    """
+    chunk = []
+    separator = "["
+    for row in rows:
+        chunk.append(json.dumps(data_convertor.convert(row, to_camel_case)))
+        if len(chunk) == _CHUNK_ROWS:
+            yield separator + ",".join(chunk)
+            chunk = []
+            separator = ","
+    if chunk:
+        yield separator + ",".join(chunk)
+        separator = ","
+
+    yield "]" if separator == "," else "[]"
+
+
+def iter_json(members):
+    """Yields json object chunks of a set of members.
+
+    Member values that are iterators (e.g. db cursors) are streamed as arrays of rows,
+    all other values are serialised as is.
+
+    :param list members: Sequence of (key, value) pairs.
+
+    :returns: Generator of json chunks.
+    :rtype: generator
+
+    """
+    separator = "{"
+    for key, value in members:
+        yield "{}{}:".format(separator, json.dumps(to_camel_case(key)))
+        separator = ","
+        if isinstance(value, collections.Iterator):
+            for chunk in _iter_rows(value):
+                yield chunk
+        else:
+            yield json.dumps(data_convertor.convert(value, to_camel_case))
+
+    yield "}" if separator == "," else "{}"
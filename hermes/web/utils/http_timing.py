@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: hermes.web.utils.http_timing.py
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL/CeCIL
+   :platform: Unix, Windows
+   :synopsis: Times request processing tasks & reports them to clients via a Server-Timing header.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import contextlib
+import time
+
+from hermes.utils import config
+from hermes.web.utils import profiler
+
+
+
+# Flag indicating whether task timings are reported to clients.
+_ENABLED = getattr(config.web, 'serverTimingEnabled', True)
+
+# Name of attribute holding task timings of a request.
+_TIMINGS_ATTR = '_hermes_server_timing'
+
+
+def _get_metric_name(task):
+    """Returns Server-Timing metric name of a task, e.g. _set_data --> set_data.
+
+    """
+    return getattr(task, '__name__', 'task').lstrip('_') or 'task'
+
+
+@contextlib.contextmanager
+def timed(handler, task):
+    """Times (& if the request is sampled, profiles) execution of a request processing task.
+
+    :param tornado.web.RequestHandler handler: A web request handler.
+    :param function task: A request processing task.
+
+    """
+    profile = profiler.enter(handler)
+    started = time.time()
+    try:
+        yield
+    finally:
+        elapsed = time.time() - started
+        profiler.leave(profile)
+        if _ENABLED:
+            try:
+                timings = getattr(handler, _TIMINGS_ATTR)
+            except AttributeError:
+                timings = []
+                setattr(handler, _TIMINGS_ATTR, timings)
+            timings.append((_get_metric_name(task), elapsed))
+
+
+def get_header(handler):
+    """Returns Server-Timing header value of tasks timed so far, e.g. "validate_request;dur=0.21, set_data;dur=4.87".
+
+    :param tornado.web.RequestHandler handler: A web request handler.
+
+    :returns: Header value (durations are in milliseconds).
+    :rtype: str | None
+
+    """
+    timings = getattr(handler, _TIMINGS_ATTR, None)
+    if not timings:
+        return None
+
+    metrics = ["{};dur={:.2f}".format(name, 1000 * elapsed) for name, elapsed in timings]
+    try:
+        metrics.append("total;dur={:.2f}".format(1000 * handler.request.request_time()))
+    except AttributeError:
+        pass
+
+    return ", ".join(metrics)
+
+
+def set_header(handler):
+    """Sets Server-Timing response header (to be invoked prior to writing a response).
+
+    N.B. tasks executing after headers are flushed, i.e. response writing, are not reported.
+
+    :param tornado.web.RequestHandler handler: A web request handler.
+
+    """
+    header = get_header(handler)
+    if header is not None:
+        handler.set_header("Server-Timing", header)
@@ -14,10 +14,32 @@ import json
 import jsonschema
 
 from hermes.web.utils import http_exceptions as exceptions
-from hermes.web.schemas import get_schema
+from hermes.web.schemas import get_validator
 
 
 
+# Name of attribute holding decoded request body.
+_JSON_BODY_ATTR = '_hermes_json_body'
+
+
+def decode_json_body(handler):
+    """Returns request body decoded from JSON, the body being decoded once per request.
+
+    :param tornado.web.RequestHandler handler: A web request handler.
+
+    :returns: Decoded request body.
+    :rtype: dict | list | None
+
+    """
+    try:
+        return getattr(handler, _JSON_BODY_ATTR)
+    except AttributeError:
+        body = json.loads(handler.request.body) if handler.request.body else None
+        setattr(handler, _JSON_BODY_ATTR, body)
+
+        return body
+
+
 def validate_request(handler):
     """Validates request against mapped JSON schemas.
 
@@ -32,11 +54,11 @@ def validate_request(handler):
 
 
 def _validate(handler, data, schema):
-    """Validates data against a JSON schema.
+    """Validates data against a JSON schema (compiled at startup, see schemas.cache).
 
     """
     try:
-        jsonschema.validate(data, schema)
+        schema.validate(data)
     except jsonschema.exceptions.ValidationError as json_errors:
         raise exceptions.InvalidJSONSchemaError(json_errors)
 
@@ -46,7 +68,7 @@ def _validate_request_headers(handler):
 
     """
     # Map request to schema.
-    schema = get_schema('headers', handler.request.path)
+    schema = get_validator('headers', handler.request.path)
 
     # Null case - escape.
     if schema is None:
@@ -61,7 +83,7 @@ def _validate_request_params(handler):
 
     """
     # Map request to schema.
-    schema = get_schema('params', handler.request.path)
+    schema = get_validator('params', handler.request.path)
 
     # Null case.
     if schema is None:
@@ -78,7 +100,7 @@ def _validate_request_body(handler):
 
     """
     # Map request to schema.
-    schema = get_schema('body', handler.request.path)
+    schema = get_validator('body', handler.request.path)
 
     # Null case.
     if schema is None:
@@ -91,7 +113,7 @@ def _validate_request_body(handler):
     # Validate request data.
     else:
         # ... decode request data.
-        data = json.loads(handler.request.body)
+        data = decode_json_body(handler)
 
         # ... validate request data against schema.
         _validate(handler, data, schema)
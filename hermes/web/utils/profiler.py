@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: hermes.web.utils.profiler.py
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL/CeCIL
+   :platform: Unix, Windows
+   :synopsis: Opt-in sampling profiler of a fraction of web requests, writes folded (i.e. flamegraph ready) stacks.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import collections
+import os
+import random
+import sys
+import tempfile
+import thread
+import threading
+import time
+
+from hermes.utils import config
+from hermes.utils import logger
+
+
+
+# Fraction of requests that are profiled (0 = profiling is disabled).
+_SAMPLE_RATE = float(getattr(config.web, 'profilerSampleRate', 0))
+
+# Interval (in seconds) between stack samples.
+_INTERVAL = getattr(config.web, 'profilerIntervalInMilliseconds', 5) / 1000.0
+
+# Directory to which profiles are written.
+_OUTPUT_DIRECTORY = getattr(config.web, 'profilerOutputDirectory',
+                            os.path.join(tempfile.gettempdir(), 'hermes-profiles'))
+
+# Name of attribute holding profile of a sampled request.
+_PROFILE_ATTR = '_hermes_profile'
+
+# Set of profiles whose tasks are currently executing.
+_active = set()
+
+# Lock guarding active profiles.
+_lock = threading.Lock()
+
+# Sampling thread, started upon first sampled request.
+_sampler = None
+
+
+class _Profile(object):
+    """Stack samples of a request.
+
+    """
+    def __init__(self, name):
+        """Instance constructor.
+
+        """
+        self.name = name
+        self.stacks = collections.Counter()
+        self.threads = set()
+
+
+    def enter(self):
+        """Signals that a task of the request is executing upon current thread.
+
+        """
+        with _lock:
+            self.threads.add(thread.get_ident())
+            _active.add(self)
+
+
+    def leave(self):
+        """Signals that a task of the request has executed upon current thread.
+
+        """
+        with _lock:
+            self.threads.discard(thread.get_ident())
+            if not self.threads:
+                _active.discard(self)
+
+
+def _fold(frame):
+    """Returns a stack in folded format, i.e. root first & semi-colon delimited.
+
+    """
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append("{} ({}:{})".format(code.co_name, code.co_filename, code.co_firstlineno))
+        frame = frame.f_back
+
+    return ";".join(reversed(stack))
+
+
+def _sample():
+    """Samples stacks of threads executing tasks of profiled requests (executed upon sampling thread).
+
+    """
+    while True:
+        time.sleep(_INTERVAL)
+        with _lock:
+            if not _active:
+                continue
+            frames = sys._current_frames()
+            for profile in _active:
+                for ident in profile.threads:
+                    if ident in frames:
+                        profile.stacks[_fold(frames[ident])] += 1
+            del frames
+
+
+def _start_sampler():
+    """Starts sampling thread.
+
+    """
+    global _sampler
+
+    with _lock:
+        if _sampler is None:
+            _sampler = threading.Thread(target=_sample, name="hermes-profiler")
+            _sampler.daemon = True
+            _sampler.start()
+
+
+def _write(profile):
+    """Writes folded stacks of a profile to file system.
+
+    """
+    if not os.path.isdir(_OUTPUT_DIRECTORY):
+        os.makedirs(_OUTPUT_DIRECTORY)
+    fpath = os.path.join(_OUTPUT_DIRECTORY, "{}-{}-{}.folded".format(
+        int(time.time() * 1000), os.getpid(), profile.name))
+    with open(fpath, 'w') as fstream:
+        for stack, count in sorted(profile.stacks.items()):
+            fstream.write("{} {}\n".format(stack, count))
+
+    logger.log_web("profile written to --> {}".format(fpath))
+
+
+def begin(handler):
+    """Begins profiling a request if it is sampled.
+
+    N.B. when profiling is disabled (the default) this is a single comparison.
+
+    :param tornado.web.RequestHandler handler: A web request handler.
+
+    """
+    if _SAMPLE_RATE <= 0 or random.random() >= _SAMPLE_RATE:
+        return
+
+    setattr(handler, _PROFILE_ATTR, _Profile(handler.__class__.__name__))
+    if _sampler is None:
+        _start_sampler()
+
+
+def enter(handler):
+    """Signals that a task of a request is about to execute upon current thread.
+
+    :param tornado.web.RequestHandler handler: A web request handler.
+
+    :returns: Profile of request if it is sampled.
+    :rtype: _Profile | None
+
+    """
+    profile = getattr(handler, _PROFILE_ATTR, None)
+    if profile is not None:
+        profile.enter()
+
+    return profile
+
+
+def leave(profile):
+    """Signals that a task of a request has executed upon current thread.
+
+    :param _Profile profile: Profile returned by enter.
+
+    """
+    if profile is not None:
+        profile.leave()
+
+
+def end(handler):
+    """Ends profiling a request, writing its stacks to file system.
+
+    :param tornado.web.RequestHandler handler: A web request handler.
+
+    """
+    profile = getattr(handler, _PROFILE_ATTR, None)
+    if profile is None:
+        return
+
+    delattr(handler, _PROFILE_ATTR)
+    with _lock:
+        _active.discard(profile)
+    if profile.stacks:
+        try:
+            _write(profile)
+        except (IOError, OSError) as err:
+            logger.log_web_error("profile write failed --> {}".format(err))
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: hermes.web.utils.response_cache.py
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL/CeCIL
+   :platform: Unix, Windows
+   :synopsis: In-process cache of monitoring responses invalidated by monitoring events.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import re
+
+from hermes.utils import config
+from hermes.utils.cache import TimedCache
+from hermes.web.utils import fanout
+
+
+
+# Time to live (in seconds) of cached responses, i.e. safety net should an event be missed.
+_TTL = getattr(config.web, 'responseCacheTTLInSeconds', 30)
+
+# Maximum number of cached responses.
+_MAX_SIZE = getattr(config.web, 'responseCacheMaxSize', 1000)
+
+# Channel upon which invalidations are fanned out to other web workers.
+_FANOUT_CHANNEL = 'response-cache'
+
+# Event types invalidating all cached responses (i.e. a new simulation enters listings).
+_INVALIDATE_ALL_EVENT_TYPES = {
+    'simulation_start'
+    }
+
+# Regular expression matching uids (hyphenated or not) within a response.
+_UID = re.compile(r'[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}')
+
+# Cache of responses keyed by normalised request.
+_cache = TimedCache(_TTL, _MAX_SIZE)
+
+# Invalidation counter, guards against caching responses pulled from db prior to an invalidation.
+_generation = 0
+
+
+def is_enabled():
+    """Returns flag indicating whether response caching is enabled.
+
+    """
+    return getattr(config.web, 'responseCacheEnabled', True)
+
+
+def _get_key(handler):
+    """Returns cache key of a request, i.e. path + sorted query parameters.
+
+    """
+    return (handler.request.path, ) + \
+           tuple(sorted((k, tuple(v)) for k, v in handler.request.query_arguments.iteritems()))
+
+
+def _format_uid(uid):
+    """Returns a uid formatted for comparison.
+
+    """
+    return unicode(uid).replace('-', '').lower()
+
+
+def _get_tags(response):
+    """Returns set of uids referenced by a response.
+
+    """
+    return frozenset(_format_uid(i) for i in _UID.findall(response.lower()))
+
+
+def get(handler):
+    """Returns a cached response.
+
+    :param tornado.web.RequestHandler handler: A web request handler.
+
+    :returns: Cached response or None.
+    :rtype: str | None
+
+    """
+    return get_marked(handler)[0]
+
+
+def get_marked(handler):
+    """Returns a cached response together with the marker from which it was built.
+
+    :param tornado.web.RequestHandler handler: A web request handler.
+
+    :returns: Cached response & marker (see dao_monitoring_fastpath.retrieve_simulation_marker) or (None, None).
+    :rtype: tuple
+
+    """
+    if not is_enabled():
+        return None, None
+
+    handler.response_cache_key = (_get_key(handler), _generation)
+    cached = _cache.get(handler.response_cache_key[0])
+
+    return (None, None) if cached is None else (cached[0], cached[2])
+
+
+def set(handler, response, marker=None):
+    """Caches a response.
+
+    N.B. Responses whose data was pulled prior to an invalidation are not cached.
+
+    :param tornado.web.RequestHandler handler: A web request handler.
+    :param str response: Response to be cached.
+    :param dict marker: Marker from which response was built, i.e. from which its validators are derived.
+
+    """
+    try:
+        key, generation = handler.response_cache_key
+    except AttributeError:
+        return
+
+    if generation == _generation and response is not None:
+        _cache.set(key, (response, _get_tags(response), marker))
+
+
+def _invalidate(event_type, simulation_uid):
+    """Removes cached responses affected by a monitoring event.
+
+    """
+    global _generation
+
+    _generation += 1
+    if event_type in _INVALIDATE_ALL_EVENT_TYPES:
+        _cache.clear()
+    else:
+        uid = _format_uid(simulation_uid)
+        _cache.invalidate_where(lambda _, cached: uid in cached[1])
+
+
+def invalidate(event_type, simulation_uid):
+    """Removes cached responses affected by a monitoring event (upon all web workers).
+
+    :param str event_type: Type of monitoring event.
+    :param str simulation_uid: Uid of simulation to which event relates.
+
+    """
+    _invalidate(event_type, simulation_uid)
+    fanout.publish(_FANOUT_CHANNEL, {
+        'event_type': event_type,
+        'simulation_uid': simulation_uid
+        })
+
+
+def on_fanout(message):
+    """Removes cached responses affected by a monitoring event received by another web worker.
+
+    :param dict message: Invalidation message.
+
+    """
+    _invalidate(message['event_type'], message['simulation_uid'])
+
+
+def get_stats():
+    """Returns cache usage statistics.
+
+    :returns: Cache usage statistics.
+    :rtype: dict
+
+    """
+    return _cache.get_stats()
+
+
+# Receive invalidations fanned out by other web workers.
+fanout.subscribe(_FANOUT_CHANNEL, on_fanout)
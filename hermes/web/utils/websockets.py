@@ -12,18 +12,23 @@
 
 """
 import collections
+import sys
 
 import tornado.websocket
 
 from hermes.utils import config
 from hermes.utils import logger
 from hermes.utils import data_convertor
+from hermes.web.utils import fanout
 
 
 
 # Cached web socket clients.
 _WS_CLIENTS = collections.defaultdict(list)
 
+# Channel upon which web socket messages are fanned out to other web workers.
+_FANOUT_CHANNEL = 'websockets'
+
 
 def get_client_count(key=None):
     """Returns count of connected clients.
@@ -40,33 +45,86 @@ def get_client_count(key=None):
         return reduce(lambda x, y: x + len(y), _WS_CLIENTS.values(), 0)
 
 
-def on_write(key, data, client_filter=None):
-    """Broadcasts web socket message to relevant clients.
+def _get_filter_data(data):
+    """Returns data passed to client filters, i.e. scalar data attributes (shareable across workers).
 
-    :param str key: Web socket client cache key.
-    :param dict data: Data dictionary to send to client.
-    :param function client_filter: Predicate to determines whether a client is to be written to.
+    """
+    return {k: v for k, v in data.items() if v is None or isinstance(v, (basestring, bool, int, long, float))}
+
+
+def _get_filter(name):
+    """Returns client filter from its qualified name.
+
+    """
+    if name is not None:
+        module, name = name.rsplit('.', 1)
+
+        return getattr(sys.modules[module], name)
+
+
+def _get_filter_name(client_filter):
+    """Returns qualified name of a client filter.
+
+    """
+    if client_filter is not None:
+        return "{}.{}".format(client_filter.__module__, client_filter.__name__)
+
+
+def _write(key, payload, filter_data, client_filter):
+    """Writes a web socket message to relevant clients of current worker.
 
     """
     # Get clients to be broadcast to.
     if client_filter is None:
-        clients = _WS_CLIENTS[key]
+        clients = list(_WS_CLIENTS[key])
     else:
-        clients = [c for c in _WS_CLIENTS[key] if client_filter(c, data) == True]
-
-    # Escape if there are no clients.
-    if not clients:
-        return
+        clients = [c for c in _WS_CLIENTS[key] if client_filter(c, filter_data) == True]
 
     # Write data to clients.
-    data = data_convertor.jsonify(data)
     for client in clients:
         try:
-            client.write_message(data)
+            client.write_message(payload)
         except tornado.websocket.WebSocketClosedError:
             _WS_CLIENTS[key].remove(client)
 
 
+def on_write(key, data, client_filter=None):
+    """Broadcasts web socket message to relevant clients (of all web worker processes).
+
+    :param str key: Web socket client cache key.
+    :param dict data: Data dictionary to send to client.
+    :param function client_filter: Predicate to determines whether a client is to be written to.
+
+    N.B. Client filters are module level functions & are passed scalar data attributes only.
+
+    """
+    # Escape if there are no clients.
+    if not _WS_CLIENTS[key] and not fanout.is_initialized():
+        return
+
+    message = {
+        'key': key,
+        'payload': data_convertor.jsonify(data),
+        'filter_data': _get_filter_data(data),
+        'client_filter': _get_filter_name(client_filter)
+    }
+    _write(key, message['payload'], message['filter_data'], client_filter)
+    fanout.publish(_FANOUT_CHANNEL, message)
+
+
+def on_fanout(message):
+    """Broadcasts web socket message published by another web worker process to relevant clients.
+
+    :param dict message: Fanned out message.
+
+    """
+    if _WS_CLIENTS[message['key']]:
+        _write(message['key'],
+               message['payload'],
+               message['filter_data'],
+               _get_filter(message['client_filter']))
+
+
 def on_connect(key, client):
     """Caches a client connection.
 
@@ -127,3 +185,7 @@ def keep_alive():
     delay = config.web.websocketKeepAliveDelayInSeconds
     if delay:
         tornado.ioloop.IOLoop.instance().call_later(delay, _do)
+
+
+# Receive web socket messages fanned out by other web workers.
+fanout.subscribe(_FANOUT_CHANNEL, on_fanout)
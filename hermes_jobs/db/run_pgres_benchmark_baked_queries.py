@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: run_pgres_benchmark_baked_queries.py
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL/CeCIL
+   :platform: Unix
+   :synopsis: Benchmarks query construction & compilation savings of baked queries per message type.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import timeit
+
+from hermes.db import pgres as db
+from hermes.db.pgres import dao_monitoring as dao
+from hermes.utils import logger
+
+
+
+# Number of times each message type's queries are executed per measurement.
+_ITERATIONS = 500
+
+# Map of message types to queries executed whilst processing them (either by agents or by web event handler).
+_MESSAGE_QUERIES = (
+    ('0000', lambda job, sim: [
+        dao.retrieve_simulation(sim.uid),
+        dao.retrieve_simulation_configuration(sim.uid),
+        dao.retrieve_simulations_by_hashid(sim.hashid),
+        dao.retrieve_simulation_latest_job(sim.uid),
+        dao.retrieve_simulation_job_counts(sim.uid)
+        ]),
+    ('0100', lambda job, sim: [
+        dao.retrieve_active_simulation(sim.hashid),
+        dao.retrieve_job_info(job.job_uid),
+        dao.retrieve_simulation_job_counts(sim.uid)
+        ]),
+    ('1001', lambda job, sim: [
+        dao.retrieve_latest_job_period(sim.uid)
+        ]),
+    ('8000', lambda job, sim: [
+        dao.retrieve_job(job.job_uid)
+        ]),
+    ('8100', lambda job, sim: [
+        dao.retrieve_latest_job_period(sim.uid),
+        dao.retrieve_latest_job_period_counter(sim.uid)
+        ]),
+    ('fe', lambda job, sim: [
+        dao.retrieve_simulation_jobs(sim.uid),
+        dao.retrieve_latest_active_jobs(simulation_uid=sim.uid)
+        ])
+    )
+
+
+def _get_timing(func, job, sim, baking_enabled):
+    """Returns mean time (in micro-seconds) of executing a message type's queries.
+
+    """
+    db.session.set_baking(baking_enabled)
+    db.cache.clear()
+    try:
+        elapsed = min(timeit.repeat(lambda: func(job, sim), number=_ITERATIONS, repeat=3))
+    finally:
+        db.session.set_baking(True)
+
+    return elapsed * 1e6 / _ITERATIONS
+
+
+def _main():
+    """Main entry point.
+
+    """
+    with db.session.create():
+        job = db.dao.get_random(db.types.Job)
+        sim = dao.retrieve_simulation(job.simulation_uid)
+        for message_type, func in _MESSAGE_QUERIES:
+            unbaked = _get_timing(func, job, sim, False)
+            baked = _get_timing(func, job, sim, True)
+            logger.log_db("{} :: unbaked = {:.0f}us :: baked = {:.0f}us :: saving = {:.0f}us ({:.0%})".format(
+                message_type, unbaked, baked, unbaked - baked, (unbaked - baked) / unbaked))
+
+
+if __name__ == '__main__':
+    _main()
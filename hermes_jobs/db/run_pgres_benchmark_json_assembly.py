@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: run_pgres_benchmark_json_assembly.py
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL/CeCIL
+   :platform: Unix
+   :synopsis: Benchmarks db side json assembly of monitoring payloads and writes results to file system.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import csv
+import json
+import os
+import timeit
+
+import arrow
+from sqlalchemy import func
+
+from hermes.db import pgres as db
+from hermes.db.pgres import dao_monitoring_fastpath as dao
+from hermes.utils import data_convertor
+from hermes.utils import logger
+
+
+
+# Global now.
+_NOW = arrow.utcnow()
+
+# Number of active jobs the benchmark is calibrated against.
+_TARGET_ACTIVE_JOBS = 10000
+
+# Number of times each payload is assembled.
+_ITERATIONS = 20
+
+# Map of timeslice tokens to start dates.
+_TIMESLICES = {
+    '1M': _NOW.replace(days=-31).datetime,
+    'ALL': None
+}
+
+# Set of CSV file headers.
+_CSV_HEADERS = ("PAYLOAD", "TIMESLICE", "ASSEMBLY", "PAYLOAD SIZE", "MEAN TIME (MS)", "MIN TIME (MS)")
+
+
+def _get_timeslice_python(start_date):
+    """Returns timeslice payload assembled in process.
+
+    """
+    return json.dumps({
+        'jobCounts': dao.retrieve_active_job_counts(start_date),
+        'jobPeriodList': dao.retrieve_latest_active_job_periods(start_date),
+        'simulationList': dao.retrieve_active_simulations(start_date),
+        'latestComputeJobs': dao.retrieve_latest_active_jobs(start_date)
+        })
+
+
+def _get_detail_python(uid):
+    """Returns simulation detail payload assembled in process.
+
+    """
+    simulation = dao.retrieve_simulation(uid)
+
+    return data_convertor.jsonify({
+        'config_card': dao.retrieve_simulation_configuration_card(uid),
+        'has_messages': dao.has_messages(uid),
+        'job_list': dao.retrieve_simulation_jobs(uid),
+        'latest_job_period': dao.retrieve_latest_job_period(uid),
+        'previous_tries': dao.retrieve_simulation_previous_tries(simulation['hashid'], simulation['try_id']),
+        'simulation': simulation
+        })
+
+
+# Map of payload assembly modes to factories.
+_FACTORIES = {
+    'timeslice': {
+        'python': _get_timeslice_python,
+        'db': dao.retrieve_timeslice_json
+    },
+    'detail': {
+        'python': _get_detail_python,
+        'db': dao.retrieve_simulation_detail_json
+    }
+}
+
+
+def _get_metric(payload, timeslice, assembly, arg):
+    """Returns a json assembly performance metric.
+
+    """
+    factory = _FACTORIES[payload][assembly]
+    timings = timeit.repeat(lambda: factory(arg), number=1, repeat=_ITERATIONS)
+
+    return payload, timeslice, assembly, len(factory(arg)), \
+           1000 * sum(timings) / len(timings), 1000 * min(timings)
+
+
+def _get_busiest_simulation():
+    """Returns uid of simulation with the most jobs.
+
+    """
+    j = db.types.Job
+    qry = db.session.raw_query(j.simulation_uid)
+    qry = qry.group_by(j.simulation_uid)
+    qry = qry.order_by(func.count(j.id).desc())
+
+    return qry.first()[0]
+
+
+def _get_metrics():
+    """Returns a collection of json assembly performance metrics.
+
+    """
+    active_jobs = sum(i[3] for i in dao.retrieve_active_job_counts())
+    if active_jobs < _TARGET_ACTIVE_JOBS:
+        logger.log_db_warning("benchmark db contains {} active jobs, target is {}: seed via run_pgres_generate_dataset".format(
+            active_jobs, _TARGET_ACTIVE_JOBS))
+
+    metrics = []
+    for timeslice, start_date in sorted(_TIMESLICES.items()):
+        for assembly in ('python', 'db'):
+            metrics.append(_get_metric('timeslice', timeslice, assembly, start_date))
+
+    uid = _get_busiest_simulation()
+    for assembly in ('python', 'db'):
+        metrics.append(_get_metric('detail', None, assembly, uid))
+
+    return metrics
+
+
+def _main():
+    """Main entry point.
+
+    """
+    with db.session.create():
+        metrics = _get_metrics()
+
+    fname = "{}_server_pgres_json_assembly_metrics_{}.csv".format(
+        os.getenv("HERMES_MACHINE_TYPE"), _NOW.format('YYYY-MM-DD'))
+    fpath = os.path.join(os.getenv("HERMES_HOME"), "tmp")
+    fpath = os.path.join(fpath, fname)
+    with open(fpath, 'wb') as output_file:
+        writer = csv.writer(output_file)
+        writer.writerow(_CSV_HEADERS)
+        writer.writerows(metrics)
+    logger.log_db("metrics written to --> {}".format(fpath))
+
+
+if __name__ == '__main__':
+    _main()
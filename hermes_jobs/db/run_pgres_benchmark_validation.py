@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: run_pgres_benchmark_validation.py
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL/CeCIL
+   :platform: Unix
+   :synopsis: Micro-benchmarks per call overhead of dao input validation, of single & nested dao calls.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import timeit
+
+from hermes.db import pgres as db
+from hermes.db.pgres import validator_dao
+from hermes.db.pgres import validator_dao_mq
+from hermes.utils import decorators
+from hermes.utils import logger
+
+
+
+# Number of calls per measurement.
+_CALLS = 100000
+
+# Number of nested calls made per call of a benchmarked call chain.
+_NESTED_CALLS = 10
+
+# Map of benchmarked validators to call arguments.
+_VALIDATORS = (
+    ('get_by_facet', validator_dao.validate_get_by_facet, (db.types.Job, ), {'get_iterable': True}),
+    ('get_by_name', validator_dao.validate_get_by_name, (db.types.Job, u"a-job"), {}),
+    ('retrieve_message_emails', validator_dao_mq.validate_retrieve_message_emails, (None, ), {})
+    )
+
+
+def _target(*args, **kwargs):
+    """Benchmarked function, i.e. a dao function that does nothing.
+
+    """
+    pass
+
+
+def _get_chain(decorate):
+    """Returns a call chain, i.e. a dao function making nested dao calls, decorated by a validation decorator.
+
+    """
+    inner = decorate(_target)
+
+    def outer(*args, **kwargs):
+        for _ in xrange(_NESTED_CALLS):
+            inner(*args, **kwargs)
+
+    return decorate(outer)
+
+
+def _validate_legacy(validator):
+    """Validation function decorator prior to compilation of validators.
+
+    """
+    def decorate(func):
+        def wrapper(*args, **kwargs):
+            validator(*args, **kwargs)
+            return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def _get_overhead(func, args, kwargs, baseline=0):
+    """Returns per call overhead (in nano-seconds) of invoking a function.
+
+    """
+    elapsed = min(timeit.repeat(lambda: func(*args, **kwargs), number=_CALLS, repeat=3))
+
+    return (elapsed * 1e9 / _CALLS) - baseline
+
+
+def _main():
+    """Main entry point.
+
+    """
+    initial_mode = decorators.get_validation_mode()
+    try:
+        for name, validator, args, kwargs in _VALIDATORS:
+            baseline = _get_overhead(_target, args, kwargs)
+            logger.log_db("{} :: legacy :: {:.0f}ns".format(
+                name, _get_overhead(_validate_legacy(validator)(_target), args, kwargs, baseline)))
+            for mode in decorators.VALIDATION_MODES:
+                decorators.set_validation_mode(mode)
+                logger.log_db("{} :: {} :: {:.0f}ns".format(
+                    name, mode, _get_overhead(decorators.validate(validator)(_target), args, kwargs, baseline)))
+        for name, validator, args, kwargs in _VALIDATORS:
+            baseline = _get_overhead(_get_chain(lambda func: func), args, kwargs)
+            logger.log_db("{} :: chain :: legacy :: {:.0f}ns".format(
+                name, _get_overhead(_get_chain(_validate_legacy(validator)), args, kwargs, baseline)))
+            for mode in decorators.VALIDATION_MODES:
+                decorators.set_validation_mode(mode)
+                logger.log_db("{} :: chain :: {} :: {:.0f}ns".format(
+                    name, mode, _get_overhead(_get_chain(decorators.validate(validator)), args, kwargs, baseline)))
+    finally:
+        decorators.set_validation_mode(initial_mode)
+
+
+if __name__ == '__main__':
+    _main()
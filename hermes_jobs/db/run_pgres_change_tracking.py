@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: run_pgres_change_tracking.py
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL/CeCIL
+   :platform: Unix
+   :synopsis: Installs simulation change tracking (timeslice deltas) upon an existing database.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+from hermes.db import pgres as db
+from hermes.db.pgres import change_tracking
+from hermes.utils import config
+from hermes.utils import logger
+
+
+
+def _get_admin_connection():
+    """Returns admin db connection (ddl statements require table ownership).
+
+    """
+    return config.db.pgres.main.replace(db.constants.HERMES_DB_USER, db.constants.HERMES_DB_ADMIN_USER)
+
+
+def _main():
+    """Main entry point.
+
+    """
+    with db.session.create(_get_admin_connection(), commitable=True):
+        change_tracking.init()
+        db.session.commit()
+        logger.log_db("Change tracking installed :: cursor = {}".format(change_tracking.get_cursor()))
+
+
+# Main entry point.
+if __name__ == '__main__':
+    _main()
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: run_pgres_compact_job_periods.py
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL/CeCIL
+   :platform: Unix
+   :synopsis: Compacts historical job period rows into job period ranges.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import argparse
+
+from hermes.db import pgres as db
+from hermes.db.pgres import compaction
+from hermes.utils import logger
+
+
+
+# Define command line arguments.
+_parser = argparse.ArgumentParser("Compacts historical job period rows into job period ranges.")
+_parser.add_argument(
+    "-batch-size", "--batch-size",
+    help="Number of simulations compacted per transaction",
+    dest="batch_size",
+    type=int,
+    default=compaction.DEFAULT_BATCH_SIZE
+    )
+_parser.add_argument(
+    "-after-id", "--after-id",
+    help="Id of simulation after which compaction resumes",
+    dest="after_id",
+    type=int,
+    default=0
+    )
+_parser.add_argument(
+    "-rebuild", "--rebuild",
+    help="Rebuild ranges of simulations whose ranges already account for all of their job periods",
+    dest="rebuild",
+    action="store_true"
+    )
+
+
+def _main(args):
+    """Main entry point.
+
+    """
+    after_id = args.after_id
+    simulations = ranges = 0
+    while True:
+        with db.session.create(commitable=True):
+            batch = compaction.get_simulations(after_id, args.batch_size, not args.rebuild)
+            if not batch:
+                break
+            ranges += compaction.compact([i[1] for i in batch])
+        simulations += len(batch)
+        after_id = batch[-1][0]
+        logger.log_db("Job periods compacted :: simulations={} :: ranges={} :: last simulation id={}".format(
+            simulations, ranges, after_id
+            ))
+
+
+# Main entry point.
+if __name__ == '__main__':
+    _main(_parser.parse_args())
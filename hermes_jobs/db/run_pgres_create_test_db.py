@@ -147,11 +147,7 @@ def _create_simulation_configuration(simulation):
             _CONFIG_CARD = f.read()
             _CONFIG_CARD = base64.encodestring(_CONFIG_CARD)
 
-    instance = db.types.SimulationConfiguration()
-    instance.simulation_uid = simulation.uid
-    instance.card = _CONFIG_CARD
-
-    return db.session.insert(instance)
+    return db.dao_monitoring.persist_simulation_configuration(simulation.uid, _CONFIG_CARD)
 
 
 def _create_simulation(start_date, end_date):
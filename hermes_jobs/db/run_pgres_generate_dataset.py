@@ -0,0 +1,604 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: run_pgres_generate_dataset.py
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL/CeCIL
+   :platform: Unix
+   :synopsis: Bulk loads a synthetic (seeded, hence reproducible) monitoring dataset for load & plan testing.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import argparse
+import cStringIO
+import datetime
+import json
+import random
+import uuid
+
+import arrow
+
+from hermes import cv
+from hermes import mq
+from hermes.cv.constants import EXECUTION_STATE_COMPLETE
+from hermes.cv.constants import EXECUTION_STATE_ERROR
+from hermes.cv.constants import EXECUTION_STATE_LATE
+from hermes.cv.constants import EXECUTION_STATE_RUNNING
+from hermes.db import pgres as db
+from hermes.db.pgres import compaction
+from hermes.db.pgres import fastpath
+from hermes.db.pgres import partitioning
+from hermes.utils import config
+from hermes.utils import logger
+
+
+
+# Define command line arguments.
+_parser = argparse.ArgumentParser("Bulk loads a synthetic monitoring dataset.")
+_parser.add_argument(
+    "-seed", "--seed",
+    help="Random seed (same seed & end date --> same dataset)",
+    dest="seed",
+    type=int,
+    default=0
+    )
+_parser.add_argument(
+    "-simulations", "--simulations",
+    help="Number of simulations (including restarts)",
+    dest="simulations",
+    type=int,
+    default=1000
+    )
+_parser.add_argument(
+    "-days", "--days",
+    help="Number of days over which simulations start",
+    dest="days",
+    type=int,
+    default=365
+    )
+_parser.add_argument(
+    "-end-date", "--end-date",
+    help="Dataset end date (YYYY-MM-DD), simulations still running at this date are left running",
+    dest="end_date",
+    type=str,
+    default=arrow.utcnow().format("YYYY-MM-DD")
+    )
+_parser.add_argument(
+    "-jobs-per-simulation", "--jobs-per-simulation",
+    help="Mean number of computing jobs per simulation",
+    dest="jobs_per_simulation",
+    type=int,
+    default=30
+    )
+_parser.add_argument(
+    "-periods-per-job", "--periods-per-job",
+    help="Mean number of periods reported per computing job",
+    dest="periods_per_job",
+    type=int,
+    default=3
+    )
+_parser.add_argument(
+    "-post-processing-rate", "--post-processing-rate",
+    help="Probability that a computing job is followed by a post-processing job",
+    dest="post_processing_rate",
+    type=float,
+    default=0.5
+    )
+_parser.add_argument(
+    "-restart-rate", "--restart-rate",
+    help="Probability that a simulation is restarted",
+    dest="restart_rate",
+    type=float,
+    default=0.2
+    )
+_parser.add_argument(
+    "-failure-rate", "--failure-rate",
+    help="Probability that a simulation fails",
+    dest="failure_rate",
+    type=float,
+    default=0.05
+    )
+_parser.add_argument(
+    "-late-rate", "--late-rate",
+    help="Probability that a running job is late",
+    dest="late_rate",
+    type=float,
+    default=0.1
+    )
+_parser.add_argument(
+    "-messages-per-email", "--messages-per-email",
+    help="Number of messages dispatched per email",
+    dest="messages_per_email",
+    type=int,
+    default=10
+    )
+_parser.add_argument(
+    "-batch-size", "--batch-size",
+    help="Number of simulations loaded per transaction",
+    dest="batch_size",
+    type=int,
+    default=100
+    )
+
+# Maximum number of tries of a simulation.
+_MAX_TRIES = 5
+
+# Set of accounting projects to be used.
+_ACCOUNTING_PROJECTS = [
+    u"gen0826",
+    u"gen2201",
+    u"gen2212",
+    u"gencmip6",
+    u"ipsl",
+    u"lmd"
+]
+
+# Set of post-processing job names to be used.
+_POST_PROCESSING_NAMES = [
+    u"atlas",
+    u"create_ts",
+    u"create_se",
+    u"monitoring",
+    u"pack_output",
+    u"rebuild"
+]
+
+# Loaded tables & columns (in load order).
+_TABLES = (
+    (db.types.Simulation, (
+        'id', 'row_create_date', 'accounting_project',
+        'compute_node', 'compute_node_raw',
+        'compute_node_login', 'compute_node_login_raw',
+        'compute_node_machine', 'compute_node_machine_raw',
+        'experiment', 'experiment_raw', 'hashid', 'model', 'model_raw', 'name',
+        'output_start_date', 'output_end_date', 'space', 'space_raw', 'try_id', 'uid',
+        'execution_start_date', 'execution_end_date', 'is_error', 'is_obsolete', 'is_im'
+        )),
+    (db.types.Job, (
+        'row_create_date', 'accounting_project', 'execution_state',
+        'execution_start_date', 'execution_end_date', 'is_compute_end', 'is_error', 'is_im',
+        'job_uid', 'post_processing_name', 'post_processing_date', 'scheduler_id',
+        'simulation_id', 'simulation_uid', 'typeof', 'warning_delay', 'warning_limit',
+        'warning_state', 'submission_path'
+        )),
+    (db.types.JobPeriod, (
+        'row_create_date', 'simulation_id', 'simulation_uid', 'job_uid',
+        'period_id', 'period_date_begin', 'period_date_end'
+        )),
+    (db.types.Message, (
+        'row_create_date', 'app_id', 'producer_id', 'producer_version', 'type_id', 'user_id',
+        'email_id', 'uid', 'correlation_id_1', 'correlation_id_2',
+        'timestamp', 'timestamp_raw', 'content', 'processing_tries', 'is_queued_for_reprocessing'
+        )),
+    (db.types.MessageEmail, (
+        'row_create_date', 'email_id', 'arrival_date', 'arrival_latency', 'dispatch_date'
+        ))
+    )
+
+# Sql: next free key values.
+_SQL_NEXT_IDS = """
+SELECT
+    (SELECT coalesce(max(id), 0) + 1 FROM monitoring.tbl_simulation),
+    (SELECT coalesce(max(email_id), 0) + 1 FROM mq.tbl_message_email)
+"""
+
+# Sql: resets simulation key sequence after explicit keys have been loaded.
+_SQL_RESET_SIMULATION_SEQUENCE = """
+SELECT setval(pg_get_serial_sequence('monitoring.tbl_simulation', 'id'), max(id)) FROM monitoring.tbl_simulation
+"""
+
+
+class _Context(object):
+    """Generation state.
+
+    """
+    def __init__(self, args, simulation_id, email_id):
+        """Instance constructor.
+
+        """
+        self.args = args
+        self.email_id = email_id
+        self.end_date = arrow.get(args.end_date, "YYYY-MM-DD").naive
+        self.rng = random.Random(args.seed)
+        self.simulation_id = simulation_id
+        self.terms = _get_terms()
+        self.buffers = None
+        self.reset()
+
+
+    def reset(self):
+        """Resets copy buffers.
+
+        """
+        self.buffers = {etype: cStringIO.StringIO() for etype, _ in _TABLES}
+
+
+    def get_uid(self):
+        """Returns a seeded uid.
+
+        """
+        return unicode(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+
+    def write(self, etype, *values):
+        """Writes a row to a copy buffer.
+
+        """
+        self.buffers[etype].write("\t".join(_format(i) for i in values))
+        self.buffers[etype].write("\n")
+
+
+def _format(value):
+    """Formats a value as per copy text format.
+
+    """
+    if value is None:
+        return "\\N"
+    elif isinstance(value, bool):
+        return "t" if value else "f"
+    elif isinstance(value, datetime.datetime):
+        return value.isoformat(' ')
+    elif isinstance(value, unicode):
+        value = value.encode('utf-8')
+    elif not isinstance(value, str):
+        return str(value)
+
+    return value.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def _get_terms():
+    """Returns sorted (hence reproducible) cv term names by term type.
+
+    """
+    cv.cache.load()
+
+    return {
+        term_type: sorted(i for i in (cv.get_name(t) for t in cv.cache.get_termset(term_type)) if i)
+        for term_type in (
+            cv.constants.TERM_TYPE_COMPUTE_NODE_LOGIN,
+            cv.constants.TERM_TYPE_COMPUTE_NODE_MACHINE,
+            cv.constants.TERM_TYPE_EXPERIMENT,
+            cv.constants.TERM_TYPE_MODEL,
+            cv.constants.TERM_TYPE_SIMULATION_SPACE
+            )
+        }
+
+
+def _get_period_date(year, month_day):
+    """Returns a period date as reported by libIGCM, e.g. 18500101.
+
+    """
+    return year * 10000 + month_day
+
+
+def _write_message(ctx, simulation, type_id, timestamp, job=None, messages=None):
+    """Writes a message row.
+
+    """
+    content = {
+        "simuid": simulation['uid']
+    }
+    if job:
+        content.update({
+            "accountingProject": job['accounting_project'],
+            "jobuid": job['job_uid'],
+            "jobSchedulerID": job['scheduler_id'],
+            "jobWarningDelay": job['warning_delay']
+        })
+    messages.append((timestamp, (
+        timestamp,
+        mq.constants.APP_MONITORING,
+        mq.constants.PRODUCER_IGCM,
+        u"x.x.x",
+        type_id,
+        mq.constants.USER_HERMES,
+        None,
+        ctx.get_uid(),
+        simulation['uid'],
+        job['job_uid'] if job else None,
+        timestamp,
+        unicode(timestamp),
+        json.dumps(content),
+        1,
+        False
+        )))
+
+
+def _write_messages(ctx, messages):
+    """Writes message rows batched into emails.
+
+    """
+    messages.sort(key=lambda i: i[0])
+    for index in range(0, len(messages), ctx.args.messages_per_email):
+        batch = messages[index: index + ctx.args.messages_per_email]
+        dispatch_date = batch[-1][0]
+        latency = ctx.rng.randint(1, 120)
+        arrival_date = dispatch_date + datetime.timedelta(seconds=latency)
+        ctx.write(db.types.MessageEmail, arrival_date, ctx.email_id, arrival_date, latency, dispatch_date)
+        for _, row in batch:
+            ctx.write(db.types.Message, *(row[0:6] + (ctx.email_id, ) + row[7:]))
+        ctx.email_id += 1
+
+
+def _write_job(ctx, simulation, typeof, start_date, end_date, is_error, messages):
+    """Writes a job row (plus its messages) & returns it.
+
+    """
+    job = {
+        'accounting_project': simulation['accounting_project'],
+        'job_uid': ctx.get_uid(),
+        'scheduler_id': unicode(ctx.rng.randint(2000000, 9000000)),
+        'warning_delay': config.apps.monitoring.defaultJobWarningDelayInSeconds
+    }
+    warning_limit = start_date + datetime.timedelta(seconds=job['warning_delay'])
+    warning_state = 0
+    if is_error:
+        state = EXECUTION_STATE_ERROR
+    elif end_date is not None:
+        state = EXECUTION_STATE_COMPLETE
+    elif ctx.rng.random() < ctx.args.late_rate:
+        state = EXECUTION_STATE_LATE
+        warning_state = 1
+        warning_limit = min(warning_limit, ctx.end_date - datetime.timedelta(minutes=1))
+    else:
+        state = EXECUTION_STATE_RUNNING
+    pp_name = ctx.rng.choice(_POST_PROCESSING_NAMES) if typeof == u"p" else None
+
+    ctx.write(db.types.Job,
+        start_date,
+        job['accounting_project'],
+        state,
+        start_date,
+        end_date,
+        typeof == u"c" and end_date is not None,
+        is_error,
+        pp_name == u"monitoring",
+        job['job_uid'],
+        pp_name,
+        start_date if pp_name else None,
+        job['scheduler_id'],
+        simulation['id'],
+        simulation['uid'],
+        typeof,
+        job['warning_delay'],
+        warning_limit,
+        warning_state,
+        u"/ccc/work/cont003/{}/{}/Job_{}".format(simulation['accounting_project'], simulation['name'], typeof)
+        )
+
+    computing = typeof == u"c"
+    _write_message(ctx, simulation, mq.constants.MESSAGE_TYPE_1000 if computing else mq.constants.MESSAGE_TYPE_2000,
+                   start_date, job, messages)
+    if is_error:
+        _write_message(ctx, simulation, mq.constants.MESSAGE_TYPE_1999 if computing else mq.constants.MESSAGE_TYPE_2999,
+                       end_date, job, messages)
+    elif end_date is not None:
+        _write_message(ctx, simulation, mq.constants.MESSAGE_TYPE_1100 if computing else mq.constants.MESSAGE_TYPE_2100,
+                       end_date, job, messages)
+
+    return job
+
+
+def _write_job_periods(ctx, simulation, job, start_date, end_date, period_id, messages):
+    """Writes rows of periods reported by a computing job & returns next period id.
+
+    """
+    count = ctx.rng.randint(1, 2 * ctx.args.periods_per_job - 1)
+    duration = ((end_date or ctx.end_date) - start_date) / (count + 1)
+    for index in range(1, count + 1):
+        reported = start_date + duration * index
+        if reported >= ctx.end_date:
+            break
+        year = simulation['output_start_date'].year + period_id - 1
+        ctx.write(db.types.JobPeriod,
+            reported,
+            simulation['id'],
+            simulation['uid'],
+            job['job_uid'],
+            period_id,
+            _get_period_date(year, 101),
+            _get_period_date(year, 1231)
+            )
+        _write_message(ctx, simulation, mq.constants.MESSAGE_TYPE_1001, reported, job, messages)
+        period_id += 1
+
+    return period_id
+
+
+def _write_simulation(ctx, group, try_id, is_obsolete, start_date):
+    """Writes a simulation try (plus its jobs, job periods & messages) & returns start date of next try.
+
+    """
+    simulation = dict(group)
+    simulation['id'] = ctx.simulation_id
+    simulation['uid'] = ctx.get_uid()
+    ctx.simulation_id += 1
+
+    # Earlier tries are restarted, typically following an error.
+    is_error = ctx.rng.random() < (0.5 if is_obsolete else ctx.args.failure_rate)
+    job_count = ctx.rng.randint(1, 2 * ctx.args.jobs_per_simulation - 1)
+    if is_error:
+        job_count = ctx.rng.randint(1, job_count)
+
+    messages = []
+    _write_message(ctx, simulation, mq.constants.MESSAGE_TYPE_0000, start_date, None, messages)
+    job_start_date = start_date
+    period_id = 1
+    end_date = None
+    for index in range(job_count):
+        job_end_date = job_start_date + datetime.timedelta(minutes=ctx.rng.randint(30, 720))
+        if job_end_date > ctx.end_date:
+            job_end_date = None
+        job_is_error = is_error and index == job_count - 1 and job_end_date is not None
+        job = _write_job(ctx, simulation, u"c", job_start_date, job_end_date, job_is_error, messages)
+        period_id = _write_job_periods(ctx, simulation, job, job_start_date, job_end_date, period_id, messages)
+        if job_end_date is None:
+            break
+        if ctx.rng.random() < ctx.args.post_processing_rate:
+            pp_end_date = job_end_date + datetime.timedelta(minutes=ctx.rng.randint(5, 120))
+            _write_job(ctx, simulation, u"p", job_end_date,
+                       pp_end_date if pp_end_date <= ctx.end_date else None, False, messages)
+        job_start_date = job_end_date + datetime.timedelta(minutes=ctx.rng.randint(1, 60))
+        if job_start_date >= ctx.end_date:
+            break
+    else:
+        end_date = job_end_date
+        _write_message(ctx, simulation, mq.constants.MESSAGE_TYPE_0100, end_date, None, messages)
+
+    # A try is only obsolete if restarted before the dataset end date.
+    next_start_date = None
+    if is_obsolete and end_date is not None:
+        next_start_date = end_date + datetime.timedelta(hours=ctx.rng.randint(1, 72))
+    if next_start_date is None or next_start_date >= ctx.end_date:
+        is_obsolete = False
+        next_start_date = None
+
+    ctx.write(db.types.Simulation,
+        simulation['id'],
+        start_date,
+        simulation['accounting_project'],
+        simulation['compute_node'],
+        simulation['compute_node'],
+        simulation['compute_node_login'],
+        simulation['compute_node_login'],
+        simulation['compute_node_machine'],
+        simulation['compute_node_machine'],
+        simulation['experiment'],
+        simulation['experiment'],
+        simulation['hashid'],
+        simulation['model'],
+        simulation['model'],
+        simulation['name'],
+        simulation['output_start_date'],
+        simulation['output_end_date'],
+        simulation['space'],
+        simulation['space'],
+        try_id,
+        simulation['uid'],
+        start_date,
+        end_date,
+        is_error and end_date is not None,
+        is_obsolete,
+        False
+        )
+    _write_messages(ctx, messages)
+
+    return next_start_date
+
+
+def _write_group(ctx):
+    """Writes a group of simulation tries (i.e. a simulation & its restarts) & returns number of tries.
+
+    """
+    compute_node_machine = ctx.rng.choice(ctx.terms[cv.constants.TERM_TYPE_COMPUTE_NODE_MACHINE])
+    output_start_date = datetime.datetime(ctx.rng.choice([1850, 1950, 1979, 2006]), 1, 1)
+    group = {
+        'accounting_project': ctx.rng.choice(_ACCOUNTING_PROJECTS),
+        'compute_node': compute_node_machine.split("-")[0],
+        'compute_node_login': ctx.rng.choice(ctx.terms[cv.constants.TERM_TYPE_COMPUTE_NODE_LOGIN]),
+        'compute_node_machine': compute_node_machine,
+        'experiment': ctx.rng.choice(ctx.terms[cv.constants.TERM_TYPE_EXPERIMENT]),
+        'model': ctx.rng.choice(ctx.terms[cv.constants.TERM_TYPE_MODEL]),
+        'name': u"{}-{:06d}".format(ctx.rng.choice([u"piControl", u"historical", u"amip", u"spinup"]),
+                                    ctx.rng.randint(0, 999999)),
+        'output_start_date': output_start_date,
+        'output_end_date': output_start_date.replace(year=output_start_date.year + ctx.rng.randint(10, 250)),
+        'space': ctx.rng.choice(ctx.terms[cv.constants.TERM_TYPE_SIMULATION_SPACE])
+    }
+    simulation = db.types.Simulation()
+    for key in ('accounting_project', 'compute_node', 'compute_node_login', 'compute_node_machine',
+                'experiment', 'model', 'name', 'space'):
+        setattr(simulation, key, group[key])
+    group['hashid'] = simulation.get_hashid()
+
+    tries = 1
+    while tries < _MAX_TRIES and ctx.rng.random() < ctx.args.restart_rate:
+        tries += 1
+
+    start_date = ctx.end_date - datetime.timedelta(seconds=ctx.rng.randint(0, ctx.args.days * 86400))
+    for try_id in range(1, tries + 1):
+        start_date = _write_simulation(ctx, group, try_id, try_id < tries, start_date)
+        if start_date is None:
+            return try_id
+
+    return tries
+
+
+def _copy(ctx):
+    """Loads copy buffers.
+
+    """
+    cursor = db.session.get_dbapi_connection().cursor()
+    try:
+        for etype, columns in _TABLES:
+            buffer = ctx.buffers[etype]
+            buffer.seek(0)
+            cursor.copy_expert("COPY {}.{} ({}) FROM STDIN".format(
+                etype.__table__.schema, etype.__tablename__, ", ".join(columns)
+                ), buffer)
+    finally:
+        cursor.close()
+    ctx.reset()
+
+
+def _compact(after_id):
+    """Compacts job periods of loaded simulations.
+
+    """
+    while True:
+        with db.session.create(commitable=True):
+            batch = compaction.get_simulations(after_id)
+            if not batch:
+                break
+            compaction.compact([i[1] for i in batch])
+        after_id = batch[-1][0]
+
+
+def _main(args):
+    """Main entry point.
+
+    """
+    then = arrow.utcnow()
+    with db.session.create(commitable=True):
+        simulation_id, email_id = fastpath.execute_one(_SQL_NEXT_IDS)
+    ctx = _Context(args, simulation_id, email_id)
+
+    # Partitions must exist for the whole period.
+    with db.session.create(commitable=True):
+        for table in partitioning.TABLES:
+            if partitioning.is_partitioned(table):
+                partitioning.create_partitions(table, ctx.end_date - datetime.timedelta(days=args.days))
+        db.session.commit()
+
+    # Load.
+    simulations = 0
+    while simulations < args.simulations:
+        with db.session.create(commitable=True):
+            loaded = 0
+            while loaded < args.batch_size and simulations + loaded < args.simulations:
+                loaded += _write_group(ctx)
+            _copy(ctx)
+            db.session.commit()
+        simulations += loaded
+        logger.log_db("Dataset :: simulations loaded = {} :: emails loaded = {}".format(
+            simulations, ctx.email_id - email_id
+            ))
+
+    # Finalize.
+    with db.session.create(commitable=True):
+        fastpath.execute_one(_SQL_RESET_SIMULATION_SEQUENCE)
+        db.session.commit()
+    _compact(simulation_id - 1)
+    with db.session.create(commitable=True):
+        for etype, _ in _TABLES + ((db.types.JobPeriodRange, None), ):
+            fastpath.execute_command("ANALYZE {}.{}".format(etype.__table__.schema, etype.__tablename__))
+        db.session.commit()
+
+    logger.log_db("Dataset :: {} simulations loaded in {}".format(simulations, arrow.utcnow() - then))
+
+
+# Main entry point.
+if __name__ == '__main__':
+    _main(_parser.parse_args())
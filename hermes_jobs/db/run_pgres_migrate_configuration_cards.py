@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: run_pgres_migrate_configuration_cards.py
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL/CeCIL
+   :platform: Unix
+   :synopsis: Migrates simulation configuration cards to content addressed (i.e. deduplicated) storage.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import argparse
+import hashlib
+
+import psycopg2
+
+from hermes.db import pgres as db
+from hermes.db.pgres import fastpath
+from hermes.utils import config
+from hermes.utils import config_card
+from hermes.utils import logger
+
+
+
+# Default number of simulation configurations migrated per transaction.
+_DEFAULT_BATCH_SIZE = 1000
+
+# Define command line arguments.
+_parser = argparse.ArgumentParser("Migrates simulation configuration cards to content addressed storage.")
+_parser.add_argument(
+    "-batch-size", "--batch-size",
+    help="Number of simulation configurations migrated per transaction",
+    dest="batch_size",
+    type=int,
+    default=_DEFAULT_BATCH_SIZE
+    )
+_parser.add_argument(
+    "-drop", "--drop",
+    help="Drop legacy card columns once all cards are migrated",
+    dest="drop",
+    action="store_true"
+    )
+
+# Sql: adds configuration card reference.
+_SQL_ADD_CARD_ID = """
+ALTER TABLE monitoring.tbl_simulation_configuration
+    ADD COLUMN IF NOT EXISTS card_id integer REFERENCES monitoring.tbl_configuration_card (id);
+CREATE INDEX IF NOT EXISTS ix_monitoring_tbl_simulation_configuration_card_id
+    ON monitoring.tbl_simulation_configuration (card_id);
+"""
+
+# Sql: switches card content compression to lz4 (postgres 14+).
+_SQL_SET_COMPRESSION = """
+ALTER TABLE monitoring.tbl_configuration_card ALTER COLUMN content SET COMPRESSION lz4
+"""
+
+# Sql: batch of simulation configurations awaiting migration.
+_SQL_BATCH = """
+SELECT
+    sc.id,
+    sc.card
+FROM
+    monitoring.tbl_simulation_configuration AS sc
+WHERE
+    sc.card_id IS NULL AND
+    sc.card IS NOT NULL
+ORDER BY
+    sc.id
+LIMIT %(batch_size)s
+"""
+
+# Sql: persists a card (if unseen) & references it.
+_SQL_SET_CARD = """
+WITH card AS (
+    INSERT INTO monitoring.tbl_configuration_card (
+        row_create_date,
+        hashid,
+        content,
+        encoding,
+        mime_type
+    )
+    VALUES (
+        now() AT TIME ZONE 'utc',
+        %(hashid)s,
+        %(content)s,
+        'utf-8',
+        %(mime_type)s
+    )
+    ON CONFLICT (hashid) DO NOTHING
+    RETURNING id
+)
+UPDATE
+    monitoring.tbl_simulation_configuration
+SET
+    card_id = coalesce(
+        (SELECT id FROM card),
+        (SELECT cc.id FROM monitoring.tbl_configuration_card AS cc WHERE cc.hashid = %(hashid)s)
+        )
+WHERE
+    id = %(id)s
+"""
+
+# Sql: drops legacy card columns.
+_SQL_DROP_CARD_COLUMNS = """
+DELETE FROM monitoring.tbl_simulation_configuration WHERE card_id IS NULL;
+ALTER TABLE monitoring.tbl_simulation_configuration ALTER COLUMN card_id SET NOT NULL;
+ALTER TABLE monitoring.tbl_simulation_configuration DROP COLUMN IF EXISTS card;
+ALTER TABLE monitoring.tbl_simulation_configuration DROP COLUMN IF EXISTS card_encoding;
+ALTER TABLE monitoring.tbl_simulation_configuration DROP COLUMN IF EXISTS card_mime_type;
+"""
+
+
+def _get_admin_connection():
+    """Returns admin db connection (ddl statements require table ownership).
+
+    """
+    return config.db.pgres.main.replace(db.constants.HERMES_DB_USER, db.constants.HERMES_DB_ADMIN_USER)
+
+
+def _init_tables():
+    """Creates card table & card reference column.
+
+    """
+    db.types.ConfigurationCard.__table__.create(db.session.sa_engine, checkfirst=True)
+    fastpath.execute_command(_SQL_ADD_CARD_ID)
+    if int(fastpath.execute_one("SHOW server_version_num")[0]) >= 140000:
+        fastpath.execute_command(_SQL_SET_COMPRESSION)
+
+
+def _migrate_batch(batch):
+    """Moves a batch of cards to the card table.
+
+    """
+    for configuration_id, card in batch:
+        content, mime_type = config_card.get_content(card)
+        fastpath.execute_command(_SQL_SET_CARD, {
+            'content': psycopg2.Binary(content),
+            'hashid': unicode(hashlib.sha256(content).hexdigest()),
+            'id': configuration_id,
+            'mime_type': mime_type
+            })
+
+
+def _main(args):
+    """Main entry point.
+
+    """
+    with db.session.create(_get_admin_connection(), commitable=True):
+        _init_tables()
+        db.session.commit()
+
+        migrated = 0
+        while True:
+            batch = fastpath.execute(_SQL_BATCH, {'batch_size': args.batch_size})
+            if not batch:
+                break
+            _migrate_batch(batch)
+            db.session.commit()
+            migrated += len(batch)
+            logger.log_db("Configuration cards migrated :: {} :: distinct cards = {}".format(
+                migrated,
+                fastpath.execute_one("SELECT count(*) FROM monitoring.tbl_configuration_card")[0]
+                ))
+
+        if args.drop:
+            fastpath.execute_command(_SQL_DROP_CARD_COLUMNS)
+            logger.log_db("Legacy configuration card columns dropped")
+        fastpath.execute_command("ANALYZE monitoring.tbl_configuration_card")
+        fastpath.execute_command("ANALYZE monitoring.tbl_simulation_configuration")
+        db.session.commit()
+
+
+# Main entry point.
+if __name__ == '__main__':
+    _main(_parser.parse_args())
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: run_pgres_migrate_uid_keys.py
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL/CeCIL
+   :platform: Unix
+   :synopsis: Migrates textual uid columns to native uuid columns & assigns simulation surrogate keys.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+from hermes.db import pgres as db
+from hermes.db.pgres import fastpath
+from hermes.db.pgres.entity import Uid
+from hermes.utils import config
+from hermes.utils import logger
+
+
+
+# Tables keyed to simulations by surrogate key.
+_KEYED_TABLES = (
+    db.types.Job.__table__,
+    db.types.JobPeriod.__table__
+    )
+
+# Tables with uid columns.
+# N.B. mq.tbl_message.correlation_id_1 remains textual (see types_mq.Message).
+_UID_TABLES = _KEYED_TABLES + (
+    db.types.EnvironmentMetric.__table__,
+    db.types.Simulation.__table__,
+    db.types.SimulationConfiguration.__table__,
+    db.types.Supervision.__table__
+    )
+
+# Sql: column data type.
+_SQL_DATA_TYPE = """
+SELECT
+    c.data_type
+FROM
+    information_schema.columns AS c
+WHERE
+    c.table_schema = %(schema)s AND
+    c.table_name = %(table)s AND
+    c.column_name = %(column)s
+"""
+
+# Sql: count of values that cannot be cast to uuid.
+_SQL_INVALID_UIDS = """
+SELECT
+    count(*)
+FROM
+    {table}
+WHERE
+    {column} IS NOT NULL AND
+    {column}::text !~* '^[0-9a-f]{{8}}-?([0-9a-f]{{4}}-?){{3}}[0-9a-f]{{12}}$'
+"""
+
+# Sql: converts a column to uuid.
+_SQL_ALTER_UID = """
+ALTER TABLE {table} ALTER COLUMN {column} TYPE uuid USING {column}::uuid
+"""
+
+# Sql: adds simulation surrogate key.
+_SQL_ADD_SIMULATION_ID = """
+ALTER TABLE {table} ADD COLUMN IF NOT EXISTS simulation_id integer;
+CREATE INDEX IF NOT EXISTS ix_{name}_simulation_id ON {table} (simulation_id);
+"""
+
+# Sql: assigns simulation surrogate key.
+_SQL_SET_SIMULATION_ID = """
+UPDATE
+    {table} AS t
+SET
+    simulation_id = s.id
+FROM
+    monitoring.tbl_simulation AS s
+WHERE
+    t.simulation_uid = s.uid AND
+    t.simulation_id IS NULL
+"""
+
+
+def _get_admin_connection():
+    """Returns admin db connection (ddl statements require table ownership).
+
+    """
+    return config.db.pgres.main.replace(db.constants.HERMES_DB_USER, db.constants.HERMES_DB_ADMIN_USER)
+
+
+def _get_uid_columns():
+    """Returns set of uid columns awaiting migration.
+
+    """
+    for table in _UID_TABLES:
+        for column in table.columns:
+            if isinstance(column.type, Uid):
+                data_type = fastpath.execute_one(_SQL_DATA_TYPE, {
+                    'schema': table.schema,
+                    'table': table.name,
+                    'column': column.name
+                    })[0]
+                if data_type != 'uuid':
+                    yield table, column
+
+
+def _get_qualified_name(table):
+    """Returns schema qualified table name.
+
+    """
+    return "{}.{}".format(table.schema, table.name)
+
+
+def _migrate_uids(columns):
+    """Converts textual uid columns to native uuid columns.
+
+    """
+    for table, column in columns:
+        sql = _SQL_INVALID_UIDS.format(table=_get_qualified_name(table), column=column.name)
+        count = fastpath.execute_one(sql)[0]
+        if count:
+            raise ValueError("{}.{} has {} values that are not uuid's: migration aborted".format(
+                _get_qualified_name(table), column.name, count
+                ))
+
+    for table, column in columns:
+        logger.log_db("Converting to uuid: {}.{}".format(_get_qualified_name(table), column.name))
+        fastpath.execute_command(_SQL_ALTER_UID.format(table=_get_qualified_name(table), column=column.name))
+
+
+def _migrate_simulation_ids():
+    """Adds & assigns simulation surrogate keys.
+
+    """
+    for table in _KEYED_TABLES:
+        fastpath.execute_command(_SQL_ADD_SIMULATION_ID.format(table=_get_qualified_name(table), name=table.name))
+        count = fastpath.execute_command(_SQL_SET_SIMULATION_ID.format(table=_get_qualified_name(table)))
+        logger.log_db("Simulation keys assigned: {} --> {}".format(_get_qualified_name(table), count))
+        fastpath.execute_command("ANALYZE {}".format(_get_qualified_name(table)))
+
+
+def _main():
+    """Main entry point.
+
+    """
+    with db.session.create(_get_admin_connection(), commitable=True):
+        _migrate_uids(list(_get_uid_columns()))
+        _migrate_simulation_ids()
+        db.session.commit()
+
+
+# Main entry point.
+if __name__ == '__main__':
+    _main()
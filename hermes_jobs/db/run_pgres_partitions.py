@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: run_pgres_partitions.py
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL/CeCIL
+   :platform: Unix
+   :synopsis: Maintains monthly table partitions: creation, cold archival & restoration.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import argparse
+import os
+
+from hermes.db import pgres as db
+from hermes.db.pgres import partitioning
+from hermes.utils import config
+from hermes.utils import logger
+
+
+
+# Job actions.
+_ACTION_INIT = "init"
+_ACTION_CREATE = "create"
+_ACTION_ARCHIVE = "archive"
+_ACTION_RESTORE = "restore"
+
+# Define command line arguments.
+_parser = argparse.ArgumentParser("Maintains monthly table partitions.")
+_parser.add_argument(
+    "-action", "--action",
+    help="Action to perform",
+    dest="action",
+    choices=[_ACTION_INIT, _ACTION_CREATE, _ACTION_ARCHIVE, _ACTION_RESTORE],
+    type=str
+    )
+_parser.add_argument(
+    "-dir", "--dir",
+    help="Directory within which partition archives are written / read",
+    dest="dir",
+    type=str,
+    default=os.path.join(os.getenv("HERMES_HOME", "/opt/hermes"), "ops", "data", "pgres", "archive")
+    )
+_parser.add_argument(
+    "-partition", "--partition",
+    help="Name of partition to be restored, e.g. tbl_job_period_y2016m01",
+    dest="partition",
+    type=str
+    )
+_parser.add_argument(
+    "-months-ahead", "--months-ahead",
+    help="Number of months ahead of now for which partitions are created",
+    dest="months_ahead",
+    type=int,
+    default=partitioning.DEFAULT_MONTHS_AHEAD
+    )
+_parser.add_argument(
+    "-archive-after", "--archive-after",
+    help="Age (in months) after which a partition may be archived",
+    dest="archive_after",
+    type=int,
+    default=partitioning.DEFAULT_ARCHIVE_AFTER
+    )
+
+
+def _get_admin_connection():
+    """Returns admin db connection (ddl statements require table ownership).
+
+    """
+    return config.db.pgres.main.replace(db.constants.HERMES_DB_USER, db.constants.HERMES_DB_ADMIN_USER)
+
+
+def _init(args):
+    """Converts tables to partitioned tables.
+
+    """
+    with db.session.create(_get_admin_connection(), commitable=True):
+        partitioning.init(args.months_ahead)
+
+
+def _create(args):
+    """Creates upcoming partitions.
+
+    """
+    with db.session.create(_get_admin_connection(), commitable=True):
+        for table in partitioning.TABLES:
+            for name in partitioning.create_partitions(table, months_ahead=args.months_ahead):
+                logger.log_db("Partition available: {}".format(name))
+
+
+def _archive(args):
+    """Archives partitions of completed / obsolete simulations.
+
+    """
+    with db.session.create(_get_admin_connection()):
+        for table in partitioning.TABLES:
+            for name in partitioning.get_archivable_partitions(table, args.archive_after):
+                fpath = partitioning.archive_partition(table, name, args.dir)
+                logger.log_db("Partition archived: {} --> {}".format(name, fpath))
+
+
+def _restore(args):
+    """Restores an archived partition.
+
+    """
+    with db.session.create(_get_admin_connection()):
+        for table in partitioning.TABLES:
+            if args.partition.startswith("{}_".format(table.name)):
+                partitioning.restore_partition(table, args.partition, args.dir)
+                logger.log_db("Partition restored: {}".format(args.partition))
+                return
+
+    raise ValueError("Partition cannot be mapped to a partitioned table: {}".format(args.partition))
+
+
+# Map of actions to handlers.
+_ACTIONS = {
+    _ACTION_INIT: _init,
+    _ACTION_CREATE: _create,
+    _ACTION_ARCHIVE: _archive,
+    _ACTION_RESTORE: _restore
+}
+
+
+# Main entry point.
+if __name__ == '__main__':
+    # Validate args.
+    args = _parser.parse_args()
+    if args.action in (_ACTION_ARCHIVE, _ACTION_RESTORE) and not os.path.isdir(args.dir):
+        raise ValueError("Partition archive directory is invalid.")
+    if args.action == _ACTION_RESTORE and not args.partition:
+        raise ValueError("Partition to be restored is unspecified.")
+
+    # Invoke entry point.
+    _ACTIONS[args.action](args)
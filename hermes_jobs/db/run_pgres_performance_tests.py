@@ -109,8 +109,9 @@ _TIMESLICE_DELTAS = {
 
 # Set of db drivers to test.
 _DRIVERS = [
-    # "sqlalchemy",
+    "sqlalchemy",
     "sqlalchemy-direct",
+    "fastpath",
     "psycopg2"
 ]
 
@@ -189,7 +190,7 @@ def retrieve_active_jobs_direct(start_date=None):
         j.simulation_uid,
         j.typeof
         )
-    qry = qry.join(s, j.simulation_uid == s.uid)
+    qry = qry.join(s, j.simulation_id == s.id)
     qry = qry.filter(j.execution_start_date != None)
     qry = qry.filter(s.execution_start_date != None)
     qry = qry.filter(s.is_obsolete == False)
@@ -237,6 +238,20 @@ def retrieve_active_jobs(start_date=None):
     return qry.all()
 
 
+def retrieve_active_jobs_fastpath(start_date=None):
+    """Retrieves active job details from db via the fast-path executor.
+
+    :param datetime.datetime start_date: Job execution start date.
+
+    :returns: Job details.
+    :rtype: list
+
+    """
+    sql = _SQL_SELECT_JOBS.format("AND \n\ts.execution_start_date >= %(start_date)s" if start_date else "")
+
+    return db.fastpath.execute(sql, {'start_date': start_date})
+
+
 # Map of db query targets to sqlalchmey based functions.
 _SQLALCHEMY_FACTORIES = {
     "simulations": retrieve_active_simulations,
@@ -249,6 +264,12 @@ _SQLALCHEMY_FACTORIES_DIRECT = {
     "jobs": retrieve_active_jobs_direct,
 }
 
+# Map of db query targets to fast-path executor based functions.
+_FASTPATH_FACTORIES = {
+    "simulations": db.dao_monitoring_fastpath.retrieve_active_simulations,
+    "jobs": retrieve_active_jobs_fastpath,
+}
+
 # Map of db query targets to psycopg2 sql statements.
 _PSYCOPG2_FACTORIES = {
     "simulations": _SQL_SELECT_SIMULATIONS,
@@ -278,6 +299,17 @@ def exec_sqlalchmey_direct(timeslice_delta, target):
     return data
 
 
+def exec_fastpath(timeslice_delta, target):
+    """Performs a fast-path executor based db query."""
+    if timeslice_delta:
+        timeslice_delta = timeslice_delta.datetime
+    timeslice_factory = _FASTPATH_FACTORIES[target]
+    with db.session.create():
+        data = timeslice_factory(timeslice_delta)
+
+    return data
+
+
 def exec_psycopg2(timeslice_delta, target):
     """Performs a psycopg2 based db query."""
     if timeslice_delta:
@@ -303,6 +335,7 @@ def exec_psycopg2(timeslice_delta, target):
 _DATA_FACTORIES = {
     "sqlalchemy": exec_sqlalchmey,
     "sqlalchemy-direct": exec_sqlalchmey_direct,
+    "fastpath": exec_fastpath,
     "psycopg2": exec_psycopg2
 }
 
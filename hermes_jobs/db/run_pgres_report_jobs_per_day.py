@@ -12,6 +12,7 @@
 
 """
 import argparse
+import collections
 import datetime
 import os
 
@@ -35,7 +36,7 @@ def _get_initial_stats():
     """Gets initial stats prior to querying jobs table.
 
     """
-    with db.session.create():
+    with db.session.create(read_only=True):
         return [{
             "name": i,
             "counts": [],
@@ -50,7 +51,7 @@ def _get_intervals():
     """Gets set of time intervals over which to query jobs.
 
     """
-    with db.session.create():
+    with db.session.create(read_only=True):
         earliest_job = dao_monitoring.get_earliest_job()
 
     start = earliest_job.execution_start_date.date()
@@ -64,12 +65,13 @@ def _get_intervals():
             for i in range((end - start).days)]
 
 
-def _get_job_set(start, end):
-    """Returns a set of jobs for a time interval.
+def _get_job_counts(start, end):
+    """Returns count of jobs per accounting project for a time interval.
 
     """
-    with db.session.create():
-        return dao_monitoring.retrieve_jobs_by_interval(start, end)
+    with db.session.create(read_only=True):
+        return collections.Counter(j.accounting_project for j in
+                                   dao_monitoring.stream_jobs_by_interval(start, end))
 
 
 def _get_report_header(start, end):
@@ -117,9 +119,9 @@ def _main(args):
     # Set job counts.
     intervals = _get_intervals()
     for start, end in intervals:
-        job_set = _get_job_set(start, end)
+        job_counts = _get_job_counts(start, end)
         for ap in stats:
-            ap['counts'].append(len([j for j in job_set if j.accounting_project == ap['name']]))
+            ap['counts'].append(job_counts[ap['name']])
 
     # Set derived stats.
     for ap in stats:
@@ -90,7 +90,7 @@ def _get_interval_stats(ctx, start, end):
 
     """
     # Get interval email set.
-    with db.session.create():
+    with db.session.create(read_only=True):
         data = dao_mq.retrieve_mail_identifiers_by_interval(start, end)
 
     # Exclude those not mapped to a simulation.
@@ -170,7 +170,7 @@ def _main(args):
     ctx = _ProcessingContextInfo(args.dest)
 
     # Pull as much data from db as possibile upfront.
-    with db.session.create():
+    with db.session.create(read_only=True):
         _init_maps(ctx)
         _init_stats(ctx)
         _init_intervals(ctx)
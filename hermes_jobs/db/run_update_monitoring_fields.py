@@ -5,49 +5,141 @@
    :copyright: Copyright "Mar 21, 2015", Institute Pierre Simon Laplace
    :license: GPL/CeCIL
    :platform: Unix
-   :synopsis: Ensures that all simulation fields related to monitoring are assigned.
+   :synopsis: Ensures that all simulation fields derived from configuration cards are assigned.
 
 .. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
 
 
 """
-import base64
-import ConfigParser
-import io
+import argparse
+import multiprocessing
 
 import hermes.db.pgres as db
+from hermes.db.pgres import fastpath
+from hermes.utils import config
+from hermes.utils import config_card
+from hermes.utils import logger
+
+
+
+# Default number of simulations updated per transaction.
+_DEFAULT_BATCH_SIZE = 1000
+
+# Define command line arguments.
+_parser = argparse.ArgumentParser("Assigns simulation fields derived from configuration cards.")
+_parser.add_argument(
+    "-batch-size", "--batch-size",
+    help="Number of simulations updated per transaction",
+    dest="batch_size",
+    type=int,
+    default=_DEFAULT_BATCH_SIZE
+    )
+_parser.add_argument(
+    "-after-id", "--after-id",
+    help="Id of simulation after which the update resumes",
+    dest="after_id",
+    type=int,
+    default=0
+    )
+_parser.add_argument(
+    "-workers", "--workers",
+    help="Number of card parsing worker processes",
+    dest="workers",
+    type=int,
+    default=multiprocessing.cpu_count()
+    )
+
+# Simulation columns derived from configuration cards.
+_CARD_COLUMNS = tuple(db.types.Simulation.__table__.c[i] for i in (
+    'exp_type',
+    'long_name',
+    'period_length',
+    'tag_name'
+    ))
+
+# Sql: adds a simulation column (idempotent).
+_SQL_ADD_COLUMN = """
+ALTER TABLE monitoring.tbl_simulation ADD COLUMN IF NOT EXISTS {name} {data_type}
+"""
 
 
+def _get_admin_connection():
+    """Returns admin db connection (ddl statements require table ownership).
 
-def _decode_base64_card(card):
-	return base64.decodestring(card)
+    """
+    return config.db.pgres.main.replace(db.constants.HERMES_DB_USER, db.constants.HERMES_DB_ADMIN_USER)
 
 
-def _main():
-    """Main entry point.
+def _migrate_columns():
+    """Adds simulation columns derived from configuration cards to existing databases.
 
     """
-    for simulation in db.dao.get_all(db.types.Simulation):
-    	configuration = db.dao_monitoring.retrieve_simulation_configuration(simulation.uid)
-    	if configuration is None or configuration.card is None:
-    		continue
+    with db.session.create(_get_admin_connection(), commitable=True):
+        for column in _CARD_COLUMNS:
+            fastpath.execute_command(_SQL_ADD_COLUMN.format(
+                name=column.name,
+                data_type=column.type.compile(dialect=db.session.sa_engine.dialect)
+                ))
+            logger.log_db("Simulation column ensured: {}".format(column.name))
 
-    	print simulation.uid
 
-    	card = _decode_base64_card(configuration.card)
-    	print card
+def _get_batch(after_id, batch_size):
+    """Returns a batch of simulation ids & configuration card contents.
 
-    	config = ConfigParser.RawConfigParser(allow_no_value=True)
-    	config.readfp(io.BytesIO(card))
+    """
+    s = db.types.Simulation
+    sc = db.types.SimulationConfiguration
+    cc = db.types.ConfigurationCard
+    qry = db.session.raw_query(s.id, cc.content)
+    qry = qry.join(sc, s.uid == sc.simulation_uid)
+    qry = qry.join(cc, cc.id == sc.card_id)
+    qry = qry.filter(s.id > after_id)
+    qry = qry.order_by(s.id)
+    qry = qry.limit(batch_size)
 
-    	print dir(config)
-    	print config.sections()
-    	print config.get('UserChoices', 'ExpType')
+    return qry.all()
 
-    	break
+
+def _parse(row):
+    """Returns simulation fields derived from a configuration card (executed within worker processes).
+
+    """
+    simulation_id, content = row
+    fields = config_card.parse(content, u"text/plain")
+    if fields:
+        fields['id'] = simulation_id
+
+        return fields
+
+
+def _main(args):
+    """Main entry point.
+
+    """
+    _migrate_columns()
+
+    pool = multiprocessing.Pool(args.workers)
+    after_id = args.after_id
+    parsed = updated = 0
+    try:
+        while True:
+            with db.session.create(commitable=True):
+                batch = _get_batch(after_id, args.batch_size)
+                if not batch:
+                    break
+                mappings = [i for i in pool.map(_parse, batch) if i]
+                db.dao_monitoring.update_simulations_card_fields(mappings)
+            parsed += len(batch)
+            updated += len(mappings)
+            after_id = batch[-1][0]
+            logger.log_db("Simulation card fields :: parsed={} :: updated={} :: last simulation id={}".format(
+                parsed, updated, after_id
+                ))
+    finally:
+        pool.close()
+        pool.join()
 
 
 # Main entry point.
 if __name__ == '__main__':
-    with db.session.create():
-        _main()
+    _main(_parser.parse_args())
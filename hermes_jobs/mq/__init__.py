@@ -1,3 +1,10 @@
+# -*- coding: utf-8 -*-
+import os
+
+# Agents are trusted internal callers, hence dao validation is off (unless set otherwise by operator).
+# N.B. set before importing any hermes module as doing so decorates every dao module.
+os.environ.setdefault('HERMES_DAO_VALIDATION_MODE', 'none')
+
 from . import conso
 from . import delegator
 from . import internal
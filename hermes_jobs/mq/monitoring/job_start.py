@@ -25,6 +25,7 @@ from hermes.db import pgres as db
 from hermes.db.pgres import dao_monitoring as dao
 from hermes.db.pgres.constants import DEFAULT_TZ
 from hermes.utils import config
+from hermes.utils import config_card
 from hermes.utils import logger
 from hermes_jobs.mq import utils as mq_utils
 
@@ -265,12 +266,18 @@ def _persist_simulation(ctx):
             ctx.get_field('storageSmallPath')
             )
 
-        # ... configuration.
-        config_card = ctx.get_field('configuration')
-        if config_card:
+        # ... configuration & fields derived from it.
+        card = ctx.get_field('configuration')
+        if card:
             dao.persist_simulation_configuration(
                 ctx.simulation_uid,
-                config_card
+                card
+                )
+            # N.B. content is returned decoded whether the card was base64 encoded or plain text.
+            content, _ = config_card.get_content(card)
+            dao.update_simulation_card_fields(
+                ctx.simulation_uid,
+                config_card.parse(content, u"text/plain")
                 )
 
         # ... active simulation.
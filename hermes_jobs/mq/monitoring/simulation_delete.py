@@ -13,9 +13,9 @@
 from hermes_jobs.mq import utils
 from hermes import mq
 from hermes.db import pgres as db
+from hermes.db.pgres.dao_monitoring import purge_simulations
 from hermes.db.pgres.dao_monitoring import retrieve_simulation
-from hermes.db.pgres.dao_monitoring import retrieve_simulations_by_hashid
-from hermes.db.pgres.dao_monitoring import delete_simulation
+from hermes.db.pgres.dao_monitoring import retrieve_simulation_uids_by_hashid
 from hermes.utils import config
 from hermes.utils import logger
 
@@ -46,8 +46,9 @@ class ProcessingContextInfo(mq.Message):
             props, body, decode=decode, validate_props=validate_props)
 
         self.is_confirm = False
-        self.simulations = []
+        self.purge_counts = {}
         self.simulation_uid = None
+        self.simulation_uids = set()
 
 
 def _unpack(ctx):
@@ -55,6 +56,7 @@ def _unpack(ctx):
 
     """
     ctx.simulation_uid = ctx.content['simuid']
+    ctx.simulation_uids = set(ctx.content.get('simuids', [ctx.simulation_uid]))
     ctx.is_confirm = ctx.content.get('is_confirm') is not None
 
 
@@ -64,17 +66,15 @@ def _set_data(ctx):
     """
     simulation = retrieve_simulation(ctx.simulation_uid)
     if simulation:
-        ctx.simulations = retrieve_simulations_by_hashid(simulation.hashid)
+        ctx.simulation_uids.update(retrieve_simulation_uids_by_hashid(simulation.hashid))
 
 
 def _delete(ctx):
     """Deletes simulation data from dB.
 
     """
-    if ctx.simulations:
-        for s in ctx.simulations:
-            delete_simulation(s.uid)
-        db.session.commit()
+    ctx.purge_counts = purge_simulations(ctx.simulation_uids)
+    db.session.commit()
 
 
 def _enqueue(ctx):
@@ -90,6 +90,7 @@ def _enqueue(ctx):
         exchange=mq.constants.EXCHANGE_HERMES_SECONDARY_DELAYED,
         payload={
             "simuid": ctx.simulation_uid,
+            "simuids": sorted(ctx.simulation_uids),
             "is_confirm": True
             }
         )
@@ -99,7 +100,8 @@ def _log(ctx):
     """Logs event.
 
     """
+    counts = ", ".join("{}={}".format(k, v) for k, v in sorted(ctx.purge_counts.items()))
     if ctx.is_confirm:
-        logger.log_mq("Simulation purge confirmed: {}".format(ctx.simulation_uid))
+        logger.log_mq("Simulation purge confirmed: {} :: {}".format(ctx.simulation_uid, counts))
     else:
-        logger.log_mq("Simulation purged: {}".format(ctx.simulation_uid))
+        logger.log_mq("Simulation purged: {} :: {}".format(ctx.simulation_uid, counts))
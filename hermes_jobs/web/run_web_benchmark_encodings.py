@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: run_web_benchmark_encodings.py
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL/CeCIL
+   :platform: Unix
+   :synopsis: Benchmarks response encodings of monitoring payloads and writes results to file system.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import csv
+import json
+import os
+import timeit
+import zlib
+
+import arrow
+from sqlalchemy import func
+
+from hermes.db import pgres as db
+from hermes.db.pgres import dao_monitoring_fastpath as dao
+from hermes.utils import logger
+from hermes.web.utils import http_encoder as encoder
+
+
+
+# Global now.
+_NOW = arrow.utcnow()
+
+# Number of times each payload is encoded / decoded.
+_ITERATIONS = 10
+
+# Compression level applied when measuring compressed payload size (as per typical gzip transfer encoding).
+_COMPRESSION_LEVEL = 6
+
+# Map of timeslice tokens to start dates.
+_TIMESLICES = {
+    '1M': _NOW.replace(days=-31).datetime,
+    'ALL': None
+}
+
+# Set of CSV file headers.
+_CSV_HEADERS = (
+    "PAYLOAD",
+    "ENCODING",
+    "SIZE",
+    "COMPRESSED SIZE",
+    "SIZE RATIO",
+    "MEAN ENCODE TIME (MS)",
+    "MEAN DECODE TIME (MS)"
+    )
+
+
+def _get_busiest_simulation():
+    """Returns uid of simulation with the most jobs.
+
+    """
+    j = db.types.Job
+    qry = db.session.raw_query(j.simulation_uid)
+    qry = qry.group_by(j.simulation_uid)
+    qry = qry.order_by(func.count(j.id).desc())
+
+    return qry.first()[0]
+
+
+def _get_payloads():
+    """Returns monitoring payloads (decoded) keyed by name.
+
+    N.B. the db is expected to be seeded via run_pgres_generate_dataset.
+
+    """
+    payloads = {}
+    for timeslice, start_date in _TIMESLICES.items():
+        payloads["timeslice-{}".format(timeslice)] = json.loads(dao.retrieve_timeslice_json(start_date))
+    payloads["detail"] = json.loads(dao.retrieve_simulation_detail_json(_get_busiest_simulation()))
+
+    return payloads
+
+
+def _get_mean_time(task):
+    """Returns mean execution time (in milliseconds) of a task.
+
+    """
+    timings = timeit.repeat(task, number=1, repeat=_ITERATIONS)
+
+    return 1000 * sum(timings) / len(timings)
+
+
+def _get_metrics(payloads):
+    """Returns a collection of encoding performance metrics.
+
+    """
+    metrics = []
+    for name, data in sorted(payloads.items()):
+        baseline = len(encoder.encode(data, encoder.MIME_JSON))
+        for mime in encoder.get_supported():
+            encoded = encoder.encode(data, mime)
+            assert encoder.decode(encoded, mime) == data
+            metrics.append((
+                name,
+                mime,
+                len(encoded),
+                len(zlib.compress(encoded, _COMPRESSION_LEVEL)),
+                "{:.2f}".format(float(len(encoded)) / baseline),
+                _get_mean_time(lambda: encoder.encode(data, mime)),
+                _get_mean_time(lambda: encoder.decode(encoded, mime))
+                ))
+
+    return metrics
+
+
+def _main():
+    """Main entry point.
+
+    """
+    if encoder.msgpack is None:
+        logger.log_web_warning("msgpack is not installed: MessagePack encoding will not be benchmarked")
+
+    with db.session.create():
+        payloads = _get_payloads()
+    metrics = _get_metrics(payloads)
+
+    fname = "{}_server_web_encoding_metrics_{}.csv".format(
+        os.getenv("HERMES_MACHINE_TYPE"), _NOW.format('YYYY-MM-DD'))
+    fpath = os.path.join(os.getenv("HERMES_HOME"), "tmp")
+    fpath = os.path.join(fpath, fname)
+    with open(fpath, 'wb') as output_file:
+        writer = csv.writer(output_file)
+        writer.writerow(_CSV_HEADERS)
+        writer.writerows(metrics)
+    logger.log_web("metrics written to --> {}".format(fpath))
+
+
+if __name__ == '__main__':
+    _main()
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: run_web_benchmark_serializer.py
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL/CeCIL
+   :platform: Unix
+   :synopsis: Benchmarks serialisation of mapped entities and writes results to file system.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import csv
+import datetime
+import json
+import os
+import timeit
+import uuid
+
+import arrow
+import sqlalchemy as sa
+
+from hermes.db.pgres import types
+from hermes.utils import data_convertor
+from hermes.utils import logger
+from hermes.utils.string_convertor import to_camel_case
+
+
+
+# Global now.
+_NOW = arrow.utcnow()
+
+# Number of jobs serialised.
+_JOB_COUNT = 100000
+
+# Number of times the jobs are serialised.
+_ITERATIONS = 5
+
+# Set of CSV file headers.
+_CSV_HEADERS = ("SERIALIZER", "JOBS", "PAYLOAD SIZE", "MEAN TIME (MS)", "MIN TIME (MS)", "MEAN TIME PER JOB (US)")
+
+
+def _convert_generic(data):
+    """Converts data by walking the mapper of each entity instance, i.e. the former serializer.
+
+    """
+    if isinstance(data, list):
+        return [_convert_generic(i) for i in data]
+    elif isinstance(data, dict):
+        return {to_camel_case(k): _convert_generic(v) for k, v in data.iteritems()}
+    elif sa.inspect(data, False):
+        return _convert_generic({c.name: getattr(data, c.name) for c in sa.inspect(data).mapper.columns})
+    else:
+        return data_convertor.convert(data)
+
+
+def _get_jobs():
+    """Returns a collection of (transient) jobs.
+
+    """
+    jobs = []
+    for i in xrange(_JOB_COUNT):
+        job = types.Job()
+        job.id = i
+        job.accounting_project = u"gencmip6"
+        job.execution_state = u"c"
+        job.execution_start_date = datetime.datetime.utcnow()
+        job.execution_end_date = datetime.datetime.utcnow()
+        job.is_compute_end = i % 2 == 0
+        job.is_error = False
+        job.job_uid = unicode(uuid.uuid4())
+        job.scheduler_id = unicode(i)
+        job.simulation_id = i % 100
+        job.simulation_uid = unicode(uuid.uuid4())
+        job.typeof = u"computing"
+        job.warning_delay = 3600
+        job.row_create_date = datetime.datetime.utcnow()
+        jobs.append(job)
+
+    return jobs
+
+
+# Map of serializers to functions returning json payloads.
+_SERIALIZERS = {
+    'generic': lambda jobs: json.dumps({'jobList': _convert_generic(jobs)}),
+    'compiled': lambda jobs: json.dumps(data_convertor.convert({'job_list': jobs}, to_camel_case))
+}
+
+
+def _get_metrics(jobs):
+    """Returns a collection of serializer performance metrics.
+
+    """
+    payloads = {k: f(jobs) for k, f in _SERIALIZERS.items()}
+    assert payloads['compiled'] == payloads['generic']
+
+    metrics = []
+    for name, serializer in sorted(_SERIALIZERS.items()):
+        timings = [1000 * i for i in timeit.repeat(lambda: serializer(jobs), number=1, repeat=_ITERATIONS)]
+        metrics.append((
+            name,
+            len(jobs),
+            len(payloads[name]),
+            sum(timings) / len(timings),
+            min(timings),
+            1000 * (sum(timings) / len(timings)) / len(jobs)
+            ))
+
+    return metrics
+
+
+def _main():
+    """Main entry point.
+
+    """
+    metrics = _get_metrics(_get_jobs())
+
+    fname = "{}_server_web_serializer_metrics_{}.csv".format(
+        os.getenv("HERMES_MACHINE_TYPE"), _NOW.format('YYYY-MM-DD'))
+    fpath = os.path.join(os.getenv("HERMES_HOME"), "tmp")
+    fpath = os.path.join(fpath, fname)
+    with open(fpath, 'wb') as output_file:
+        writer = csv.writer(output_file)
+        writer.writerow(_CSV_HEADERS)
+        writer.writerows(metrics)
+    logger.log_web("metrics written to --> {}".format(fpath))
+
+
+if __name__ == '__main__':
+    _main()
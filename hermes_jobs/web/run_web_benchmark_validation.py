@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: run_web_benchmark_validation.py
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL/CeCIL
+   :platform: Unix
+   :synopsis: Micro-benchmarks per request cost of web request validation.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import json
+import timeit
+
+import jsonschema
+from voluptuous import All
+from voluptuous import Required
+from voluptuous import Schema
+
+from hermes.utils import logger
+from hermes.web import schemas
+from hermes.web.request_validation import validator as rv
+from hermes.web.request_validation import validator_metrics_pcmdi as rv_metrics
+from hermes.web.utils import http_validator
+
+
+
+# Number of requests per measurement.
+_REQUESTS = 10000
+
+# Endpoint: fetch_timeslice.
+_EP_TIMESLICE = r'/api/1/simulation/monitoring/fetch_timeslice'
+
+# Endpoint: metrics add.
+_EP_METRICS_ADD = r'/api/1/simulation/metrics/add'
+
+# Request body: metrics add.
+_METRICS_ADD_BODY = json.dumps({
+    'group': u"benchmark-group",
+    'columns': [u"institute", u"model", u"experiment", u"value"],
+    'metrics': [[u"IPSL", u"IPSL-CM6A-LR", u"historical", i] for i in xrange(100)]
+    })
+
+
+class _Request(object):
+    """A mock HTTP request.
+
+    """
+    def __init__(self, path, query_arguments=None, body=''):
+        self.path = path
+        self.headers = {'Content-Type': 'application/json'}
+        self.query = '&'.join(query_arguments or {})
+        self.query_arguments = query_arguments or {}
+        self.body = body
+        self.files = {}
+
+
+class _Handler(object):
+    """A mock HTTP request handler, instantiated per request.
+
+    """
+    def __init__(self, request):
+        self.request = request
+
+    def decode_json_body(self, as_namedtuple=True):
+        return http_validator.decode_json_body(self)
+
+
+def _validate_timeslice_legacy(handler):
+    """Validates a fetch_timeslice request prior to compilation of schemas.
+
+    """
+    for typeof, data in (('headers', dict(handler.request.headers)),
+                         ('params', handler.request.query_arguments)):
+        schema = schemas.get_schema(typeof, handler.request.path)
+        if schema is not None:
+            jsonschema.validate(data, schema)
+
+
+def _validate_metrics_add_legacy(handler):
+    """Validates a metrics add request prior to compilation of schemas & single parse of body.
+
+    """
+    json.loads(handler.request.body)
+    body = json.loads(handler.request.body)
+    Schema({
+        Required('group'): All(unicode, rv_metrics._GroupName(False)),
+        Required('columns'): All(rv.Sequence(unicode, 0)),
+        Required('metrics'): All(rv.Sequence(list, 0))
+        })(body)
+    rv_metrics._Metrics()(body)
+
+
+def _validate_metrics_add(handler):
+    """Validates a metrics add request.
+
+    """
+    http_validator.validate_request(handler)
+    rv_metrics.validate_add(handler)
+
+
+# Map of benchmarked validators to request factories.
+_VALIDATORS = (
+    ('fetch_timeslice', _validate_timeslice_legacy, http_validator.validate_request,
+     lambda: _Request(_EP_TIMESLICE, {'timeslice': ['1M']})),
+    ('metrics_add', _validate_metrics_add_legacy, _validate_metrics_add,
+     lambda: _Request(_EP_METRICS_ADD, body=_METRICS_ADD_BODY))
+    )
+
+
+def _get_cost(validator, request_factory):
+    """Returns per request cost (in micro-seconds) of validating a request.
+
+    """
+    elapsed = min(timeit.repeat(lambda: validator(_Handler(request_factory())), number=_REQUESTS, repeat=3))
+
+    return elapsed * 1e6 / _REQUESTS
+
+
+def _main():
+    """Main entry point.
+
+    """
+    schemas.init([_EP_TIMESLICE, _EP_METRICS_ADD])
+    for name, legacy, validator, request_factory in _VALIDATORS:
+        logger.log_web("{} :: legacy :: {:.1f}us".format(name, _get_cost(legacy, request_factory)))
+        logger.log_web("{} :: compiled :: {:.1f}us".format(name, _get_cost(validator, request_factory)))
+
+
+if __name__ == '__main__':
+    _main()
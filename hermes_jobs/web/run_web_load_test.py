@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: run_web_load_test.py
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL/CeCIL
+   :platform: Unix
+   :synopsis: Measures web service throughput as the number of web worker processes increases.
+
+.. moduleauthor:: Mark Conway-Greenslade <momipsl@ipsl.jussieu.fr>
+
+
+"""
+import argparse
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import requests
+
+from hermes.utils import config
+from hermes.utils import logger
+
+
+
+# Define command line arguments.
+_parser = argparse.ArgumentParser("Measures web service throughput per number of web worker processes.")
+_parser.add_argument(
+    "-processes", "--processes",
+    help="Comma delimited numbers of web worker processes to be measured",
+    dest="processes",
+    type=str,
+    default="1,2,4"
+    )
+_parser.add_argument(
+    "-clients", "--clients",
+    help="Number of concurrent client processes",
+    dest="clients",
+    type=int,
+    default=multiprocessing.cpu_count() * 2
+    )
+_parser.add_argument(
+    "-duration", "--duration",
+    help="Duration (in seconds) of each measurement",
+    dest="duration",
+    type=int,
+    default=20
+    )
+_parser.add_argument(
+    "-path", "--path",
+    help="Path of endpoint under load",
+    dest="path",
+    type=str,
+    default="/api"
+    )
+
+# Path to web service launcher.
+_WEB_SERVICE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "run_web_service.py")
+
+# Maximum time (in seconds) to wait for web service readiness.
+_STARTUP_TIMEOUT = 60
+
+
+def _get_url(path):
+    """Returns url of endpoint under load.
+
+    """
+    return "http://localhost:{}{}".format(config.web.port, path)
+
+
+def _start_web_service(processes, url):
+    """Launches web service & waits until it responds.
+
+    """
+    process = subprocess.Popen([sys.executable, _WEB_SERVICE, "--processes", str(processes)],
+                               preexec_fn=os.setsid)
+    started = time.time()
+    while time.time() - started < _STARTUP_TIMEOUT:
+        try:
+            requests.get(url, timeout=1)
+        except requests.exceptions.RequestException:
+            time.sleep(0.5)
+        else:
+            return process
+
+    _stop_web_service(process)
+    raise RuntimeError("Web service failed to start :: processes = {}".format(processes))
+
+
+def _stop_web_service(process):
+    """Stops web service & its worker processes.
+
+    """
+    os.killpg(process.pid, signal.SIGTERM)
+    process.wait()
+
+
+def _load(args):
+    """Issues requests for a fixed duration & returns (requests, errors) counts (executed within client processes).
+
+    """
+    url, duration = args
+    session = requests.Session()
+    count = errors = 0
+    ends = time.time() + duration
+    while time.time() < ends:
+        try:
+            if session.get(url, timeout=10).status_code != 200:
+                errors += 1
+        except requests.exceptions.RequestException:
+            errors += 1
+        count += 1
+
+    return count, errors
+
+
+def _measure(processes, args):
+    """Returns throughput (requests per second) of web service running a number of worker processes.
+
+    """
+    url = _get_url(args.path)
+    process = _start_web_service(processes, url)
+    try:
+        pool = multiprocessing.Pool(args.clients)
+        try:
+            results = pool.map(_load, [(url, args.duration)] * args.clients)
+        finally:
+            pool.close()
+            pool.join()
+    finally:
+        _stop_web_service(process)
+
+    count = sum(i[0] for i in results)
+    errors = sum(i[1] for i in results)
+    if errors:
+        logger.log_web_warning("Web load test :: processes = {} :: errors = {}".format(processes, errors))
+
+    return float(count - errors) / args.duration
+
+
+def _main(args):
+    """Main entry point.
+
+    """
+    baseline = None
+    for processes in [int(i) for i in args.processes.split(",")]:
+        throughput = _measure(processes, args)
+        baseline = baseline or throughput / processes
+        logger.log_web("Web load test :: processes = {} :: requests/s = {:.1f} :: speedup = {:.2f} :: efficiency = {:.0%}".format(
+            processes,
+            throughput,
+            throughput / baseline,
+            throughput / (baseline * processes)
+            ))
+
+
+# Main entry point.
+if __name__ == '__main__':
+    _main(_parser.parse_args())
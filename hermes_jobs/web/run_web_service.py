@@ -1,14 +1,27 @@
+import argparse
+
 import hermes
 
 
 
-def main():
+# Define command line arguments.
+_parser = argparse.ArgumentParser("Runs web service.")
+_parser.add_argument(
+	"-processes", "--processes",
+	help="Number of web worker processes (0 = one per cpu)",
+	dest="processes",
+	type=int,
+	default=None
+	)
+
+
+def main(args):
 	"""Main entry point.
 
 	"""
-	hermes.web.run()
+	hermes.web.run(args.processes)
 
 
 
 if __name__ == '__main__':
-    main()
+    main(_parser.parse_args())
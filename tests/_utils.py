@@ -414,4 +414,34 @@ def is_api_up():
     except requests.ConnectionError:
         return False
     else:
-        return True
\ No newline at end of file
+        return True
+
+
+class MockRequest(object):
+    """A mock web request.
+
+    """
+    def __init__(self, path=u"/", headers=None, query_arguments=None, body=''):
+        self.path = path
+        self.headers = headers or {}
+        self.query_arguments = query_arguments or {}
+        self.body = body
+
+
+class MockRequestHandler(object):
+    """A mock web request handler, i.e. a request plus the response headers set upon it.
+
+    """
+    def __init__(self, path=u"/", headers=None, query_arguments=None, body=''):
+        self.request = MockRequest(path, headers, query_arguments, body)
+        self.headers = {}
+
+
+    def set_header(self, name, value):
+        """Sets a response header."""
+        self.headers[name] = value
+
+
+    def check_etag_header(self):
+        """Returns flag indicating whether the request's If-None-Match header matches the response's ETag."""
+        return self.request.headers.get('If-None-Match') == self.headers.get('Etag')
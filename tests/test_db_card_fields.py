@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_db_card_fields.py
+
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL / CeCILL
+   :platform: Unix
+   :synopsis: Encapsulates configuration card field backfill tests.
+
+.. moduleauthor:: IPSL (ES-DOC) <dev@esdocumentation.org>
+
+"""
+import base64
+import uuid
+
+from . import _utils as tu
+from hermes.db import pgres as db
+from hermes.db.pgres import dao_monitoring as dao
+from hermes_jobs.db import run_update_monitoring_fields as backfill
+
+
+
+def test_card_fields_backfill():
+	uid = unicode(uuid.uuid4())
+	long_name = u"Backfill test {}".format(uid)
+	card = unicode(base64.b64encode("[UserChoices]\nLongName={}\n".format(long_name)))
+	with db.session.create(commitable=True):
+		try:
+			simulation = db.types.Simulation()
+			simulation.uid = uid
+			db.session.insert(simulation)
+			dao.persist_simulation_configuration(uid, card)
+
+			batch = backfill._get_batch(simulation.id - 1, 1)
+			tu.assert_integer(len(batch), 1)
+			tu.assert_integer(batch[0][0], simulation.id)
+
+			fields = backfill._parse(batch[0])
+			tu.assert_integer(fields['id'], simulation.id)
+			tu.assert_string(fields['long_name'], long_name)
+
+			dao.update_simulations_card_fields([fields])
+			db.session.commit()
+			tu.assert_string(dao.retrieve_simulation(uid).long_name, long_name)
+		finally:
+			dao.purge_simulations([uid])
+			db.session.commit()
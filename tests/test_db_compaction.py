@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_db_compaction.py
+
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL / CeCILL
+   :platform: Unix
+   :synopsis: Encapsulates job period range compaction tests.
+
+.. moduleauthor:: IPSL (ES-DOC) <dev@esdocumentation.org>
+
+"""
+import uuid
+
+from . import _utils as tu
+from hermes.db import pgres as db
+from hermes.db.pgres import compaction
+from hermes.db.pgres import dao_monitoring as dao
+
+
+
+# Job period reports: job, period id, day of period begin date.
+_REPORTS = (
+	(0, 1, 1),
+	(0, 2, 1),
+	(0, 3, 1),
+	(0, 3, 2),
+	(0, 5, 1),
+	(1, 5, 1),
+	(1, 6, 1),
+	(2, 6, 1),
+	# ... re-report of the first period of a range extending past it.
+	(1, 5, 2)
+	)
+
+
+def _persist_reports(simulation_uid, job_uids):
+	for job, period_id, day in _REPORTS:
+		dao.persist_job_period(simulation_uid, job_uids[job], period_id,
+		                       18500100 + period_id * 10000 + day, 18501231 + period_id * 10000)
+
+
+def _get_ranges(simulation_uid):
+	r = db.types.JobPeriodRange
+	ranges = db.dao.get_by_facet(r, qfilter=r.simulation_uid == simulation_uid, get_iterable=True)
+
+	return sorted((
+		i.job_uid,
+		i.period_id_first,
+		i.period_id_last,
+		i.period_date_begin,
+		i.period_date_end,
+		i.period_count,
+		i.last_period_count,
+		i.last_period_date_begin,
+		i.last_job_period_id
+		) for i in ranges)
+
+
+def _assert_ranges(simulation_uid, job_uids):
+	tu.assert_integer(len(db.dao.get_by_facet(db.types.JobPeriodRange,
+	                                          qfilter=db.types.JobPeriodRange.simulation_uid == simulation_uid,
+	                                          get_iterable=True)), 4)
+	assert dao.retrieve_latest_job_period_counter(simulation_uid) == (6, 2)
+
+	period = dao.retrieve_latest_job_period(simulation_uid)
+	tu.assert_integer(period.period_id, 6)
+	tu.assert_string(period.job_uid, job_uids[2])
+
+
+def test_compaction_ingest():
+	simulation_uid = unicode(uuid.uuid4())
+	job_uids = [unicode(uuid.uuid4()) for _ in range(3)]
+	with db.session.create(commitable=True):
+		try:
+			_persist_reports(simulation_uid, job_uids)
+			_assert_ranges(simulation_uid, job_uids)
+		finally:
+			dao.purge_simulations([simulation_uid])
+			db.session.commit()
+
+
+def test_compaction_rebuild():
+	simulation_uid = unicode(uuid.uuid4())
+	job_uids = [unicode(uuid.uuid4()) for _ in range(3)]
+	with db.session.create(commitable=True):
+		try:
+			_persist_reports(simulation_uid, job_uids)
+			ingested = _get_ranges(simulation_uid)
+			tu.assert_integer(compaction.compact([simulation_uid]), 4)
+			assert _get_ranges(simulation_uid) == ingested
+			_assert_ranges(simulation_uid, job_uids)
+		finally:
+			dao.purge_simulations([simulation_uid])
+			db.session.commit()
+
+
+def _is_compactable(simulation):
+	return [i[0] for i in compaction.get_simulations(simulation.id - 1, 1)] == [simulation.id]
+
+
+def test_compaction_of_history_preceding_ranges():
+	simulation_uid = unicode(uuid.uuid4())
+	job_uid = unicode(uuid.uuid4())
+	with db.session.create(commitable=True):
+		try:
+			simulation = db.types.Simulation()
+			simulation.uid = simulation_uid
+			db.session.insert(simulation)
+
+			# ... history ingested before ranges were introduced.
+			for period_id in (1, 2):
+				dao.persist_job_period(simulation_uid, job_uid, period_id, 18500101, 18501231)
+			r = db.types.JobPeriodRange
+			db.session.query(r).filter(r.simulation_uid == simulation_uid).delete(synchronize_session=False)
+			db.session.commit()
+
+			dao.persist_job_period(simulation_uid, job_uid, 3, 18500101, 18501231)
+			assert _is_compactable(simulation)
+
+			compaction.compact([simulation_uid])
+			db.session.commit()
+			assert not _is_compactable(simulation)
+		finally:
+			dao.purge_simulations([simulation_uid])
+			db.session.commit()
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_db_configuration_card.py
+
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL / CeCILL
+   :platform: Unix
+   :synopsis: Encapsulates configuration card deduplication tests.
+
+.. moduleauthor:: IPSL (ES-DOC) <dev@esdocumentation.org>
+
+"""
+import base64
+import uuid
+
+from . import _utils as tu
+from hermes.db import pgres as db
+from hermes.db.pgres import dao_monitoring as dao
+from hermes.db.pgres import dao_monitoring_fastpath as dao_fastpath
+
+
+
+def test_configuration_card_dedup():
+	card = unicode(base64.b64encode("[UserChoices]\nJobName={}\n".format(uuid.uuid4())))
+	uids = [unicode(uuid.uuid4()) for _ in range(2)]
+	with db.session.create(commitable=True):
+		try:
+			for uid in uids:
+				dao.persist_simulation_configuration(uid, card)
+			configurations = [dao.retrieve_simulation_configuration(uid) for uid in uids]
+
+			tu.assert_integer(configurations[0].card_id, configurations[1].card_id)
+			for uid, configuration in zip(uids, configurations):
+				tu.assert_string(configuration.card, card)
+				tu.assert_string(dao_fastpath.retrieve_simulation_configuration_card(uid), card)
+		finally:
+			counts = dao.purge_simulations(uids)
+			db.session.commit()
+
+	assert counts[db.types.ConfigurationCard.__tablename__] >= 1
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_db_entity_uid.py
+
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL / CeCILL
+   :platform: Unix
+   :synopsis: Encapsulates native uid column type tests.
+
+.. moduleauthor:: IPSL (ES-DOC) <dev@esdocumentation.org>
+
+"""
+import hashlib
+import uuid
+
+from . import _utils as tu
+from hermes.db.pgres.entity import Uid
+
+
+
+def test_uid_bind():
+	value = uuid.uuid4()
+
+	tu.assert_string(Uid().process_bind_param(unicode(value).upper(), None), unicode(value))
+	tu.assert_string(Uid().process_bind_param(value, None), unicode(value))
+	tu.assert_none(Uid().process_bind_param(None, None))
+
+
+def test_uid_result():
+	value = uuid.uuid4()
+
+	tu.assert_string(Uid().process_result_value(unicode(value), None), unicode(value))
+	tu.assert_string(Uid().process_result_value(value, None), unicode(value))
+	tu.assert_none(Uid().process_result_value(None, None))
+
+
+def test_uid_hexadecimal():
+	value = unicode(hashlib.md5("test").hexdigest())
+	bound = Uid(hexadecimal=True).process_bind_param(value, None)
+
+	tu.assert_string(bound, unicode(uuid.UUID(value)))
+	tu.assert_string(Uid(hexadecimal=True).process_result_value(bound, None), value)
+
+
+def test_uid_invalid():
+	try:
+		Uid().process_bind_param(u"not-a-uid", None)
+	except ValueError:
+		pass
+	else:
+		raise AssertionError("Invalid uid was bound")
+
+
+def test_uid_python_type():
+	assert Uid().python_type is uuid.UUID
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_db_instrumentation.py
+
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL / CeCILL
+   :platform: Unix
+   :synopsis: Encapsulates db statement timing tests.
+
+.. moduleauthor:: IPSL (ES-DOC) <dev@esdocumentation.org>
+
+"""
+from . import _utils as tu
+from hermes.db.pgres import instrumentation
+
+
+
+def test_fingerprint_literals():
+	fingerprint = instrumentation.get_fingerprint("SELECT * FROM tbl_job WHERE id = 12 AND typeof = 'computing'")
+
+	tu.assert_string(fingerprint, "SELECT * FROM tbl_job WHERE id = ? AND typeof = ?")
+
+
+def test_fingerprint_parameters():
+	fingerprint = instrumentation.get_fingerprint("SELECT *\n  FROM tbl_job\n WHERE job_uid = %(job_uid_1)s")
+
+	tu.assert_string(fingerprint, "SELECT * FROM tbl_job WHERE job_uid = ?")
+
+
+def test_fingerprint_in_list():
+	fingerprint = instrumentation.get_fingerprint("DELETE FROM tbl_job WHERE id IN (1, 2, 3)")
+
+	tu.assert_string(fingerprint, "DELETE FROM tbl_job WHERE id IN (...)")
+
+
+def test_fingerprint_identifiers():
+	fingerprint = instrumentation.get_fingerprint("SELECT q.c0 FROM tbl_job_period_y2016m01 AS q")
+
+	tu.assert_string(fingerprint, "SELECT q.c0 FROM tbl_job_period_y2016m01 AS q")
+
+
+def test_record():
+	instrumentation.log_summary()
+	instrumentation.record("SELECT 1", 2.0)
+	instrumentation.record("SELECT 2", 4.0)
+	timings = instrumentation.get_timings()
+
+	tu.assert_integer(len(timings), 1)
+	assert timings["SELECT ?"] == (2, 6.0, 4.0)
+
+	instrumentation.log_summary()
+	tu.assert_integer(len(instrumentation.get_timings()), 0)
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_db_monitoring_json.py
+
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL / CeCILL
+   :platform: Unix
+   :synopsis: Encapsulates db assembled json parity tests (against ORM dao + data_convertor output).
+
+.. moduleauthor:: IPSL (ES-DOC) <dev@esdocumentation.org>
+
+"""
+import datetime
+import json
+import uuid
+
+import arrow
+
+from . import _utils as tu
+from hermes.db import pgres as db
+from hermes.db.pgres import change_tracking
+from hermes.db.pgres import dao_monitoring
+from hermes.db.pgres import dao_monitoring_fastpath as dao
+from hermes.db.pgres import dao_mq
+from hermes.utils import data_convertor
+from hermes.utils.string_convertor import to_camel_case
+from hermes.web.utils import http_stream
+
+
+
+# Number of simulations whose detail is compared.
+_DETAIL_SAMPLE_SIZE = 10
+
+
+def _normalise(data):
+	"""Returns a json document parsed with unordered arrays sorted.
+
+	"""
+	data = json.loads(data)
+	for key, value in data.items():
+		if isinstance(value, list):
+			data[key] = sorted(value)
+
+	return data
+
+
+def _assert_timeslice(start_date):
+	with db.session.create():
+		expected = json.dumps(data_convertor.convert({
+			'job_counts': dao_monitoring.retrieve_active_job_counts(start_date),
+			'job_period_list': dao_monitoring.retrieve_latest_active_job_periods(start_date),
+			'simulation_list': dao_monitoring.retrieve_active_simulations(start_date),
+			'latest_compute_jobs': dao_monitoring.retrieve_latest_active_jobs(start_date)
+			}, to_camel_case))
+		actual = _normalise(dao.retrieve_timeslice_json(start_date))
+
+	assert isinstance(actual.pop('cursor'), (int, long))
+	assert actual == _normalise(expected)
+
+
+def _assert_detail(uid):
+	with db.session.create():
+		simulation = dao_monitoring.retrieve_simulation(uid)
+		configuration = dao_monitoring.retrieve_simulation_configuration(uid)
+		if simulation.try_id == 1:
+			previous_tries = []
+		else:
+			previous_tries = dao_monitoring.retrieve_simulation_previous_tries(simulation.hashid, simulation.try_id)
+		expected = json.dumps(data_convertor.convert({
+			'config_card': configuration.card if configuration else None,
+			'has_messages': dao_mq.has_messages(uid),
+			'job_list': dao_monitoring.retrieve_simulation_jobs(uid),
+			'latest_job_period': dao_monitoring.retrieve_latest_job_period(uid),
+			'previous_tries': previous_tries,
+			'simulation': simulation
+			}, to_camel_case))
+		actual = dao.retrieve_simulation_detail_json(uid)
+
+	assert _normalise(actual) == _normalise(expected)
+
+
+def test_db_monitoring_json_timeslice_all():
+	_assert_timeslice(None)
+
+
+def test_db_monitoring_json_timeslice_1m():
+	_assert_timeslice((arrow.utcnow() - datetime.timedelta(days=31)).datetime)
+
+
+def test_db_monitoring_json_timeslice_delta():
+	with db.session.create():
+		timeslice = _normalise(dao.retrieve_timeslice_json())
+		delta = _normalise(dao.retrieve_timeslice_delta_json(0))
+		unchanged = _normalise(dao.retrieve_timeslice_delta_json(timeslice['cursor']))
+
+	assert delta['cursor'] >= timeslice['cursor']
+	assert all(i in timeslice['simulationList'] for i in delta['simulationList'])
+	active = {i[9] for i in timeslice['simulationList']}
+	assert not active.intersection(delta['removedSimulationList'])
+	assert unchanged['simulationList'] == []
+
+
+def _get_delta(since):
+	delta = _normalise(dao.retrieve_timeslice_delta_json(since))
+
+	return delta, {i[9] for i in delta['simulationList']}
+
+
+def test_db_monitoring_json_timeslice_delta_changes():
+	simulation_uid = unicode(uuid.uuid4())
+	with db.session.create(commitable=True):
+		cursor = change_tracking.get_cursor()
+		try:
+			# Insert: a new active simulation.
+			simulation = db.types.Simulation()
+			simulation.uid = simulation_uid
+			simulation.name = u"test-timeslice-delta"
+			simulation.execution_start_date = tu.get_datetime()
+			db.session.insert(simulation)
+			simulation_id = simulation.id
+			delta, changed = _get_delta(cursor)
+			assert simulation_id in changed
+			assert simulation_id not in delta['removedSimulationList']
+
+			# Update: a job period of the simulation.
+			cursor = delta['cursor']
+			dao_monitoring.persist_job_period(simulation_uid, unicode(uuid.uuid4()), 1, 18500101, 18501231)
+			delta, changed = _get_delta(cursor)
+			assert simulation_id in changed
+		finally:
+			dao_monitoring.purge_simulations([simulation_uid])
+			db.session.commit()
+
+	# Delete: the simulation is tombstoned.
+	with db.session.create():
+		delta, changed = _get_delta(cursor)
+	assert simulation_id not in changed
+	assert simulation_id in delta['removedSimulationList']
+
+
+def test_db_monitoring_json_timeslice_streamed():
+	with db.session.create():
+		expected = _normalise(dao.retrieve_timeslice_json())
+		actual = _normalise("".join(http_stream.iter_json(dao.stream_timeslice())))
+
+	assert actual.pop('cursor') >= expected.pop('cursor')
+	assert actual == expected
+
+
+def test_db_monitoring_json_messages_streamed():
+	with db.session.create():
+		uids = [i.uid for i in db.dao.get_random_sample(db.types.Simulation)[:_DETAIL_SAMPLE_SIZE]]
+	for uid in uids:
+		with db.session.create():
+			simulation = dao_monitoring.retrieve_simulation(uid)
+			expected = json.dumps(data_convertor.convert({
+				'message_history': dao_mq.retrieve_messages(uid),
+				'simulation': simulation
+				}, to_camel_case))
+			actual = "".join(http_stream.iter_json([
+				('message_history', dao_mq.stream_messages(uid)),
+				('simulation', simulation)
+				]))
+
+		assert _normalise(actual) == _normalise(expected)
+
+
+def test_db_monitoring_json_detail():
+	with db.session.create():
+		uids = [i.uid for i in db.dao.get_random_sample(db.types.Simulation)[:_DETAIL_SAMPLE_SIZE]]
+	for uid in uids:
+		_assert_detail(uid)
+
+
+def test_db_monitoring_json_detail_not_found():
+	with db.session.create():
+		assert dao.retrieve_simulation_detail_json(unicode(uuid.uuid4())) is None
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_db_partitioning.py
+
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL / CeCILL
+   :platform: Unix
+   :synopsis: Encapsulates job period partition archival tests.
+
+.. moduleauthor:: IPSL (ES-DOC) <dev@esdocumentation.org>
+
+"""
+import datetime
+import shutil
+import tempfile
+import uuid
+
+import nose
+
+from . import _utils as tu
+from hermes.db import pgres as db
+from hermes.db.pgres import fastpath
+from hermes.db.pgres import partitioning
+
+
+
+# Partitioned table under test.
+_TABLE = db.types.JobPeriod.__table__
+
+# Month of partition under test, i.e. one that never receives rows.
+_MONTH = datetime.datetime(1900, 1, 1)
+
+# Month of partition created after rows landed in default partition.
+_MONTH_LATE = datetime.datetime(1900, 2, 1)
+
+
+def _get_count(name):
+	return fastpath.execute_one("SELECT count(*) FROM {}.{}".format(_TABLE.schema, name))[0]
+
+
+def _persist_job_period(month=_MONTH):
+	instance = db.types.JobPeriod()
+	instance.simulation_uid = unicode(uuid.uuid4())
+	instance.job_uid = unicode(uuid.uuid4())
+	instance.period_id = 1
+	instance.period_date_begin = 18500101
+	instance.period_date_end = 18501231
+	instance.row_create_date = month
+	db.session.insert(instance)
+
+
+def test_archive_restore_partition():
+	directory = tempfile.mkdtemp()
+	with db.session.create(commitable=True):
+		if not partitioning.is_partitioned(_TABLE):
+			raise nose.SkipTest("{} is not partitioned".format(_TABLE.name))
+		name = partitioning.create_partition(_TABLE, _MONTH)
+		try:
+			db.session.commit()
+			_persist_job_period()
+
+			partitioning.archive_partition(_TABLE, name, directory)
+			assert name not in partitioning.get_partitions(_TABLE)
+
+			partitioning.restore_partition(_TABLE, name, directory)
+			assert name in partitioning.get_partitions(_TABLE)
+			tu.assert_integer(_get_count(name), 1)
+		finally:
+			fastpath.execute_command("DROP TABLE IF EXISTS {}.{}".format(_TABLE.schema, name))
+			shutil.rmtree(directory)
+
+
+def test_create_partition_moves_default_rows():
+	name = partitioning.get_partition_name(_TABLE, _MONTH_LATE)
+	with db.session.create(commitable=True):
+		if not partitioning.is_partitioned(_TABLE):
+			raise nose.SkipTest("{} is not partitioned".format(_TABLE.name))
+		try:
+			_persist_job_period(_MONTH_LATE)
+			count = _get_count("{}_default".format(_TABLE.name))
+
+			tu.assert_string(partitioning.create_partition(_TABLE, _MONTH_LATE), name)
+			db.session.commit()
+			assert name in partitioning.get_partitions(_TABLE)
+			tu.assert_integer(_get_count(name), 1)
+			tu.assert_integer(_get_count("{}_default".format(_TABLE.name)), count - 1)
+		finally:
+			fastpath.execute_command("DROP TABLE IF EXISTS {}.{}".format(_TABLE.schema, name))
+			fastpath.execute_command("DELETE FROM {}.{}_default WHERE row_create_date = %(month)s".format(
+				_TABLE.schema, _TABLE.name), {'month': _MONTH_LATE})
+			db.session.commit()
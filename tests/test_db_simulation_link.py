@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_db_simulation_link.py
+
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL / CeCILL
+   :platform: Unix
+   :synopsis: Encapsulates simulation surrogate key linkage tests.
+
+.. moduleauthor:: IPSL (ES-DOC) <dev@esdocumentation.org>
+
+"""
+import datetime
+import uuid
+
+from . import _utils as tu
+from hermes.db import pgres as db
+from hermes.db.pgres import dao_monitoring as dao
+
+
+
+def _get_job_period_simulation_ids(simulation_uid):
+	jp = db.types.JobPeriod
+
+	return [i.simulation_id for i in db.dao.get_by_facet(jp, qfilter=jp.simulation_uid == simulation_uid, get_iterable=True)]
+
+
+def test_link_job_periods_upon_job_end():
+	simulation_uid = unicode(uuid.uuid4())
+	job_uid = unicode(uuid.uuid4())
+	with db.session.create(commitable=True):
+		try:
+			dao.persist_job_period(simulation_uid, job_uid, 1, 18500101, 18501231)
+
+			# ... simulation persisted concurrently, i.e. without linking the period.
+			simulation = db.types.Simulation()
+			simulation.uid = simulation_uid
+			db.session.insert(simulation)
+			assert _get_job_period_simulation_ids(simulation_uid) == [None]
+
+			dao.persist_job_end(datetime.datetime.now(), False, False, job_uid, simulation_uid)
+			assert _get_job_period_simulation_ids(simulation_uid) == [simulation.id]
+		finally:
+			dao.purge_simulations([simulation_uid])
+			db.session.commit()
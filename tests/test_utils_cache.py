@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_utils_cache.py
+
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL / CeCILL
+   :platform: Unix
+   :synopsis: Encapsulates in-process cache tests.
+
+.. moduleauthor:: IPSL (ES-DOC) <dev@esdocumentation.org>
+
+"""
+import time
+
+from . import _utils as tu
+from hermes.utils.cache import TimedCache
+
+
+
+def test_cache_get_miss():
+	c = TimedCache(60, 10)
+
+	tu.assert_none(c.get('a'))
+	tu.assert_integer(c.get_stats()['misses'], 1)
+
+
+def test_cache_get_hit():
+	c = TimedCache(60, 10)
+	c.set('a', 1)
+
+	tu.assert_integer(c.get('a'), 1)
+	tu.assert_integer(c.get_stats()['hits'], 1)
+	assert c.get_stats()['hit_rate'] == 1.0
+
+
+def test_cache_expiry():
+	c = TimedCache(0.01, 10)
+	c.set('a', 1)
+	time.sleep(0.02)
+
+	tu.assert_none(c.get('a'))
+	tu.assert_integer(len(c), 0)
+
+
+def test_cache_size_bound():
+	c = TimedCache(60, 2)
+	c.set('a', 1)
+	c.set('b', 2)
+	c.get('a')
+	c.set('c', 3)
+
+	tu.assert_integer(len(c), 2)
+	tu.assert_integer(c.get('a'), 1)
+	tu.assert_none(c.get('b'))
+	tu.assert_integer(c.get_stats()['evictions'], 1)
+
+
+def test_cache_invalidate():
+	c = TimedCache(60, 10)
+	c.set('a', 1)
+	c.invalidate('a')
+
+	tu.assert_none(c.get('a'))
+	tu.assert_integer(c.get_stats()['invalidations'], 1)
+
+
+def test_cache_invalidate_where():
+	c = TimedCache(60, 10)
+	for k, v in (('a', 1), ('b', 2), ('c', 3)):
+		c.set(k, v)
+	c.invalidate_where(lambda k, v: v >= 2)
+
+	tu.assert_integer(len(c), 1)
+	tu.assert_integer(c.get('a'), 1)
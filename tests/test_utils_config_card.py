@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_utils_config_card.py
+
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL / CeCILL
+   :platform: Unix
+   :synopsis: Encapsulates configuration card parsing tests.
+
+.. moduleauthor:: IPSL (ES-DOC) <dev@esdocumentation.org>
+
+"""
+import base64
+import datetime
+
+from . import _utils as tu
+from hermes.utils import config_card
+
+
+
+# Test configuration card.
+_CARD = """
+[UserChoices]
+JobName=v6.rc0
+LongName="pre-industrial control"    # CMIP6 run
+TagName=IPSLCM6
+ExpType=IPSLCM6/DEVT/piControl
+PeriodLength=1Y
+
+[Restarts]
+OverRule=y
+RestartDate=1849-12-31
+RestartJobName=v6.rc0-spinup
+"""
+
+
+def test_parse():
+	fields = config_card.parse(base64.b64encode(_CARD))
+
+	tu.assert_string(fields['exp_type'], u"IPSLCM6/DEVT/piControl")
+	tu.assert_string(fields['long_name'], u"pre-industrial control")
+	tu.assert_string(fields['period_length'], u"1Y")
+	tu.assert_string(fields['tag_name'], u"IPSLCM6")
+	tu.assert_string(fields['parent_simulation_name'], u"v6.rc0-spinup")
+	assert fields['parent_simulation_branch_date'] == datetime.datetime(1849, 12, 31)
+
+
+def test_parse_restarts_not_overruled():
+	fields = config_card.parse(base64.b64encode(_CARD.replace("OverRule=y", "OverRule=n")))
+
+	assert 'parent_simulation_name' not in fields
+	assert 'parent_simulation_branch_date' not in fields
+
+
+def test_parse_plain_text():
+	fields = config_card.parse(_CARD, u"text/plain")
+
+	tu.assert_string(fields['tag_name'], u"IPSLCM6")
+
+
+def test_parse_received():
+	for card in (base64.encodestring(_CARD), unicode(_CARD)):
+		content, _ = config_card.get_content(card)
+		fields = config_card.parse(content, u"text/plain")
+		tu.assert_string(fields['tag_name'], u"IPSLCM6")
+
+
+def test_parse_over_long_value():
+	fields = config_card.parse(_CARD.replace("PeriodLength=1Y", "PeriodLength={}".format("1Y" * 8)), u"text/plain")
+
+	assert 'period_length' not in fields
+	tu.assert_string(fields['tag_name'], u"IPSLCM6")
+
+
+def test_parse_invalid():
+	assert config_card.parse(None) == {}
+	assert config_card.parse(u"not a card !") == {}
+	assert config_card.parse(base64.b64encode("not a card")) == {}
+
+
+def test_get_content():
+	content, mime_type = config_card.get_content(base64.encodestring(_CARD))
+	assert content == _CARD
+	tu.assert_string(mime_type, u"application/base64")
+
+	content, mime_type = config_card.get_content(unicode(_CARD))
+	assert content == _CARD
+	tu.assert_string(mime_type, u"text/plain")
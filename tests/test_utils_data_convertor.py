@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_utils_data_convertor.py
+
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL / CeCILL
+   :platform: Unix
+   :synopsis: Encapsulates data conversion tests.
+
+.. moduleauthor:: IPSL (ES-DOC) <dev@esdocumentation.org>
+
+"""
+import json
+
+import sqlalchemy as sa
+
+from . import _utils as tu
+from hermes.db.pgres import types
+from hermes.utils import data_convertor
+from hermes.utils.string_convertor import to_camel_case
+
+
+
+def _get_job():
+	job = types.Job()
+	job.id = tu.get_int()
+	job.accounting_project = tu.get_unicode()
+	job.execution_state = u'r'
+	job.execution_start_date = tu.get_datetime()
+	job.is_error = False
+	job.job_uid = tu.get_uuid()
+	job.simulation_id = tu.get_int()
+	job.simulation_uid = tu.get_unicode()
+	job.row_create_date = tu.get_datetime()
+
+	return job
+
+
+def _convert_generic(data):
+	"""Converts a mapped instance by walking its mapper columns.
+
+	"""
+	return data_convertor.convert({c.name: getattr(data, c.name)
+								   for c in sa.inspect(data).mapper.columns}, to_camel_case)
+
+
+def test_convert_entity():
+	job = _get_job()
+	data = data_convertor.convert(job, to_camel_case)
+
+	tu.assert_integer(data['simulationID'], job.simulation_id)
+	tu.assert_string(data['jobUID'], unicode(job.job_uid))
+	tu.assert_string(data['executionStartDate'], u"{}Z".format(job.execution_start_date.isoformat()))
+	tu.assert_none(data['executionEndDate'])
+
+
+def test_convert_entity_json():
+	jobs = [_get_job() for _ in range(10)]
+
+	assert json.dumps(data_convertor.convert({'job_list': jobs}, to_camel_case)) == \
+		   json.dumps({'jobList': [_convert_generic(i) for i in jobs]})
+	assert data_convertor.convert(jobs[0]) == \
+		   {c.name: data_convertor.convert(getattr(jobs[0], c.name))
+		    for c in sa.inspect(jobs[0]).mapper.columns}
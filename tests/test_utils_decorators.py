@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_utils_decorators.py
+
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL / CeCILL
+   :platform: Unix
+   :synopsis: Encapsulates function decorator tests.
+
+.. moduleauthor:: IPSL (ES-DOC) <dev@esdocumentation.org>
+
+"""
+import os
+
+from . import _utils as tu
+from hermes.utils import decorators
+
+
+
+@decorators.noop_validator
+def _validate_noop(value):
+	"""A validator that does nothing.
+
+	"""
+	pass
+
+
+def _validate_unflagged(value):
+	"""A validator that does nothing but is not flagged as such.
+
+	"""
+	pass
+
+
+def _validate_int(value):
+	if not isinstance(value, int):
+		raise TypeError(value)
+
+
+@decorators.validate(_validate_int)
+def _inner(value):
+	return value
+
+
+def _compile(mode):
+	"""Returns inner & outer validated functions decorated under a validation mode.
+
+	"""
+	initial_mode = decorators.get_validation_mode()
+	decorators.set_validation_mode(mode)
+	try:
+		@decorators.validate(_validate_int)
+		def inner(value):
+			return value
+
+		@decorators.validate(_validate_int)
+		def outer(value):
+			return inner(unicode(value))
+	finally:
+		decorators.set_validation_mode(initial_mode)
+
+	return inner, outer
+
+
+def _assert_raises(func, value):
+	try:
+		func(value)
+	except TypeError:
+		pass
+	else:
+		raise AssertionError("Validation was not performed")
+
+
+def test_validate_noop_compiled_away():
+	def func(value):
+		return value
+
+	assert decorators.validate(_validate_noop)(func) is func
+	assert decorators.validate(_validate_unflagged)(func) is not func
+
+
+def test_validate_preserves_name():
+	tu.assert_string(_inner.__name__, "_inner")
+
+
+def test_validate_mode_all():
+	inner, outer = _compile(decorators.VALIDATION_MODE_ALL)
+	tu.assert_integer(inner(1), 1)
+	_assert_raises(inner, "1")
+	_assert_raises(outer, 1)
+
+
+def test_validate_mode_external():
+	# N.B. an equal but distinct mode instance, e.g. as read from config.
+	inner, outer = _compile(unicode(decorators.VALIDATION_MODE_EXTERNAL))
+	_assert_raises(inner, "1")
+	_assert_raises(outer, "1")
+	tu.assert_string(outer(1), u"1")
+
+
+def test_validate_mode_none():
+	inner, outer = _compile(decorators.VALIDATION_MODE_NONE)
+	tu.assert_string(inner("1"), "1")
+	tu.assert_string(outer("1"), u"1")
+
+
+def test_validate_mode_compiled_once():
+	inner, _ = _compile(decorators.VALIDATION_MODE_ALL)
+	_, outer = _compile(decorators.VALIDATION_MODE_NONE)
+	_assert_raises(inner, "1")
+	tu.assert_string(outer("1"), u"1")
+
+
+def test_validate_mode_unsupported():
+	initial_mode = decorators.get_validation_mode()
+	try:
+		decorators.set_validation_mode("xxx")
+	except ValueError:
+		pass
+	else:
+		raise AssertionError("Unsupported validation mode was accepted")
+	tu.assert_string(decorators.get_validation_mode(), initial_mode)
+
+
+def test_validate_mode_configured_by_env_var():
+	initial_value = os.environ.get(decorators.VALIDATION_MODE_ENV_VAR)
+	os.environ[decorators.VALIDATION_MODE_ENV_VAR] = decorators.VALIDATION_MODE_NONE
+	try:
+		tu.assert_string(decorators._get_configured_mode(), decorators.VALIDATION_MODE_NONE)
+	finally:
+		if initial_value is None:
+			del os.environ[decorators.VALIDATION_MODE_ENV_VAR]
+		else:
+			os.environ[decorators.VALIDATION_MODE_ENV_VAR] = initial_value
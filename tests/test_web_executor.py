@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_web_executor.py
+
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL / CeCILL
+   :platform: Unix
+   :synopsis: Encapsulates web request executor tests.
+
+.. moduleauthor:: IPSL (ES-DOC) <dev@esdocumentation.org>
+
+"""
+import json
+import threading
+import time
+
+import tornado.gen
+import tornado.httpclient
+import tornado.httpserver
+import tornado.ioloop
+import tornado.testing
+import tornado.web
+import tornado.websocket
+
+from . import _utils as tu
+from hermes.web import schemas
+from hermes.web.utils import executor
+from hermes.web.utils.http import HermesHTTPRequestHandler
+from hermes.web.utils.http1 import process_request
+
+
+
+# Duration (in seconds) of simulated slow db query.
+_QUERY_DURATION = 1.0
+
+# Interval (in seconds) between websocket pings.
+_PING_INTERVAL = 0.05
+
+
+class _SlowQueryRequestHandler(tornado.web.RequestHandler):
+	executor_concurrency = 1
+
+	@tornado.gen.coroutine
+	def get(self):
+		@executor.blocking
+		def _set_data():
+			time.sleep(_QUERY_DURATION)
+			self.data = {'rows': 1}
+
+		def _set_output():
+			self.output = self.data
+
+		yield process_request(self, [_set_data, _set_output])
+
+
+class _SlowInvokeRequestHandler(HermesHTTPRequestHandler):
+	@tornado.gen.coroutine
+	def get(self):
+		@executor.blocking
+		def _set_output():
+			time.sleep(_QUERY_DURATION)
+			self.output = {'rows': 1}
+
+		yield self.invoke(lambda: None, [_set_output])
+
+
+class _ThreadsInvokeRequestHandler(HermesHTTPRequestHandler):
+	@tornado.gen.coroutine
+	def get(self):
+		@executor.blocking
+		def _set_output():
+			self.output = {'thread': threading.current_thread().name}
+
+		def _set_headers():
+			self.set_header("X-Thread", threading.current_thread().name)
+
+		yield self.invoke(lambda: None, [_set_output, _set_headers])
+
+
+class _PingWebSocketHandler(tornado.websocket.WebSocketHandler):
+	def open(self):
+		self.pinger = tornado.ioloop.PeriodicCallback(lambda: self.write_message("ping"), _PING_INTERVAL * 1000)
+		self.pinger.start()
+
+	def on_close(self):
+		self.pinger.stop()
+
+
+def _get_server():
+	endpoints = [
+		(r'/slow', _SlowQueryRequestHandler),
+		(r'/slow-invoke', _SlowInvokeRequestHandler),
+		(r'/threads-invoke', _ThreadsInvokeRequestHandler),
+		(r'/ws', _PingWebSocketHandler)
+		]
+	schemas.init([i[0] for i in endpoints])
+	app = tornado.web.Application(endpoints)
+	sock, port = tornado.testing.bind_unused_port()
+	server = tornado.httpserver.HTTPServer(app)
+	server.add_sockets([sock])
+
+	return server, port
+
+
+def test_blocking_tasks_are_chained():
+	tasks = [lambda: None, executor.blocking(lambda: None), executor.blocking(lambda: None), lambda: None]
+	chains = [(is_blocking, len(chain)) for is_blocking, chain in executor.get_chains(tasks)]
+
+	assert chains == [(False, 1), (True, 2), (False, 1)]
+
+
+def test_invoke_executes_only_blocking_tasks_off_io_loop():
+	io_loop = tornado.ioloop.IOLoop()
+	io_loop.make_current()
+	server, port = _get_server()
+	try:
+		response = io_loop.run_sync(lambda: tornado.httpclient.AsyncHTTPClient().fetch(
+			"http://127.0.0.1:{}/threads-invoke".format(port)))
+	finally:
+		server.stop()
+		io_loop.close(all_fds=True)
+
+	tu.assert_string(response.headers["X-Thread"], threading.current_thread().name)
+	assert json.loads(response.body)['thread'] != threading.current_thread().name
+
+
+def test_get_key():
+	handlers = [type('FetchRequestHandler', (object, ), {'__module__': i})() for i in ('cv', 'metrics_pcmdi')]
+
+	tu.assert_string(executor.get_key(handlers[0]), "cv.FetchRequestHandler")
+	tu.assert_string(executor.get_key(handlers[1]), "metrics_pcmdi.FetchRequestHandler")
+
+
+def _assert_pings_flow(path):
+	io_loop = tornado.ioloop.IOLoop()
+	io_loop.make_current()
+	server, port = _get_server()
+
+	@tornado.gen.coroutine
+	def _run():
+		ws = yield tornado.websocket.websocket_connect("ws://127.0.0.1:{}/ws".format(port))
+		started = time.time()
+		response = tornado.httpclient.AsyncHTTPClient().fetch("http://127.0.0.1:{}{}".format(port, path))
+		pings = 0
+		while not response.done():
+			message = yield ws.read_message()
+			if message == "ping" and time.time() - started < _QUERY_DURATION:
+				pings += 1
+		response = yield response
+		ws.close()
+		raise tornado.gen.Return((pings, response))
+
+	try:
+		pings, response = io_loop.run_sync(_run, timeout=_QUERY_DURATION * 10)
+	finally:
+		server.stop()
+		io_loop.close(all_fds=True)
+
+	tu.assert_integer(response.code, 200)
+	assert pings >= int(_QUERY_DURATION / _PING_INTERVAL) / 2
+
+
+def test_websocket_pings_flow_during_slow_query():
+	_assert_pings_flow("/slow")
+
+
+def test_websocket_pings_flow_during_slow_invoked_query():
+	_assert_pings_flow("/slow-invoke")
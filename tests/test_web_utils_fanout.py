@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_web_utils_fanout.py
+
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL / CeCILL
+   :platform: Unix
+   :synopsis: Encapsulates web worker fanout tests.
+
+.. moduleauthor:: IPSL (ES-DOC) <dev@esdocumentation.org>
+
+"""
+import json
+import os
+import socket
+
+import nose
+
+from . import _utils as tu
+from hermes.web.request_validation import validator_metrics_pcmdi
+from hermes.web.utils import fanout
+from hermes.web.utils import websockets
+
+
+
+# Test message.
+_TEST_MESSAGE = {
+	'key': 'test',
+	'payload': '{"simulationUid": "abc"}',
+	'filter_data': {'simulation_uid': 'abc'},
+	'client_filter': None
+	}
+
+
+class _MockWebSocket(object):
+	def __init__(self):
+		self.messages = []
+
+	def write_message(self, msg):
+		self.messages.append(msg)
+
+
+def _teardown():
+	fanout.close()
+	websockets.clear_cache()
+
+
+@nose.with_setup(None, _teardown)
+def test_publish_to_peers():
+	peer = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+	peer_path = fanout.get_path(99)
+	if os.path.exists(peer_path):
+		os.remove(peer_path)
+	peer.bind(peer_path)
+	try:
+		fanout.init(0)
+		fanout.publish('test', _TEST_MESSAGE)
+		assert json.loads(peer.recv(65536)) == {'channel': 'test', 'message': _TEST_MESSAGE}
+	finally:
+		peer.close()
+		os.remove(peer_path)
+
+
+@nose.with_setup(None, _teardown)
+def test_on_fanout_writes_to_clients():
+	ws = _MockWebSocket()
+	websockets.on_connect(_TEST_MESSAGE['key'], ws)
+
+	websockets.on_fanout(_TEST_MESSAGE)
+	tu.assert_integer(len(ws.messages), 1)
+	tu.assert_string(ws.messages[0], _TEST_MESSAGE['payload'])
+
+
+def test_on_fanout_invalidates_metric_group():
+	validator_metrics_pcmdi._EXISTING_GROUPS.set(u"test-group", True)
+
+	fanout._dispatch({
+		'channel': validator_metrics_pcmdi._FANOUT_CHANNEL,
+		'message': {'group': u"test-group"}
+		})
+	assert not validator_metrics_pcmdi._EXISTING_GROUPS.get(u"test-group", False)
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_web_utils_http_conditional.py
+
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL / CeCILL
+   :platform: Unix
+   :synopsis: Encapsulates conditional GET tests.
+
+.. moduleauthor:: IPSL (ES-DOC) <dev@esdocumentation.org>
+
+"""
+import datetime
+
+from . import _utils as tu
+from hermes.web.utils import http_conditional
+
+
+
+# Test endpoint.
+_EP_DETAIL = r'/api/1/simulation/monitoring/fetch_detail'
+
+
+def _get_handler(**headers):
+	return tu.MockRequestHandler(_EP_DETAIL, headers=headers)
+
+
+def _get_marker(is_complete=True, is_obsolete=False, change_seq=100):
+	return {
+		'id': 1,
+		'is_complete': is_complete,
+		'is_obsolete': is_obsolete,
+		'change_seq': change_seq,
+		'row_update_date': datetime.datetime(2016, 1, 1)
+	}
+
+
+def test_running_simulation_is_untagged():
+	handler = _get_handler()
+	http_conditional.set_validators(handler, _get_marker(is_complete=False))
+
+	assert 'Etag' not in handler.headers
+	assert not getattr(handler, 'response_not_modified', False)
+
+
+def test_complete_simulation_is_revalidated():
+	handler = _get_handler()
+	http_conditional.set_validators(handler, _get_marker())
+
+	tu.assert_string(handler.headers['Cache-Control'], 'no-cache')
+	assert not handler.response_not_modified
+
+	revalidation = _get_handler(**{'If-None-Match': handler.headers['Etag']})
+	http_conditional.set_validators(revalidation, _get_marker())
+	assert revalidation.response_not_modified
+
+	changed = _get_handler(**{'If-None-Match': handler.headers['Etag']})
+	http_conditional.set_validators(changed, _get_marker(change_seq=101))
+	assert not changed.response_not_modified
+
+
+def test_obsolete_simulation_is_immutable():
+	handler = _get_handler()
+	http_conditional.set_validators(handler, _get_marker(is_obsolete=True))
+
+	assert handler.headers['Cache-Control'].endswith('immutable')
+	assert not handler.response_not_modified
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_web_utils_http_encoder.py
+
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL / CeCILL
+   :platform: Unix
+   :synopsis: Encapsulates web response encoding tests.
+
+.. moduleauthor:: IPSL (ES-DOC) <dev@esdocumentation.org>
+
+"""
+from . import _utils as tu
+from hermes.web.utils import http_encoder as encoder
+
+
+
+# Test data: array of objects.
+_TEST_OBJECTS = {
+	'simulationList': [
+		{'uid': u'a', 'model': u'ipsl-cm5a-lr', 'login': u'p86caub', 'tryID': 1},
+		{'uid': u'b', 'model': u'ipsl-cm5a-lr', 'login': u'p86caub', 'tryID': 2},
+		{'uid': u'c', 'model': u'ipsl-cm6', 'login': None, 'tryID': 1},
+		{'uid': u'd', 'model': u'ipsl-cm5a-lr', 'login': u'p86caub', 'tryID': 1}
+	]
+}
+
+# Test data: array of arrays (as assembled by db).
+_TEST_ARRAYS = {
+	'jobCounts': [[1, u'computing', u'complete', 10], [1, u'post-processing', u'complete', 4],
+				  [2, u'computing', u'running', 1], [3, u'computing', u'complete', 7]],
+	'cursor': 1234
+}
+
+
+def test_columnar_objects_roundtrip():
+	encoded = encoder.to_columnar(_TEST_OBJECTS)
+	table = encoded['simulationList']
+
+	tu.assert_integer(table[encoder.KEY_LENGTH], 4)
+	assert table[encoder.KEY_FIELDS] == ['login', 'model', 'tryID', 'uid']
+	assert table[encoder.KEY_DICTIONARIES]['1'] == [u'ipsl-cm5a-lr', u'ipsl-cm6']
+	assert table[encoder.KEY_COLUMNS][1] == [0, 0, 1, 0]
+	assert '3' not in table[encoder.KEY_DICTIONARIES]
+	assert encoder.from_columnar(encoded) == _TEST_OBJECTS
+
+
+def test_columnar_arrays_roundtrip():
+	encoded = encoder.to_columnar(_TEST_ARRAYS)
+	table = encoded['jobCounts']
+
+	assert encoded['cursor'] == 1234
+	assert encoder.KEY_FIELDS not in table
+	assert table[encoder.KEY_COLUMNS][0] == [1, 1, 2, 3]
+	assert encoder.from_columnar(encoded) == _TEST_ARRAYS
+
+
+def test_columnar_irregular_arrays():
+	data = [[1, 2], [1, 2, 3]]
+
+	assert encoder.to_columnar(data) == data
+
+
+def test_encode_decode():
+	for mime in encoder.get_supported():
+		decoded = encoder.decode(encoder.encode(_TEST_OBJECTS, mime), mime)
+		assert decoded == _TEST_OBJECTS
+		assert all(isinstance(k, unicode) for k in decoded)
+		assert all(isinstance(k, unicode) for i in decoded['simulationList'] for k in i)
+
+
+def test_negotiate():
+	tu.assert_string(encoder.negotiate(None), encoder.MIME_JSON)
+	tu.assert_string(encoder.negotiate("application/json, text/plain, */*"), encoder.MIME_JSON)
+	tu.assert_string(encoder.negotiate(encoder.MIME_JSON_COLUMNAR), encoder.MIME_JSON_COLUMNAR)
+	tu.assert_string(encoder.negotiate("{};q=0.5, {}".format(
+		encoder.MIME_JSON, encoder.MIME_JSON_COLUMNAR)), encoder.MIME_JSON_COLUMNAR)
+	tu.assert_string(encoder.negotiate("text/html"), encoder.MIME_JSON)
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_web_utils_http_stream.py
+
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL / CeCILL
+   :platform: Unix
+   :synopsis: Encapsulates streamed web response tests.
+
+.. moduleauthor:: IPSL (ES-DOC) <dev@esdocumentation.org>
+
+"""
+import json
+import resource
+
+import tornado.gen
+import tornado.httpclient
+import tornado.httpserver
+import tornado.ioloop
+import tornado.testing
+import tornado.web
+
+from . import _utils as tu
+from hermes.web import schemas
+from hermes.web.utils import executor
+from hermes.web.utils import http_stream
+from hermes.web.utils.http1 import process_request
+
+
+
+# Number of rows streamed to client.
+_ROW_COUNT = 25000
+
+# Number of rows streamed to client when measuring memory usage.
+_ROW_COUNT_LARGE = 500000
+
+
+def _get_rows(row_count=_ROW_COUNT):
+	return ([i, u"row-{}".format(i), i % 2 == 0] for i in xrange(row_count))
+
+
+class _StreamRequestHandler(tornado.web.RequestHandler):
+	row_count = _ROW_COUNT
+
+	@tornado.gen.coroutine
+	def get(self):
+		def _begin_stream():
+			http_stream.begin(self)
+
+		@executor.blocking
+		def _stream_data():
+			http_stream.write(self, http_stream.iter_json([
+				('row_count', self.row_count),
+				('row_list', _get_rows(self.row_count))
+				]))
+
+		yield process_request(self, [_begin_stream, _stream_data])
+
+
+class _LargeStreamRequestHandler(_StreamRequestHandler):
+	row_count = _ROW_COUNT_LARGE
+
+
+def _fetch(path, **kwargs):
+	io_loop = tornado.ioloop.IOLoop()
+	io_loop.make_current()
+	endpoints = [(r'/stream', _StreamRequestHandler), (r'/stream-large', _LargeStreamRequestHandler)]
+	schemas.init([i[0] for i in endpoints])
+	sock, port = tornado.testing.bind_unused_port()
+	server = tornado.httpserver.HTTPServer(tornado.web.Application(endpoints))
+	server.add_sockets([sock])
+
+	@tornado.gen.coroutine
+	def _run():
+		response = yield tornado.httpclient.AsyncHTTPClient().fetch(
+			"http://127.0.0.1:{}{}".format(port, path), request_timeout=120, **kwargs)
+		raise tornado.gen.Return(response)
+
+	try:
+		return io_loop.run_sync(_run, timeout=120)
+	finally:
+		server.stop()
+		io_loop.close(all_fds=True)
+
+
+def _get_peak_rss():
+	# N.B. kilobytes upon linux.
+	return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def test_iter_json():
+	members = [('cursor', 1), ('job_counts', iter([[1, 2], [3, 4]])), ('empty_list', iter([]))]
+
+	assert json.loads("".join(http_stream.iter_json(members))) == {
+		'cursor': 1,
+		'jobCounts': [[1, 2], [3, 4]],
+		'emptyList': []
+	}
+	assert json.loads("".join(http_stream.iter_json([]))) == {}
+
+
+def test_streamed_response():
+	response = _fetch("/stream")
+
+	tu.assert_integer(response.code, 200)
+	tu.assert_string(response.headers['Transfer-Encoding'], 'chunked')
+	data = json.loads(response.body)
+	tu.assert_integer(data['rowCount'], _ROW_COUNT)
+	assert data['rowList'] == [list(i) for i in _get_rows()]
+
+
+def test_streamed_response_memory():
+	# Warm up, i.e. peak rss includes server, client & a small stream.
+	_fetch("/stream")
+	rss = _get_peak_rss()
+
+	# Stream 20 times as many rows, discarding them as they arrive.
+	size = [0]
+	def _on_chunk(chunk):
+		size[0] += len(chunk)
+	response = _fetch("/stream-large", streaming_callback=_on_chunk)
+
+	# Peak rss is bounded by chunk size rather than by row count.
+	tu.assert_integer(response.code, 200)
+	assert size[0] > 10 * (1 << 20)
+	assert _get_peak_rss() - rss < size[0] / 4
+
+
+class _StalledIOLoop(object):
+	def add_callback(self, *args):
+		pass
+
+
+def test_write_timeout():
+	timeout, http_stream._WRITE_TIMEOUT = http_stream._WRITE_TIMEOUT, 0.1
+	try:
+		http_stream._write(_StalledIOLoop(), None, "[]")
+	except IOError:
+		pass
+	else:
+		raise AssertionError("Stalled write did not time out")
+	finally:
+		http_stream._WRITE_TIMEOUT = timeout
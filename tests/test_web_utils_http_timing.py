@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_web_utils_http_timing.py
+
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL / CeCILL
+   :platform: Unix
+   :synopsis: Encapsulates Server-Timing tests.
+
+.. moduleauthor:: IPSL (ES-DOC) <dev@esdocumentation.org>
+
+"""
+import time
+
+from . import _utils as tu
+from hermes.web.utils import http_timing
+
+
+
+def _set_data():
+	time.sleep(0.01)
+
+
+def _raise_error():
+	raise ValueError()
+
+
+def test_server_timing_header():
+	handler = tu.MockRequestHandler()
+	http_timing.set_header(handler)
+	assert 'Server-Timing' not in handler.headers
+
+	with http_timing.timed(handler, _set_data):
+		_set_data()
+	try:
+		with http_timing.timed(handler, _raise_error):
+			_raise_error()
+	except ValueError:
+		pass
+	http_timing.set_header(handler)
+
+	metrics = [i.split(';dur=') for i in handler.headers['Server-Timing'].split(', ')]
+	tu.assert_integer(len(metrics), 2)
+	tu.assert_string(metrics[0][0], 'set_data')
+	assert float(metrics[0][1]) >= 10
+	tu.assert_string(metrics[1][0], 'raise_error')
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_web_utils_http_validator.py
+
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL / CeCIL
+   :platform: Unix
+   :synopsis: Encapsulates web request validation tests.
+
+.. moduleauthor:: IPSL (ES-DOC) <dev@esdocumentation.org>
+
+"""
+import json
+
+from . import _utils as tu
+from hermes.web import schemas
+from hermes.web.utils import http_exceptions as exceptions
+from hermes.web.utils import http_validator
+
+
+
+# Test endpoint.
+_EP_TIMESLICE = r'/api/1/simulation/monitoring/fetch_timeslice'
+
+
+def test_decode_json_body():
+	handler = tu.MockRequestHandler(_EP_TIMESLICE, body=json.dumps({'event_type': 'simulation_start'}))
+	body = http_validator.decode_json_body(handler)
+
+	tu.assert_string(body['event_type'], 'simulation_start')
+	handler.request.body = None
+	assert http_validator.decode_json_body(handler) is body
+	tu.assert_none(http_validator.decode_json_body(tu.MockRequestHandler(_EP_TIMESLICE)))
+
+
+def test_validate_request():
+	schemas.init([_EP_TIMESLICE])
+	assert schemas.get_validator('params', _EP_TIMESLICE) is not None
+	tu.assert_none(schemas.get_validator('body', _EP_TIMESLICE))
+
+	http_validator.validate_request(tu.MockRequestHandler(_EP_TIMESLICE, query_arguments={'timeslice': ['1M']}))
+	try:
+		http_validator.validate_request(tu.MockRequestHandler(_EP_TIMESLICE, query_arguments={'timeslice': ['1Y']}))
+	except exceptions.InvalidJSONSchemaError:
+		pass
+	else:
+		raise AssertionError("Invalid timeslice was accepted")
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_web_utils_profiler.py
+
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL / CeCILL
+   :platform: Unix
+   :synopsis: Encapsulates sampling profiler tests.
+
+.. moduleauthor:: IPSL (ES-DOC) <dev@esdocumentation.org>
+
+"""
+import glob
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import nose
+
+from . import _utils as tu
+from hermes.web.utils import profiler
+
+
+
+# Original profiler settings.
+_SETTINGS = (profiler._SAMPLE_RATE, profiler._OUTPUT_DIRECTORY)
+
+
+def _busy_task():
+	started = time.time()
+	while time.time() - started < 0.2:
+		pass
+
+
+def _setup():
+	profiler._SAMPLE_RATE = 1.0
+	profiler._OUTPUT_DIRECTORY = tempfile.mkdtemp()
+
+
+def _teardown():
+	shutil.rmtree(profiler._OUTPUT_DIRECTORY)
+	profiler._SAMPLE_RATE, profiler._OUTPUT_DIRECTORY = _SETTINGS
+
+
+def test_fold():
+	stack = profiler._fold(sys._getframe()).split(';')
+
+	assert stack[-1].startswith('test_fold (')
+
+
+def test_disabled():
+	handler = tu.MockRequestHandler()
+	profiler.begin(handler)
+
+	tu.assert_none(profiler.enter(handler))
+	profiler.end(handler)
+
+
+@nose.with_setup(_setup, _teardown)
+def test_sampled_request():
+	handler = tu.MockRequestHandler()
+	profiler.begin(handler)
+	profile = profiler.enter(handler)
+	try:
+		_busy_task()
+	finally:
+		profiler.leave(profile)
+	profiler.end(handler)
+
+	fpaths = glob.glob(os.path.join(profiler._OUTPUT_DIRECTORY, "*.folded"))
+	tu.assert_integer(len(fpaths), 1)
+	with open(fpaths[0], 'r') as fstream:
+		lines = fstream.read().splitlines()
+	assert lines
+	assert any('_busy_task (' in i for i in lines)
+	for line in lines:
+		stack, count = line.rsplit(' ', 1)
+		assert int(count) > 0
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: test_web_utils_response_cache.py
+
+   :copyright: @2015 IPSL (http://ipsl.fr)
+   :license: GPL / CeCILL
+   :platform: Unix
+   :synopsis: Encapsulates web response cache tests.
+
+.. moduleauthor:: IPSL (ES-DOC) <dev@esdocumentation.org>
+
+"""
+import nose
+
+from . import _utils as tu
+from hermes.web.utils import response_cache
+
+
+
+# Test simulation uids.
+_UID_1 = u'0a6f27e4-5c8e-4a4b-9f2a-1c4e0e2b7d11'
+_UID_2 = u'7c1d9b3a-2f44-4e0b-8d5e-6a9f3b2c4e22'
+
+# Test response referencing simulations (as hexadecimal uids).
+_TEST_RESPONSE = '{{"simulations": [{{"uid": "{}"}}, {{"uid": "{}"}}]}}'.format(
+	_UID_1.replace('-', ''), _UID_2.replace('-', ''))
+
+
+# Test endpoint.
+_EP_TIMESLICE = r'/api/1/simulation/monitoring/fetch_timeslice'
+
+
+def _get_handler(**query_arguments):
+	return tu.MockRequestHandler(_EP_TIMESLICE, query_arguments=query_arguments)
+
+
+def _teardown():
+	response_cache._cache.clear()
+
+
+def _cache_response(**query_arguments):
+	handler = _get_handler(**query_arguments)
+	tu.assert_none(response_cache.get(handler))
+	response_cache.set(handler, _TEST_RESPONSE)
+
+
+@nose.with_setup(None, _teardown)
+def test_get_hit():
+	_cache_response(timeslice=['1W'])
+
+	tu.assert_string(response_cache.get(_get_handler(timeslice=['1W'])), _TEST_RESPONSE)
+	tu.assert_none(response_cache.get(_get_handler(timeslice=['2W'])))
+
+
+@nose.with_setup(None, _teardown)
+def test_key_is_normalised():
+	_cache_response(a=['1'], b=['2'])
+
+	tu.assert_string(response_cache.get(_get_handler(b=['2'], a=['1'])), _TEST_RESPONSE)
+
+
+@nose.with_setup(None, _teardown)
+def test_invalidate_by_simulation():
+	_cache_response(timeslice=['1W'])
+
+	response_cache.invalidate('job_complete', u'11111111-2222-4333-8444-555555555555')
+	tu.assert_string(response_cache.get(_get_handler(timeslice=['1W'])), _TEST_RESPONSE)
+
+	response_cache.invalidate('job_complete', _UID_2)
+	tu.assert_none(response_cache.get(_get_handler(timeslice=['1W'])))
+
+
+@nose.with_setup(None, _teardown)
+def test_invalidate_upon_simulation_start():
+	_cache_response(timeslice=['1W'])
+
+	response_cache.invalidate('simulation_start', u'11111111-2222-4333-8444-555555555555')
+	tu.assert_none(response_cache.get(_get_handler(timeslice=['1W'])))
+
+
+@nose.with_setup(None, _teardown)
+def test_set_is_ignored_after_invalidation():
+	handler = _get_handler(timeslice=['1W'])
+	response_cache.get(handler)
+	response_cache.invalidate('job_complete', _UID_1)
+	response_cache.set(handler, _TEST_RESPONSE)
+
+	tu.assert_none(response_cache.get(_get_handler(timeslice=['1W'])))
+
+
+@nose.with_setup(None, _teardown)
+def test_get_marked():
+	marker = {'id': 1, 'change_seq': 100}
+	handler = _get_handler(uid=[_UID_2])
+	assert response_cache.get_marked(handler) == (None, None)
+	response_cache.set(handler, _TEST_RESPONSE, marker)
+
+	assert response_cache.get_marked(_get_handler(uid=[_UID_2])) == (_TEST_RESPONSE, marker)
+	tu.assert_string(response_cache.get(_get_handler(uid=[_UID_2])), _TEST_RESPONSE)